@@ -0,0 +1,144 @@
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from django.core.cache import caches
+
+from .generation import parse_date_list
+from .models import DEFAULT_CLASS_DAYS, CalendarEventRule, Semester
+from .weekdays import mask_weekdays
+
+CALENDAR_RULES_REVISION_KEY = 'calendar_rules_revision'
+
+
+def _parse_dates(value):
+    # A malformed list is ignored, as the calendar always did
+    try:
+        return parse_date_list(value)
+    except ValueError:
+        return []
+
+
+def _run_end(values, value):
+    """First value >= value missing from a sorted list of distinct ints (end of the run starting at value)"""
+    i = bisect_left(values, value)
+    while i < len(values) and values[i] == value:
+        i += 1
+        value += 1
+    return value
+
+
+class HolidayIndex:
+    """
+    A semester's holidays as sorted day ordinals, and per weekday as sorted week numbers.
+
+    Rolling a date past holidays is a bisect into the sorted list plus a scan of the
+    run of consecutive holidays (or same-weekday holidays) it starts.
+    """
+
+    def __init__(self, holidays):
+        ordinals = sorted({d.toordinal() for d in holidays})
+        self.ordinals = ordinals
+        # ordinal = week * 7 + remainder; a remainder identifies a weekday
+        self.weeks = {}
+        for ordinal in ordinals:
+            self.weeks.setdefault(ordinal % 7, []).append(ordinal // 7)
+
+    def __contains__(self, day):
+        ordinal = day.toordinal()
+        i = bisect_left(self.ordinals, ordinal)
+        return i < len(self.ordinals) and self.ordinals[i] == ordinal
+
+    def next_day(self, day):
+        """day, or the first later day that is not a holiday"""
+        return date.fromordinal(_run_end(self.ordinals, day.toordinal()))
+
+    def next_week(self, day):
+        """day, or the first same weekday a whole number of weeks later that is not a holiday"""
+        ordinal = day.toordinal()
+        week = _run_end(self.weeks.get(ordinal % 7, []), ordinal // 7)
+        return date.fromordinal(week * 7 + ordinal % 7)
+
+
+def rule_dates(rule, start_date, class_weekdays, holidays):
+    """Dates of an event rule for a semester starting on start_date, in order"""
+    base = start_date + timedelta(weeks=rule.offset_weeks)
+    monday = base - timedelta(days=base.weekday())
+    dates = []
+    for weekday in mask_weekdays(rule.weekdays) or class_weekdays:
+        day = monday + timedelta(days=weekday)
+        if rule.holiday_policy == 'next_day':
+            day = holidays.next_day(day)
+        elif rule.holiday_policy == 'skip':
+            if day in holidays:
+                continue
+        else:
+            day = holidays.next_week(day)
+        dates.append(day)
+    dates.sort()
+    return dates
+
+
+def semester_events(semester, rules):
+    """
+    Academic calendar events of a semester, sorted by date: semester begin and end, the
+    event rules, and the tentative final exam one week after the latest makeup date (or the
+    end date). Each event is {'name', 'dates', 'date'}, date being the earliest of dates.
+    """
+    holidays = HolidayIndex(_parse_dates(semester.holidays))
+    makeup_dates = _parse_dates(semester.makeup_dates)
+    start_date, end_date = semester.start_date, semester.end_date
+    events = []
+
+    def add(name, dates):
+        if dates:
+            events.append({'name': name, 'dates': dates, 'date': dates[0]})
+
+    if start_date:
+        add("Semester Begins", [start_date])
+        class_weekdays = semester.class_weekdays or mask_weekdays(DEFAULT_CLASS_DAYS)
+        for rule in rules:
+            add(rule.name, rule_dates(rule, start_date, class_weekdays, holidays))
+    if end_date:
+        add("Semester End", [end_date])
+
+    # Tentative Semester Final Exam: 1 week after the latest makeup date, or 1 week after end_date
+    if makeup_dates:
+        add("Tentative Semester Final Exam", [holidays.next_day(max(makeup_dates) + timedelta(weeks=1))])
+    elif end_date:
+        add("Tentative Semester Final Exam", [holidays.next_day(end_date + timedelta(weeks=1))])
+
+    events.sort(key=lambda event: event['date'])
+    return events
+
+
+def academic_calendars(semesters=None):
+    """
+    Events of every given semester (all of them by default) in one pass, with the active
+    event rules loaded once. Returns {semester_id: events} in semester order.
+    """
+    if semesters is None:
+        semesters = Semester.objects.order_by('order', 'name')
+    rules = list(CalendarEventRule.objects.filter(active=True))
+    return {semester.id: semester_events(semester, rules) for semester in semesters}
+
+
+def format_event_dates(event):
+    return ", ".join(d.strftime('%d/%m/%Y') for d in event['dates'])
+
+
+def calendar_rules_revision():
+    """Current revision of the calendar event rules (shared through the revisions cache)"""
+    revisions = caches['revisions']
+    revision = revisions.get(CALENDAR_RULES_REVISION_KEY)
+    if revision is None:
+        # Seeded with the time so a cleared cache never reuses an old revision
+        revision = time.time_ns()
+        if not revisions.add(CALENDAR_RULES_REVISION_KEY, revision, None):
+            revision = revisions.get(CALENDAR_RULES_REVISION_KEY, revision)
+    return revision
+
+
+def bump_calendar_rules_revision():
+    """Invalidate the calendar feeds after an event rule changed"""
+    caches['revisions'].set(CALENDAR_RULES_REVISION_KEY, time.time_ns(), None)
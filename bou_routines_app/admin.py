@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Teacher, Semester, Course, CurrentRoutine, NewRoutine, SemesterCourse, LoginLog
+from .forms import CalendarEventRuleAdminForm, SemesterAdminForm
+from .models import Teacher, Semester, Course, CurrentRoutine, NewRoutine, SemesterCourse, LoginLog, GenerationJob, CalendarEventRule, bump_semester_revision
 
 @admin.register(CurrentRoutine)
 class CurrentRoutineAdmin(admin.ModelAdmin):
@@ -35,6 +36,7 @@ class TeacherAdmin(admin.ModelAdmin):
 
 @admin.register(Semester)
 class SemesterAdmin(admin.ModelAdmin):
+    form = SemesterAdminForm
     list_display = ('id', 'name', 'semester_full_name', 'theory_class_duration_minutes', 'lab_class_duration_minutes', 'lunch_break_start', 'lunch_break_end', 'start_date')
     search_fields = ('name',)
     ordering = ('name',)
@@ -50,7 +52,7 @@ class SemesterAdmin(admin.ModelAdmin):
             'description': 'Duration in minutes for theory and lab classes. Used for calculating class counts during routine generation.'
         }),
         ('Schedule Settings', {
-            'fields': ('lunch_break_start', 'lunch_break_end', 'start_date', 'end_date')
+            'fields': ('class_days', 'lunch_break_start', 'lunch_break_end', 'start_date', 'end_date')
         }),
         ('Dates', {
             'fields': ('holidays', 'makeup_dates'),
@@ -71,8 +73,36 @@ class NewRoutineAdmin(admin.ModelAdmin):
     get_teacher.short_description = 'Teacher'
     get_teacher.admin_order_field = 'course__teacher'
 
+    # NewRoutine writes send no revision signals (see signals.py)
+    def save_model(self, request, obj, form, change):
+        old_semester_id = NewRoutine.objects.filter(id=obj.id).values_list('semester_id', flat=True).first() if change else None
+        super().save_model(request, obj, form, change)
+        bump_semester_revision([obj.semester_id, old_semester_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_semester_revision([obj.semester_id])
+
+    def delete_queryset(self, request, queryset):
+        semester_ids = list(queryset.values_list('semester_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        bump_semester_revision(semester_ids)
+
 @admin.register(LoginLog)
 class LoginLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'login_time', 'ip_address', 'user_agent')
     search_fields = ('user__username', 'ip_address', 'user_agent')
     list_filter = ('user',)
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'semester', 'status', 'progress', 'total', 'requested_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'semester')
+    readonly_fields = ('progress', 'total', 'summary', 'error', 'created_at', 'started_at', 'finished_at')
+
+@admin.register(CalendarEventRule)
+class CalendarEventRuleAdmin(admin.ModelAdmin):
+    form = CalendarEventRuleAdminForm
+    list_display = ('name', 'offset_weeks', 'holiday_policy', 'order', 'active')
+    list_editable = ('offset_weeks', 'holiday_policy', 'order', 'active')
+    list_filter = ('active', 'holiday_policy')
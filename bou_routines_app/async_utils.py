@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import StreamingHttpResponse
+
+# Heavy PDF/XLSX rendering runs here so it never blocks the event loop,
+# and at most EXPORT_THREAD_POOL_SIZE exports are rendered at the same time.
+_export_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'EXPORT_THREAD_POOL_SIZE', 2),
+    thread_name_prefix='routine-export',
+)
+
+
+def async_login_required(view_func):
+    """
+    login_required for native async views.
+    Django 4.2's decorator only wraps sync views, and request.user must be resolved off the event loop.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+def _call_in_worker(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Pool threads are reused, so release their database connection like a request would
+        close_old_connections()
+
+
+def submit_to_export_pool(func, *args, **kwargs):
+    """Start a blocking export function in the bounded export thread pool; returns a concurrent.futures.Future"""
+    return _export_executor.submit(partial(_call_in_worker, func, *args, **kwargs))
+
+
+async def run_in_export_pool(func, *args, **kwargs):
+    """Run a blocking export function in the bounded export thread pool"""
+    return await asyncio.wrap_future(submit_to_export_pool(func, *args, **kwargs))
+
+
+def queryset_chunks(queryset, chunk_size):
+    """
+    Rows of a queryset in lists of up to chunk_size, read through queryset.iterator() so only
+    one chunk is in memory. Unlike Django 4.2's aiterator() this also works for values_list().
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+async def iterate_in_thread(iterable):
+    """Async iterator over a blocking iterable, advanced one item at a time in the sync thread"""
+    iterator = iter(iterable)
+    done = object()
+    try:
+        while (item := await sync_to_async(next)(iterator, done)) is not done:
+            yield item
+    finally:
+        # Releases the database cursor when the client goes away mid-stream
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def streaming_response(request, content, **kwargs):
+    """
+    StreamingHttpResponse for a sync generator that streams under WSGI and ASGI alike.
+    Django 4.2 buffers a sync iterator whole under ASGI (and an async one under WSGI), so
+    under ASGI the generator is wrapped in an async iterator that advances it in the sync thread.
+    """
+    if isinstance(request, ASGIRequest):
+        content = iterate_in_thread(content)
+    return StreamingHttpResponse(content, **kwargs)
@@ -0,0 +1,165 @@
+from datetime import datetime
+
+from django.db import transaction
+
+from .models import Course, NewRoutine, bump_semester_revision
+from .validation import get_teacher_date_index, new_class_violations, rule_violations
+
+
+class OperationError(Exception):
+    pass
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _parse_create(op):
+    try:
+        class_date = datetime.strptime(op['date'], '%Y-%m-%d').date()
+        start_time = datetime.strptime(op['start_time'], '%H:%M').time()
+        end_time = datetime.strptime(op['end_time'], '%H:%M').time()
+    except KeyError as e:
+        raise OperationError(f"Missing {e.args[0]}")
+    except (TypeError, ValueError):
+        raise OperationError("Invalid date or time format")
+    if not op.get('day'):
+        raise OperationError("Missing day")
+    return class_date, start_time, end_time
+
+
+def apply_routine_batch(semester, operations, allow_conflicts=False):
+    """
+    Validate an ordered list of grid edits together and apply them in one transaction.
+
+    Each operation is {"op": "create", "course_id", "date", "day", "start_time", "end_time"},
+    {"op": "update", "routine_id", "course_id"} or {"op": "delete", "routine_id"}. Later
+    operations see the effect of earlier ones (a slot freed by a delete can be reused).
+    Nothing is written unless every operation is valid. Returns (applied, results).
+    """
+    courses = Course.objects.select_related('teacher').in_bulk(
+        {op.get('course_id') for op in operations if str(op.get('course_id', '')).isdigit()}
+    )
+    routines = NewRoutine.objects.select_related('course').filter(semester=semester).in_bulk(
+        {op.get('routine_id') for op in operations if str(op.get('routine_id', '')).isdigit()}
+    )
+    index = get_teacher_date_index()
+
+    deletes = set()
+    updates = {}
+    creates = []
+    # Placements made by this batch: (teacher_id, date) -> [(start, end, operation index, course code)]
+    placed = {}
+    # Existing routines whose current placement no longer counts (deleted or re-assigned)
+    vacated = set()
+    # routine_id -> its entry in placed, when an update re-assigned it
+    placed_by_routine = {}
+    results = []
+
+    def unplace(routine_id):
+        key_entry = placed_by_routine.pop(routine_id, None)
+        if key_entry:
+            placed[key_entry[0]].remove(key_entry[1])
+
+    def conflicts_for(teacher_id, class_date, start_time, end_time, routine_id=None):
+        start, end = _minutes(start_time), _minutes(end_time)
+        found = [
+            index.describe(other_id)
+            for other_id in index.overlapping(teacher_id, class_date, start_time, end_time, exclude_routine=routine_id)
+            if other_id not in vacated
+        ]
+        found.extend(
+            {'operation': other_op, 'course_code': code,
+             'start_time': f"{a // 60:02d}:{a % 60:02d}", 'end_time': f"{b // 60:02d}:{b % 60:02d}"}
+            for a, b, other_op, code in placed.get((teacher_id, class_date), [])
+            if a < end and start < b
+        )
+        return found
+
+    for i, op in enumerate(operations):
+        kind = op.get('op')
+        result = {'index': i, 'op': kind}
+        results.append(result)
+        try:
+            if kind not in ('create', 'update', 'delete'):
+                raise OperationError("op must be 'create', 'update' or 'delete'")
+
+            if kind in ('update', 'delete'):
+                routine = routines.get(int(op['routine_id'])) if str(op.get('routine_id', '')).isdigit() else None
+                if routine is None or routine.id in deletes:
+                    raise OperationError("Routine not found")
+                result['routine_id'] = routine.id
+                unplace(routine.id)
+                if kind == 'delete':
+                    deletes.add(routine.id)
+                    updates.pop(routine.id, None)
+                    vacated.add(routine.id)
+                    continue
+                class_date, start_time, end_time = routine.class_date, routine.start_time, routine.end_time
+            else:
+                routine = None
+                class_date, start_time, end_time = _parse_create(op)
+
+            course = courses.get(int(op['course_id'])) if str(op.get('course_id', '')).isdigit() else None
+            if course is None:
+                raise OperationError("Course not found")
+            errors = rule_violations(semester, class_date, start_time, end_time)
+            if routine is None:
+                errors = new_class_violations(semester, class_date, op['day']) + errors
+            if errors:
+                raise OperationError(" ".join(errors))
+
+            conflicts = conflicts_for(course.teacher_id, class_date, start_time, end_time, routine.id if routine else None)
+            if conflicts:
+                result['conflicts'] = conflicts
+                if not allow_conflicts:
+                    result['can_override'] = True
+                    raise OperationError(f"{course.teacher.name} already has a class at this time on {class_date.strftime('%d/%m/%Y')}.")
+                result['warnings'] = [
+                    f"{course.teacher.name} is double-booked with {conflict['course_code']} ({conflict['start_time']}-{conflict['end_time']})."
+                    for conflict in conflicts
+                ]
+
+            if routine:
+                updates[routine.id] = course
+                vacated.add(routine.id)
+            else:
+                creates.append((i, NewRoutine(
+                    semester=semester, course=course, class_date=class_date, day=op['day'],
+                    start_time=start_time, end_time=end_time,
+                )))
+            entry = (_minutes(start_time), _minutes(end_time), i, course.code)
+            placed.setdefault((course.teacher_id, class_date), []).append(entry)
+            if routine:
+                placed_by_routine[routine.id] = ((course.teacher_id, class_date), entry)
+            result['course_code'] = course.code
+            result['teacher_name'] = course.teacher.name
+            result['teacher_short_name'] = course.teacher.short_name or course.teacher.name
+        except OperationError as e:
+            result['error'] = str(e)
+
+    if any('error' in result for result in results):
+        for result in results:
+            result['status'] = 'error' if 'error' in result else 'skipped'
+        return False, results
+
+    with transaction.atomic():
+        if deletes:
+            NewRoutine.objects.filter(id__in=deletes).delete()
+        if updates:
+            changed = []
+            for routine_id, course in updates.items():
+                routine = routines[routine_id]
+                routine.course = course
+                changed.append(routine)
+            NewRoutine.objects.bulk_update(changed, ['course'])
+        if creates:
+            NewRoutine.objects.bulk_create([routine for _, routine in creates])
+            for i, routine in creates:
+                results[i]['routine_id'] = routine.id
+        if deletes or updates or creates:
+            bump_semester_revision([semester.id])
+
+    for result in results:
+        result['status'] = 'ok'
+    return True, results
@@ -0,0 +1,45 @@
+import time
+
+from django.core.cache import cache, caches
+
+from .models import Course, Teacher
+
+CATALOG_REVISION_KEY = 'catalog_revision'
+
+
+def catalog_revision():
+    """Current revision of the course/teacher catalog (shared through the revisions cache)"""
+    revisions = caches['revisions']
+    revision = revisions.get(CATALOG_REVISION_KEY)
+    if revision is None:
+        # Seeded with the time so a cleared cache never reuses an old revision
+        revision = time.time_ns()
+        if not revisions.add(CATALOG_REVISION_KEY, revision, None):
+            revision = revisions.get(CATALOG_REVISION_KEY, revision)
+    return revision
+
+
+def bump_catalog_revision():
+    """Invalidate the cached catalog and search index after a course or teacher changed"""
+    caches['revisions'].set(CATALOG_REVISION_KEY, time.time_ns(), None)
+
+
+def get_catalog():
+    """
+    Compact course/teacher index used by the routine pages to fill their selects on demand.
+
+    courses:  [[course_id, code, name, teacher_id], ...] ordered by code
+    teachers: [[teacher_id, name, short_name], ...] ordered by name
+    """
+    revision = catalog_revision()
+    key = f'catalog:{revision}'
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = {
+            'revision': revision,
+            'courses': [list(row) for row in Course.objects.order_by('code').values_list('id', 'code', 'name', 'teacher_id')],
+            'teachers': [list(row) for row in Teacher.objects.order_by('name').values_list('id', 'name', 'short_name')],
+        }
+        cache.set(key, catalog, None)
+    return catalog
+
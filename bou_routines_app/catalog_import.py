@@ -0,0 +1,208 @@
+import csv
+import io
+
+from django.db import transaction
+
+from .catalog import bump_catalog_revision
+from .models import Course, NewRoutine, Semester, SemesterCourse, Teacher, bump_semester_revision
+
+IMPORT_COLUMNS = ['semester', 'course_code', 'course_name', 'teacher', 'teacher_short_name', 'number_of_classes']
+REQUIRED_COLUMNS = ['course_code', 'course_name', 'teacher']
+# Column -> (model, field) whose max_length limits it
+LIMITED_COLUMNS = {
+    'course_code': (Course, 'code'), 'course_name': (Course, 'name'),
+    'teacher': (Teacher, 'name'), 'teacher_short_name': (Teacher, 'short_name'),
+}
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be read as a catalog sheet at all"""
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _header(values):
+    columns = [_cell(value).lower().replace(' ', '_') for value in values]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(IMPORT_COLUMNS)}")
+    return columns
+
+
+def _rows(header, records):
+    """(row number, {column: text}) of the non-blank records after the header row"""
+    for row_number, values in enumerate(records, start=2):
+        row = {column: _cell(value) for column, value in zip(header, values) if column in IMPORT_COLUMNS}
+        if any(row.values()):
+            yield row_number, row
+
+
+def read_catalog_rows(file, filename):
+    """
+    Rows of a CSV or XLSX catalog sheet, read as a stream: csv for .csv, openpyxl in read-only
+    mode for .xlsx (first sheet). The first row names the columns (see IMPORT_COLUMNS).
+    """
+    if filename.lower().endswith('.csv'):
+        reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+        try:
+            header = _header(next(reader, []))
+        except UnicodeDecodeError:
+            raise ImportFileError("The CSV file is not UTF-8 encoded")
+        yield from _rows(header, reader)
+    elif filename.lower().endswith('.xlsx'):
+        # openpyxl is only needed here, so it is imported on the first import
+        from openpyxl import load_workbook
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFileError(f"Cannot read the XLSX file: {e}")
+        try:
+            records = workbook.worksheets[0].iter_rows(values_only=True)
+            header = _header(next(records, ()))
+            yield from _rows(header, records)
+        finally:
+            workbook.close()
+    else:
+        raise ImportFileError("Upload a .csv or .xlsx file")
+
+
+def import_catalog(rows, dry_run=False):
+    """
+    Create or update teachers, courses and semester courses from catalog rows.
+
+    Every row is validated in one pass against lookup dictionaries loaded up front (one query
+    per table); a course name or teacher short name may not move to another record. Nothing
+    is written when any row has an error; otherwise all changes are made with
+    bulk_create/bulk_update in one transaction. Returns a report with the row-level errors
+    and the number of records created and updated per model.
+    """
+    teachers = {teacher.name: teacher for teacher in Teacher.objects.all()}
+    teachers_by_short_name = {teacher.short_name: teacher.name for teacher in teachers.values() if teacher.short_name}
+    courses = {course.code: course for course in Course.objects.all()}
+    course_codes_by_name = {course.name: course.code for course in courses.values()}
+    semesters = dict(Semester.objects.values_list('name', 'id'))
+    semester_courses = {(sc.semester_id, sc.course_id): sc for sc in SemesterCourse.objects.all()}
+
+    max_lengths = {column: model._meta.get_field(field).max_length for column, (model, field) in LIMITED_COLUMNS.items()}
+    errors = []
+    row_count = 0
+    teacher_rows = {}  # name -> short name ('' keeps the current one)
+    course_rows = {}  # code -> (name, teacher name)
+    semester_course_rows = {}  # (semester name, code) -> number of classes
+    for row_number, row in rows:
+        row_count += 1
+        code, name, teacher = row.get('course_code', ''), row.get('course_name', ''), row.get('teacher', '')
+        short_name, semester = row.get('teacher_short_name', ''), row.get('semester', '')
+        row_errors = [f"{column} is required" for column in REQUIRED_COLUMNS if not row.get(column)]
+        row_errors += [
+            f"{column} is longer than {max_length} characters"
+            for column, max_length in max_lengths.items() if len(row.get(column, '')) > max_length
+        ]
+
+        if short_name:
+            if teacher_rows.get(teacher, short_name) not in ('', short_name):
+                row_errors.append(f"Teacher {teacher} has short name {teacher_rows[teacher]} in an earlier row")
+            elif teachers_by_short_name.get(short_name, teacher) != teacher:
+                row_errors.append(f"Short name {short_name} already belongs to {teachers_by_short_name[short_name]}")
+        if code in course_rows and course_rows[code] != (name, teacher):
+            row_errors.append(f"Course {code} has a different name or teacher in an earlier row")
+        elif course_codes_by_name.get(name, code) != code:
+            row_errors.append(f"Course name {name} already belongs to {course_codes_by_name[name]}")
+        number_of_classes = row.get('number_of_classes') or '1'
+        if not number_of_classes.isdigit():
+            row_errors.append("number_of_classes must be a whole number")
+        if semester:
+            if semester not in semesters:
+                row_errors.append(f"Semester {semester} does not exist")
+            elif (semester, code) in semester_course_rows:
+                row_errors.append(f"Course {code} is listed twice for {semester}")
+
+        if row_errors:
+            errors.extend({'row': row_number, 'error': error} for error in row_errors)
+            continue
+        if short_name or teacher not in teacher_rows:
+            teacher_rows[teacher] = short_name
+            if short_name:
+                teachers_by_short_name[short_name] = teacher
+        course_rows[code] = (name, teacher)
+        course_codes_by_name[name] = code
+        if semester:
+            semester_course_rows[(semester, code)] = int(number_of_classes)
+
+    report = {
+        'rows': row_count, 'errors': errors, 'dry_run': dry_run,
+        'teachers_created': 0, 'teachers_updated': 0, 'courses_created': 0, 'courses_updated': 0,
+        'semester_courses_created': 0, 'semester_courses_updated': 0,
+    }
+    if errors:
+        return report
+
+    new_teachers, changed_teachers = [], []
+    for name, short_name in teacher_rows.items():
+        teacher = teachers.get(name)
+        if teacher is None:
+            teacher = teachers[name] = Teacher(name=name, short_name=short_name or None)
+            new_teachers.append(teacher)
+        elif short_name and teacher.short_name != short_name:
+            teacher.short_name = short_name
+            changed_teachers.append(teacher)
+    new_courses, changed_courses = [], []
+    for code, (name, teacher_name) in course_rows.items():
+        course = courses.get(code)
+        if course is None:
+            new_courses.append(Course(code=code, name=name))
+        elif course.name != name or course.teacher_id != teachers[teacher_name].id:
+            course.name = name
+            changed_courses.append(course)
+    report.update({
+        'teachers_created': len(new_teachers), 'teachers_updated': len(changed_teachers),
+        'courses_created': len(new_courses), 'courses_updated': len(changed_courses),
+    })
+
+    with transaction.atomic():
+        Teacher.objects.bulk_create(new_teachers)
+        Teacher.objects.bulk_update(changed_teachers, ['short_name'])
+        # Teachers created above have their ids now
+        for course in new_courses + changed_courses:
+            course.teacher = teachers[course_rows[course.code][1]]
+        Course.objects.bulk_update(changed_courses, ['name', 'teacher'])
+        Course.objects.bulk_create(new_courses)
+        for course in new_courses:
+            courses[course.code] = course
+
+        new_semester_courses, changed_semester_courses = [], []
+        for (semester, code), number_of_classes in semester_course_rows.items():
+            key = (semesters[semester], courses[code].id)
+            semester_course = semester_courses.get(key)
+            if semester_course is None:
+                new_semester_courses.append(SemesterCourse(
+                    semester_id=key[0], course_id=key[1], number_of_classes=number_of_classes,
+                ))
+            elif semester_course.number_of_classes != number_of_classes:
+                semester_course.number_of_classes = number_of_classes
+                changed_semester_courses.append(semester_course)
+        SemesterCourse.objects.bulk_create(new_semester_courses)
+        SemesterCourse.objects.bulk_update(changed_semester_courses, ['number_of_classes'])
+        report['semester_courses_created'] = len(new_semester_courses)
+        report['semester_courses_updated'] = len(changed_semester_courses)
+
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            # bulk_create/bulk_update send no model signals. The catalog revision lives in the
+            # cache, so it is bumped after commit: a reader must not cache the old rows under it
+            transaction.on_commit(bump_catalog_revision)
+            changed_course_ids = [course.id for course in changed_courses] + list(
+                Course.objects.filter(teacher__in=changed_teachers).values_list('id', flat=True)
+            )
+            bump_semester_revision(
+                [semester_course.semester_id for semester_course in new_semester_courses + changed_semester_courses]
+                + list(NewRoutine.objects.filter(course_id__in=changed_course_ids).values_list('semester_id', flat=True).distinct())
+            )
+    return report
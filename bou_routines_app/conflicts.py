@@ -0,0 +1,73 @@
+import heapq
+from itertools import groupby
+
+from .models import NewRoutine
+
+BOOKING_FIELDS = (
+    'id', 'course__teacher_id', 'class_date', 'start_time', 'end_time',
+    'semester_id', 'semester__name', 'course_id', 'course__code', 'course__teacher__name',
+)
+
+
+def load_bookings(dates=None, teacher_ids=None):
+    """All timed NewRoutine rows (optionally only on some dates / for some teachers) in one query"""
+    # Times are nullable; a class without them cannot overlap and would break the sort
+    routines = NewRoutine.objects.filter(start_time__isnull=False, end_time__isnull=False)
+    if dates is not None:
+        routines = routines.filter(class_date__in=dates)
+    if teacher_ids is not None:
+        routines = routines.filter(course__teacher_id__in=teacher_ids)
+    return [dict(zip(BOOKING_FIELDS, row)) for row in routines.values_list(*BOOKING_FIELDS)]
+
+
+def overlapping_pairs(bookings):
+    """
+    Sweep over bookings of one teacher on one date, sorted by start time.
+
+    A min-heap of end times holds the classes still running; every class still in it when
+    a new one starts overlaps the new one. O(n log n + number of overlaps).
+    """
+    pairs = []
+    running = []
+    for index, booking in enumerate(sorted(bookings, key=lambda b: (b['start_time'], b['end_time']))):
+        while running and running[0][0] <= booking['start_time']:
+            heapq.heappop(running)
+        for _, _, other in running:
+            pairs.append((other, booking))
+        heapq.heappush(running, (booking['end_time'], index, booking))
+    return pairs
+
+
+def _booking_json(booking):
+    return {
+        'routine_id': booking['id'],
+        'semester_id': booking['semester_id'],
+        'semester': booking['semester__name'],
+        'course_id': booking['course_id'],
+        'course_code': booking['course__code'],
+        'start_time': booking['start_time'].strftime('%H:%M'),
+        'end_time': booking['end_time'].strftime('%H:%M'),
+    }
+
+
+def find_double_bookings(dates=None, teacher_ids=None):
+    """
+    Every pair of classes that books the same teacher at overlapping times on the same date,
+    across all semesters. Pass dates to re-check only the dates touched by an edit.
+    """
+    bookings = load_bookings(dates=dates, teacher_ids=teacher_ids)
+    key = lambda b: (b['course__teacher_id'], b['class_date'])
+    conflicts = []
+    for (_, class_date), group in groupby(sorted(bookings, key=key), key=key):
+        group = list(group)
+        if len(group) < 2:
+            continue
+        for first, second in overlapping_pairs(group):
+            conflicts.append({
+                'date': class_date.strftime('%Y-%m-%d'),
+                'teacher_id': first['course__teacher_id'],
+                'teacher': first['course__teacher__name'],
+                'classes': [_booking_json(first), _booking_json(second)],
+            })
+    conflicts.sort(key=lambda c: (c['date'], c['teacher'], c['classes'][0]['start_time']))
+    return conflicts, len(bookings)
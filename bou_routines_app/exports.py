@@ -0,0 +1,1321 @@
+from datetime import datetime
+import io
+
+from django.http import HttpResponse
+# reportlab and xlsxwriter are only imported here; the export views import this module lazily
+import xlsxwriter
+from reportlab.lib.pagesizes import landscape, A4
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, KeepTogether, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+
+from .academic_calendar import academic_calendars, format_event_dates
+from .grid import build_teacher_table
+from .models import NewRoutine, Semester, SemesterCourse, Teacher
+
+
+def render_routine_excel(semester_id):
+    """Build the Excel export response for a semester (runs in the export thread pool)"""
+    try:
+        selected_semester = Semester.objects.get(id=semester_id)
+
+        # Create a response for Excel file
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output)
+        worksheet = workbook.add_worksheet("Routine")
+
+        # Add some formatting
+        title_format = workbook.add_format({
+            'bold': True,
+            'font_size': 14,
+            'align': 'center',
+            'valign': 'vcenter'
+        })
+        header_format = workbook.add_format({
+            'bold': True,
+            'font_size': 12,
+            'align': 'center',
+            'valign': 'vcenter',
+            'bg_color': '#2c3e50',
+            'font_color': 'white',
+            'border': 1
+        })
+        cell_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1
+        })
+        date_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1,
+            'bold': True,
+            'num_format': 'dd/mm/yyyy'
+        })
+        lunch_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1,
+            'bg_color': '#fff2cc',
+            'bold': True
+        })
+        course_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1,
+            'bg_color': '#3498db',
+            'font_color': 'white',
+            'text_wrap': True
+        })
+
+        # Add formats for even row background and even row class cell
+        even_row_bg_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1,
+            'bg_color': '#e3f0fa',
+        })
+        even_class_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1,
+            'bg_color': '#d0e6f7',
+            'font_color': 'black',
+            'text_wrap': True
+        })
+
+        # Get the routines from the database
+        routines = NewRoutine.objects.filter(semester=selected_semester).order_by('class_date', 'start_time')
+
+        # Get unique dates and days
+        unique_dates_days = []
+        seen_dates = set()
+        for routine in routines:
+            date_str = routine.class_date.strftime('%Y-%m-%d')
+            if date_str not in seen_dates:
+                seen_dates.add(date_str)
+                unique_dates_days.append((routine.class_date, routine.day))
+
+        # Sort dates chronologically
+        unique_dates_days.sort(key=lambda x: x[0])
+
+        # --- Build slot_ranges for merging logic ---
+        time_boundaries = set()
+        for routine in routines:
+            time_boundaries.add(routine.start_time.strftime('%H:%M'))
+            time_boundaries.add(routine.end_time.strftime('%H:%M'))
+        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+            time_boundaries.add(selected_semester.lunch_break_start.strftime('%H:%M'))
+            time_boundaries.add(selected_semester.lunch_break_end.strftime('%H:%M'))
+        time_boundaries = sorted(time_boundaries)
+
+        slot_ranges = []
+        for i in range(len(time_boundaries)-1):
+            slot_start = time_boundaries[i]
+            slot_end = time_boundaries[i+1]
+            slot_ranges.append((slot_start, slot_end, f"{slot_start} - {slot_end}"))
+
+        used_slots = set()
+        for routine in routines:
+            r_start = routine.start_time.strftime('%H:%M')
+            r_end = routine.end_time.strftime('%H:%M')
+            for i in range(len(time_boundaries)-1):
+                slot_start = time_boundaries[i]
+                slot_end = time_boundaries[i+1]
+                if (slot_start >= r_start and slot_end <= r_end):
+                    used_slots.add((slot_start, slot_end))
+        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+            lb_start = selected_semester.lunch_break_start.strftime('%H:%M')
+            lb_end = selected_semester.lunch_break_end.strftime('%H:%M')
+            for i in range(len(time_boundaries)-1):
+                slot_start = time_boundaries[i]
+                slot_end = time_boundaries[i+1]
+                if (slot_start >= lb_start and slot_end <= lb_end):
+                    used_slots.add((slot_start, slot_end))
+
+        filtered_slot_ranges = []
+        for slot_start, slot_end, label in slot_ranges:
+            if (slot_start, slot_end) in used_slots:
+                filtered_slot_ranges.append((slot_start, slot_end, label))
+        slot_ranges = filtered_slot_ranges
+
+        # Add title
+        worksheet.merge_range(0, 0, 0, len(slot_ranges) + 1, f"{selected_semester.name} Routine", title_format)
+
+        # Write headers
+        row = 2
+        worksheet.write(row, 0, "Date", header_format)
+        worksheet.write(row, 1, "Day", header_format)
+        for col, (_, _, label) in enumerate(slot_ranges):
+            worksheet.write(row, col + 2, label, header_format)
+
+        # Set column widths
+        worksheet.set_column(0, 0, 12)  # Date column
+        worksheet.set_column(1, 1, 10)  # Day column
+        worksheet.set_column(2, len(slot_ranges) + 1, 15)  # Time slot columns
+
+        # Merge unique_dates_days and makeup_dates, sort, and output in order
+        makeup_dates = []
+        if selected_semester.makeup_dates:
+            makeup_dates = [
+                datetime.strptime(date.strip(), "%Y-%m-%d").date()
+                for date in selected_semester.makeup_dates.split(',')
+                if date.strip()
+            ]
+        # Build a dict for quick lookup of routines by date
+        routines_by_date = {date: day for date, day in unique_dates_days}
+        all_dates = set(routines_by_date.keys()) | set(makeup_dates)
+        sorted_dates = sorted(all_dates)
+        # Write data with merging
+        row = 3
+        for date_idx, date in enumerate(sorted_dates):
+            day = routines_by_date.get(date, date.strftime('%A'))
+            is_even_row = (date_idx % 2 == 1)
+            worksheet.write(row, 0, date, date_format if not is_even_row else even_row_bg_format)
+            worksheet.write(row, 1, day, cell_format if not is_even_row else even_row_bg_format)
+            # Build routines for this row
+            routines_for_row = []
+            for r in routines:
+                if r.class_date == date and r.day == day:
+                    routines_for_row.append({
+                        'course_code': r.course.code,
+                        'teacher': 'Supervisor' if r.course.code == 'CSE4246' else r.course.teacher.short_name,
+                        'start_time': r.start_time.strftime('%H:%M'),
+                        'end_time': r.end_time.strftime('%H:%M'),
+                        'is_lunch_break': False
+                    })
+            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+                routines_for_row.append({
+                    'start_time': selected_semester.lunch_break_start.strftime('%H:%M'),
+                    'end_time': selected_semester.lunch_break_end.strftime('%H:%M'),
+                    'is_lunch_break': True
+                })
+            routines_for_row.sort(key=lambda r: r['start_time'])
+            # Process each slot and handle merging
+            slot_idx = 0
+            col_idx = 2  # Start after date and day columns
+            while slot_idx < len(slot_ranges):
+                slot_start, slot_end, slot_label = slot_ranges[slot_idx]
+                found = False
+                for r in routines_for_row:
+                    r_start = r['start_time']
+                    r_end = r['end_time']
+                    is_lunch = r.get('is_lunch_break', False)
+                    if r_start == slot_start:
+                        # Determine colspan
+                        colspan = 0
+                        for j in range(slot_idx, len(slot_ranges)):
+                            s2, e2, _ = slot_ranges[j]
+                            if e2 <= r_end:
+                                colspan += 1
+                            else:
+                                break
+                        # Prepare cell content
+                        if is_lunch:
+                            cell_content = "BREAK"
+                            format_to_use = lunch_format
+                        else:
+                            cell_content = f"{r['course_code']} ({r['teacher']})"
+                            format_to_use = course_format if not is_even_row else even_class_format
+                        # Write content and merge if needed
+                        if colspan > 1:
+                            worksheet.merge_range(row, col_idx, row, col_idx + colspan - 1, cell_content, format_to_use)
+                        else:
+                            worksheet.write(row, col_idx, cell_content, format_to_use)
+                        col_idx += colspan
+                        slot_idx += colspan
+                        found = True
+                        break
+                if not found:
+                    # If this is a makeup/reserved date, show 'Reserved Class'
+                    if date in makeup_dates:
+                        worksheet.write(row, col_idx, "Makeup Class", cell_format if not is_even_row else even_row_bg_format)
+                    else:
+                        worksheet.write(row, col_idx, "", cell_format if not is_even_row else even_row_bg_format)
+                    col_idx += 1
+                    slot_idx += 1
+            row += 1
+        # Set row heights
+        for i in range(3, row):
+            worksheet.set_row(i, 50)
+
+        workbook.close()
+
+        # Prepare the response
+        output.seek(0)
+        response = HttpResponse(output.read(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        response['Content-Disposition'] = f'attachment; filename="{selected_semester.name}_Routine.xlsx"'
+        return response
+
+    except Exception as e:
+        return HttpResponse(f"Error generating Excel file: {str(e)}", status=500)
+
+def render_routine_pdf(semester_id, teacher_short_name_newline=True):
+    """Build the routine PDF response for a semester (runs in the export thread pool)"""
+    try:
+        selected_semester = Semester.objects.get(id=semester_id)
+
+        # Create a response for PDF file
+        buffer = io.BytesIO()
+
+        # Create the PDF document with A4 landscape orientation and decent print margins
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=landscape(A4),
+            rightMargin=54,  # 0.75 inch
+            leftMargin=54,   # 0.75 inch
+            topMargin=34,    # 0.75 inch
+            bottomMargin=34  # Reduced from 54 (about 1/3 inch)
+        )
+
+        # Get page width and height for calculations
+        page_width, page_height = landscape(A4)
+
+        # Calculate available width for all tables (accounting for document margins)
+        available_width = page_width - doc.leftMargin - doc.rightMargin
+
+        elements = []
+
+        # --- HEADER IMAGE SECTION ---
+        header_img_path = 'bou_routines_app/static/pdf_routine_top.png'
+        try:
+            # Padding for the image cell (matching routine table cell padding of 2)
+            padding_for_image = 2
+
+            # Create an Image object, scaled by width to fit within the available padded space
+            # Height will be auto-calculated to maintain aspect ratio.
+            img_obj = Image(header_img_path, width=available_width - (2 * padding_for_image), height=45)
+
+            # Put the image in a single-cell table whose width spans the available area,
+            # and apply padding to the cell to align the image correctly.
+            header_img_table = Table([[img_obj]], colWidths=[available_width])
+            header_img_table.setStyle(TableStyle([
+                ('ALIGN', (0,0), (-1,-1), 'CENTER'), # Center the image horizontally within its cell
+                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'), # Center vertically
+                ('LEFTPADDING', (0,0), (-1, -1), padding_for_image),
+                ('RIGHTPADDING', (0,0), (-1, -1), padding_for_image),
+                ('TOPPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
+                ('BOTTOMPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
+            ]))
+            elements.append(header_img_table)
+        except Exception as e:
+            print(f"Error loading header image: {e}")
+            pass # If image not found, skip
+        elements.append(Spacer(1, -4))  # Minimal gap above program name
+
+        # Build left column (program/session/term/commencement/study center)
+        header_style = ParagraphStyle(
+            'HeaderStyle',
+            fontName='Helvetica-Bold',
+            fontSize=15,  # Reduced from 18
+            alignment=1,  # Center
+            leading=18,   # Reduced from 28
+            spaceAfter=0,
+            spaceBefore=0,
+        )
+        header_style_small = ParagraphStyle(
+            'HeaderStyleSmall',
+            fontName='Helvetica-Bold',
+            fontSize=11,  # Reduced from 14
+            alignment=1,
+            leading=14,   # Reduced from 22
+            spaceAfter=0,
+            spaceBefore=0,
+        )
+        header_style_normal = ParagraphStyle(
+            'HeaderStyleNormal',
+            fontName='Helvetica',
+            fontSize=10,   # Reduced from 12
+            alignment=1,
+            leading=11,   # Reduced from 20
+            spaceAfter=0,
+            spaceBefore=0,
+        )
+        header_style_bold = ParagraphStyle(
+            'HeaderStyleBold',
+            fontName='Helvetica-Bold',
+            fontSize=12,  # Reduced from 15
+            alignment=1,
+            leading=15,   # Reduced from 24
+            spaceAfter=0,
+            spaceBefore=0,
+        )
+
+        left_content = []
+        program_name = 'B. Sc in Computer Science and Engineering Program'
+        left_content.append(Paragraph(program_name, header_style))
+        session = selected_semester.session or ''
+        if session:
+            left_content.append(Paragraph(f'{session} Session', header_style_small))
+        term = selected_semester.term or ''
+        semester_full_name = selected_semester.semester_full_name or ''
+        if term or semester_full_name:
+            combined = f'{term} Term {semester_full_name}'.strip()
+            left_content.append(Paragraph(combined, header_style_small))
+        left_content.append(Spacer(1, 2))  # Reduced from 8
+        left_content.append(Paragraph('Class Routine', header_style_bold))
+        commencement = selected_semester.start_date.strftime('%d %B %Y') if selected_semester.start_date else ''
+        study_center = selected_semester.study_center or ''
+        if commencement:
+            left_content.append(Paragraph(f'<b>Date of Commencement:</b> {commencement}', header_style_normal))
+        if study_center:
+            left_content.append(Paragraph(f'<b>Study Center:</b> {study_center}', header_style_normal))
+
+        # Build right column (contact person box)
+        contact_info_lines = []
+        contact_label = Paragraph(
+            'Contact Person',
+            ParagraphStyle(
+                'ContactLabel',
+                fontName='Helvetica-Bold',
+                fontSize=11,
+                alignment=0,  # Left align
+                textColor=colors.white,
+                spaceAfter=0,
+                spaceBefore=0,
+                leading=14,
+            )
+        )
+        # Add 4px gap below the label using a single-cell table row with bottom padding
+        contact_label_table = Table(
+            [[contact_label]],
+            colWidths=[180],
+            hAlign='RIGHT',
+            style=TableStyle([
+                ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+                ('TOPPADDING', (0,0), (-1,-1), -3),
+                ('LEFTPADDING', (0,0), (-1,-1), 0),
+                ('RIGHTPADDING', (0,0), (-1,-1), 0),
+            ])
+        )
+        if selected_semester.contact_person:
+            contact_info_lines.append(selected_semester.contact_person)
+        if selected_semester.contact_person_designation:
+            contact_info_lines.append(selected_semester.contact_person_designation)
+        contact_info_lines.append('School of Science and Technology')
+        contact_info_lines.append('Bangladesh Open University')
+        if selected_semester.contact_person_phone:
+            contact_info_lines.append(f'Phone/Whatsapp: {selected_semester.contact_person_phone}')
+        if selected_semester.contact_person_email:
+            contact_info_lines.append(f'email:{selected_semester.contact_person_email}')
+        contact_info_para = Paragraph(
+            '<br/>'.join(contact_info_lines),
+            ParagraphStyle(
+                'ContactBox',
+                fontName='Helvetica',
+                fontSize=10,
+                alignment=0,  # Left align
+                textColor=colors.black,
+                leftIndent=2,
+                leading=10,
+                spaceBefore=0,
+                spaceAfter=0,
+            )
+        )
+        contact_table = Table(
+            [[contact_label_table], [contact_info_para]],
+            colWidths=[180],
+            hAlign='RIGHT',
+        )
+        contact_table.setStyle(TableStyle([
+            ('BOX', (0, 0), (-1, -1), 1, colors.black),  # Single, lighter border
+            ('ROUNDED', (0, 0), (-1, -1), 6),  # Rounded corners
+            ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#2c3e50')),  # Label bg
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (0, 0), 6),  # Label row
+            ('BOTTOMPADDING', (0, 0), (0, 0), 4),  # Label row
+            ('TOPPADDING', (0, 1), (0, 1), 4),  # Info row
+            ('BOTTOMPADDING', (0, 1), (0, 1), 6),  # Info row
+        ]))
+
+        # Vertically center the left header content to match the contact box
+        left_box_table = Table(
+            [[left_content]],
+            colWidths=[available_width-180],
+            hAlign='LEFT',
+            style=TableStyle([
+                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ])
+        )
+        two_col_table = Table(
+            [[left_box_table, contact_table]],
+            colWidths=[available_width-180, 180],
+            hAlign='LEFT'
+        )
+        two_col_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (0, 0), 'MIDDLE'),
+            ('VALIGN', (1, 0), (1, 0), 'MIDDLE'),
+            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ]))
+        elements.append(Spacer(1, 4))  # Add slight gap before contact box
+        elements.append(two_col_table)
+        elements.append(Spacer(1, 4))  # Reduced from 16
+
+        # Get the routines from the database
+        routines = NewRoutine.objects.filter(semester=selected_semester).order_by('class_date', 'start_time')
+
+        # Get unique dates and days
+        unique_dates_days = []
+        seen_dates = set()
+        for routine in routines:
+            date_str = routine.class_date.strftime('%Y-%m-%d')
+            if date_str not in seen_dates:
+                seen_dates.add(date_str)
+                unique_dates_days.append((routine.class_date, routine.day))
+
+        # Sort dates chronologically
+        unique_dates_days.sort(key=lambda x: x[0])
+
+        # Get unique time slots
+        time_slot_set = set()
+        for routine in routines:
+            time_slot = f"{routine.start_time.strftime('%H:%M')} - {routine.end_time.strftime('%H:%M')}"
+            time_slot_set.add(time_slot)
+
+        # Add lunch break if configured
+        lunch_break = None
+        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+            lunch_break = f"{selected_semester.lunch_break_start.strftime('%H:%M')} - {selected_semester.lunch_break_end.strftime('%H:%M')}"
+            time_slot_set.add(lunch_break)
+
+        # Sort time slots
+        time_slots = sorted(list(time_slot_set), key=lambda x: x.split(' - ')[0])
+
+        # Title
+        styles = getSampleStyleSheet()
+        title_style = styles['Title']
+        title_style.alignment = 1  # Center alignment
+        # title = Paragraph(f"{selected_semester.name} Routine", title_style)
+        # elements.append(title)
+        elements.append(Paragraph("<br/>", styles['Normal']))
+
+        # --- Build slot_ranges before using it ---
+        time_boundaries = set()
+        for routine in routines:
+            time_boundaries.add(routine.start_time.strftime('%H:%M'))
+            time_boundaries.add(routine.end_time.strftime('%H:%M'))
+        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+            time_boundaries.add(selected_semester.lunch_break_start.strftime('%H:%M'))
+            time_boundaries.add(selected_semester.lunch_break_end.strftime('%H:%M'))
+        time_boundaries = sorted(time_boundaries)
+
+        slot_ranges = []
+        for i in range(len(time_boundaries)-1):
+            slot_start = time_boundaries[i]
+            slot_end = time_boundaries[i+1]
+            slot_ranges.append((slot_start, slot_end, f"{slot_start} - {slot_end}"))
+
+        used_slots = set()
+        for routine in routines:
+            r_start = routine.start_time.strftime('%H:%M')
+            r_end = routine.end_time.strftime('%H:%M')
+            for i in range(len(time_boundaries)-1):
+                slot_start = time_boundaries[i]
+                slot_end = time_boundaries[i+1]
+                if (slot_start >= r_start and slot_end <= r_end):
+                    used_slots.add((slot_start, slot_end))
+        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+            lb_start = selected_semester.lunch_break_start.strftime('%H:%M')
+            lb_end = selected_semester.lunch_break_end.strftime('%H:%M')
+            for i in range(len(time_boundaries)-1):
+                slot_start = time_boundaries[i]
+                slot_end = time_boundaries[i+1]
+                if (slot_start >= lb_start and slot_end <= lb_end):
+                    used_slots.add((slot_start, slot_end))
+
+        filtered_slot_ranges = []
+        for slot_start, slot_end, label in slot_ranges:
+            if (slot_start, slot_end) in used_slots:
+                filtered_slot_ranges.append((slot_start, slot_end, label))
+        slot_ranges = filtered_slot_ranges
+
+        # --- Build table_data for PDF with colspans and track spans ---
+        span_commands = []  # To collect ('SPAN', ...) commands
+        header_row = ["Date", "Day"] + [label for _, _, label in slot_ranges]
+        table_data = [header_row]
+        # Merge all routine dates and makeup dates, sort, and ensure each date appears only once in order
+        makeup_dates = []
+        if selected_semester.makeup_dates:
+            makeup_dates = [
+                datetime.strptime(date.strip(), "%Y-%m-%d").date()
+                for date in selected_semester.makeup_dates.split(',')
+                if date.strip()
+            ]
+        day_by_date = {date: day for date, day in unique_dates_days}
+        all_dates = set(day_by_date.keys()) | set(makeup_dates)
+        sorted_dates = sorted(all_dates)
+
+        for row_idx, date in enumerate(sorted_dates, start=1):
+            day = day_by_date.get(date, date.strftime('%A'))
+            row = [date.strftime('%d/%m/%y'), day]
+            slot_idx = 0
+            # Build routines_for_row: all routines for this date, plus lunch break if present
+            routines_for_row = []
+            for r in routines:
+                if r.class_date == date:
+                    routines_for_row.append({
+                        'course_code': r.course.code,
+                        'teacher': 'Supervisor' if r.course.code == 'CSE4246' else r.course.teacher.short_name,
+                        'start_time': r.start_time.strftime('%H:%M'),
+                        'end_time': r.end_time.strftime('%H:%M'),
+                        'is_lunch_break': False
+                    })
+            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+                routines_for_row.append({
+                    'start_time': selected_semester.lunch_break_start.strftime('%H:%M'),
+                    'end_time': selected_semester.lunch_break_end.strftime('%H:%M'),
+                    'is_lunch_break': True
+                })
+            routines_for_row.sort(key=lambda r: r['start_time'])
+            col_idx = 2
+            while slot_idx < len(slot_ranges):
+                slot_start, slot_end, slot_label = slot_ranges[slot_idx]
+                found = False
+                for r in routines_for_row:
+                    r_start = r['start_time']
+                    r_end = r['end_time']
+                    is_lunch = r.get('is_lunch_break', False)
+                    if r_start == slot_start:
+                        # Determine colspan
+                        colspan = 0
+                        for j in range(slot_idx, len(slot_ranges)):
+                            s2, e2, _ = slot_ranges[j]
+                            if e2 <= r_end:
+                                colspan += 1
+                            else:
+                                break
+                        # Add content and None for colspan-1
+                        if is_lunch:
+                            cell_content = Paragraph("BREAK", ParagraphStyle(
+                                'BreakContent',
+                                fontName='Helvetica-Bold',
+                                fontSize=9,
+                                alignment=TA_CENTER,
+                                leading=8,
+                                spaceBefore=0,
+                                spaceAfter=0,
+                            ))
+                        else:
+                            course_code = r['course_code']
+                            teacher_short = r['teacher']
+                            if teacher_short_name_newline:
+                                cell_content = Paragraph(f"{course_code}<br/>({teacher_short})", ParagraphStyle(
+                                    'CourseContent',
+                                    fontName='Helvetica',
+                                    fontSize=9,
+                                    alignment=TA_CENTER,
+                                    leading=10,
+                                    spaceBefore=0,
+                                    spaceAfter=0,
+                                ))
+                            else:
+                                cell_content = Paragraph(f"{course_code} ({teacher_short})", ParagraphStyle(
+                                    'CourseContent',
+                                    fontName='Helvetica',
+                                    fontSize=9,
+                                    alignment=TA_CENTER,
+                                    leading=10,
+                                    spaceBefore=0,
+                                    spaceAfter=0,
+                                ))
+                        row.append(cell_content)
+                        for _ in range(colspan-1):
+                            row.append(None)
+                        if colspan > 1:
+                            span_commands.append(('SPAN', (col_idx, row_idx), (col_idx + colspan - 1, row_idx)))
+                        col_idx += colspan
+                        slot_idx += colspan
+                        found = True
+                        break
+                if not found:
+                    # If this is a makeup date, show 'Makeup Class'
+                    if date in makeup_dates:
+                        cell_content = Paragraph("Makeup Class", ParagraphStyle(
+                            'MakeupClass',
+                            fontName='Helvetica-Bold',
+                            fontSize=9,
+                            alignment=TA_CENTER,
+                            textColor=colors.blue,
+                            leading=10,
+                            spaceBefore=0,
+                            spaceAfter=0,
+                        ))
+                        row.append(cell_content)
+                    else:
+                        row.append("")
+                    col_idx += 1
+                    slot_idx += 1
+            table_data.append(row)
+
+        # Calculate available width for all tables
+        available_width = page_width - doc.leftMargin - doc.rightMargin
+
+        # Set column widths directly without depending on lunch_col_idx
+        num_cols = len(header_row)
+        date_col_width = 47   # decreased date column width
+        day_col_width = 47    # narrow day column
+
+        # Find the lunch break time label (if present)
+        lunch_break_label = None
+        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
+            lunch_break_label = f"{selected_semester.lunch_break_start.strftime('%H:%M')} - {selected_semester.lunch_break_end.strftime('%H:%M')}"
+
+        # Identify lunch break column index (if present)
+        lunch_col_idx = None
+        for idx, label in enumerate(header_row):
+            if lunch_break_label and label == lunch_break_label:
+                lunch_col_idx = idx
+                break
+        lunch_col_width = 60  # smaller width for lunch break column
+        # Calculate remaining width for other columns
+        if lunch_col_idx is not None:
+            remaining_width = available_width - date_col_width - day_col_width - lunch_col_width
+            other_col_count = num_cols - 3  # date, day, lunch
+        else:
+            remaining_width = available_width - date_col_width - day_col_width
+            other_col_count = num_cols - 2
+        other_col_width = remaining_width / other_col_count if other_col_count > 0 else 0
+
+        # Build column widths list
+        col_widths = []
+        for i in range(num_cols):
+            if i == 0:
+                col_widths.append(date_col_width)
+            elif i == 1:
+                col_widths.append(day_col_width)
+            elif i == lunch_col_idx:
+                col_widths.append(lunch_col_width)
+            else:
+                col_widths.append(other_col_width)
+
+        # Scale down if sum(col_widths) > available_width
+        total_width = sum(col_widths)
+        if total_width > available_width:
+            scale = available_width / total_width
+            col_widths = [w * scale for w in col_widths]
+
+        table = Table(table_data, colWidths=col_widths, repeatRows=1)
+        # Custom style for the table
+        style = TableStyle([
+            # Headers styling
+            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            # Alignment and spacing
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 2),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 2),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+            # Grid and borders
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('BOX', (0, 0), (-1, -1), 1, colors.black),
+            # Set a fixed row height
+            ('ROWHEIGHT', (0, 1), (-1, -1), 28),  # Reduced cell height
+            # Text wrapping for all cells
+            ('WORDWRAP', (0, 0), (-1, -1), True),
+        ])
+        # Add background color for lunch breaks and classes, and alternate row colors
+        for i, row in enumerate(table_data[1:], 1):
+            # Row background for non-class, non-break cells
+            even_row_bg = colors.HexColor('#e3f0fa')  # Even row background
+            odd_class_bg = colors.lightblue           # Odd row class cell
+            even_class_bg = colors.HexColor('#d0e6f7') # Even row class cell
+            row_bg = even_row_bg if i % 2 == 0 else None
+            # Set the background for the entire row if even (for non-class, non-break cells)
+            if row_bg:
+                style.add('BACKGROUND', (0, i), (-1, i), row_bg)
+            # Override with special colors for break and class cells
+            for j, cell in enumerate(row[2:], 2):
+                if isinstance(cell, Paragraph) and hasattr(cell, 'text') and "BREAK" in cell.text:
+                    style.add('BACKGROUND', (j, i), (j, i), colors.lightgrey)
+                elif cell:  # If there's content (a class)
+                    class_bg = odd_class_bg if i % 2 == 1 else even_class_bg
+                    style.add('BACKGROUND', (j, i), (j, i), class_bg)
+
+        # After creating the TableStyle, add the span commands
+        for cmd in span_commands:
+            style.add(*cmd)
+        table.setStyle(style)
+        elements.append(table)
+
+        # Add vertical space before the N.B. note
+        elements.append(Spacer(1, 6))  # 18 points = 0.25 inch
+
+        # Add the note section as a table for proper border and wrapping
+        note_text = (
+            "N.B.  For any changes in the schedule, concerned coordinator/class teachers are requested to inform the students and the Dean/Program Co-ordinator, School of Science and Technology, BOU in advance."
+        )
+        note_table = Table(
+            [[note_text]],
+            colWidths=[available_width]
+        )
+        note_table.setStyle(TableStyle([
+            ('BOX', (0, 0), (-1, -1), 3, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),  # Decreased font size
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),  # Reduced padding
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]))
+        elements.append(note_table)
+        elements.append(Spacer(1, 6))  # Gap below the N.B. note
+        elements.append(Paragraph("<br/>", styles['Normal']))
+
+        # Add the summary table of semester courses
+        semester_courses = SemesterCourse.objects.filter(semester=selected_semester).select_related('course', 'course__teacher')
+        summary_data = [[
+            'Course Code', 'Title', 'Number of Class', 'Course Teacher'
+        ]]
+        for sc in semester_courses:
+            teacher_full_name = sc.course.teacher.name + ' ('+sc.course.teacher.short_name+')'
+            if(sc.course.teacher.name == "N/A"):
+                teacher_full_name = ""
+            
+            if(sc.number_of_classes == 0):
+                sc.number_of_classes = ""
+            
+
+            summary_data.append([
+                sc.course.code,
+                sc.course.name,
+                str(sc.number_of_classes),
+                teacher_full_name
+            ])
+        summary_col_widths = [0.12 * available_width, 0.38 * available_width, 0.14 * available_width, 0.36 * available_width]
+        summary_table = Table(summary_data, colWidths=summary_col_widths)
+        summary_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.white),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BOX', (0, 0), (-1, -1), 2, colors.black),
+        ])
+        summary_table.setStyle(summary_style)
+        # --- SIGNATURE FIELD SECTION ---
+        signature_style = ParagraphStyle(
+            'SignatureStyle',
+            fontName='Helvetica',
+            fontSize=10,
+            alignment=TA_RIGHT,  # Right alignment
+            leading=6, # Reduced line height for less gap
+            spaceBefore=0,
+            spaceAfter=0,
+        )
+        signature_style_left = ParagraphStyle(
+            'SignatureStyleLeft',
+            fontName='Helvetica',
+            fontSize=10,
+            alignment=0,  # Left alignment
+            leading=6,
+            spaceBefore=0,
+            spaceAfter=0,
+        )
+        dean_line = Paragraph("Dean", signature_style)
+        school_line = Paragraph("School of Science and Technology", signature_style)
+        bou_line = Paragraph("Bangladesh Open University", signature_style)
+        coordinator_line = Paragraph("Program Co-ordinator", signature_style_left)
+        school_line_left = Paragraph("School of Science and Technology", signature_style_left)
+        bou_line_left = Paragraph("Bangladesh Open University", signature_style_left)
+        signature_data = [
+            [dean_line],
+            [school_line],
+            [bou_line]
+        ]
+        signature_data_left = [
+            [coordinator_line],
+            [school_line_left],
+            [bou_line_left]
+        ]
+        signature_table_width = 250 # Adjust as needed
+        signature_table = Table(signature_data, colWidths=[signature_table_width])
+        signature_table.setStyle(TableStyle([
+            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
+            ('LINEABOVE', (0,0), (0,0), 1, colors.black),
+            ('TOPPADDING', (0,0), (0,0), 4),
+        ]))
+        signature_table_left = Table(signature_data_left, colWidths=[signature_table_width])
+        signature_table_left.setStyle(TableStyle([
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('LINEABOVE', (0,0), (0,0), 1, colors.black),
+            ('TOPPADDING', (0,0), (0,0), 4),
+        ]))
+        wrapper_col_widths = [available_width - signature_table_width * 2, signature_table_width, signature_table_width]
+        signature_wrapper_table = Table([[signature_table_left, '', signature_table]], colWidths=wrapper_col_widths)
+        signature_wrapper_table.setStyle(TableStyle([
+            ('ALIGN', (0,0), (0,0), 'LEFT'),
+            ('ALIGN', (2,0), (2,0), 'RIGHT'),
+            ('VALIGN', (0,0), (-1,-1), 'BOTTOM'),
+            ('LEFTPADDING', (0,0), (-1,-1), 0),
+            ('RIGHTPADDING', (0,0), (-1,-1), 0),
+            ('TOPPADDING', (0,0), (-1,-1), 0),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+        ]))
+        # Wrap summary table and signature together
+        elements.append(KeepTogether([
+            summary_table,
+            Spacer(1, 48), # Gap before signature
+            signature_wrapper_table
+        ]))
+
+        # Build the PDF (only once)
+        doc.build(elements)
+        buffer.seek(0)
+        #response = FileResponse(buffer, content_type='application/pdf')
+        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{selected_semester.name}_Routine.pdf"'
+        return response
+
+    except Exception as e:
+        return HttpResponse(f"Error generating PDF file: {str(e)}", status=500)
+
+def _academic_calendar_doc(buffer):
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(A4),
+        rightMargin=54,
+        leftMargin=54,
+        topMargin=34,
+        bottomMargin=34
+    )
+
+def render_academic_calendar_pdf(semester_id):
+    """Build the academic calendar PDF response for a semester (runs in the export thread pool)"""
+    try:
+        selected_semester = Semester.objects.get(id=semester_id)
+        buffer = io.BytesIO()
+        doc = _academic_calendar_doc(buffer)
+        available_width = landscape(A4)[0] - doc.leftMargin - doc.rightMargin
+        events = academic_calendars([selected_semester])[selected_semester.id]
+        doc.build(academic_calendar_elements(selected_semester, events, available_width))
+        buffer.seek(0)
+        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{selected_semester.name}_Academic_Calendar.pdf"'
+        return response
+    except Exception as e:
+        return HttpResponse(f"Error generating Academic Calendar PDF: {str(e)}", status=500)
+
+def render_all_academic_calendars_pdf():
+    """Build one PDF with the academic calendar of every semester, a page each (runs in the export thread pool)"""
+    try:
+        semesters = list(Semester.objects.filter(start_date__isnull=False).order_by('order', 'name'))
+        buffer = io.BytesIO()
+        doc = _academic_calendar_doc(buffer)
+        available_width = landscape(A4)[0] - doc.leftMargin - doc.rightMargin
+        elements = []
+        for semester, events in zip(semesters, academic_calendars(semesters).values()):
+            if elements:
+                elements.append(PageBreak())
+            elements.extend(academic_calendar_elements(semester, events, available_width))
+        if not elements:
+            return HttpResponse("No semester has a date range yet.", status=404)
+        doc.build(elements)
+        buffer.seek(0)
+        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename="Academic_Calendars.pdf"'
+        return response
+    except Exception as e:
+        return HttpResponse(f"Error generating Academic Calendar PDF: {str(e)}", status=500)
+
+def academic_calendar_elements(selected_semester, events, available_width):
+    """Flowables of one semester's academic calendar page; events come from academic_calendar.semester_events"""
+    elements = []
+
+         # --- HEADER IMAGE SECTION ---
+    header_img_path = 'bou_routines_app/static/pdf_routine_top.png'
+    try:
+        # Padding for the image cell (matching routine table cell padding of 2)
+        padding_for_image = 2
+
+        # Create an Image object, scaled by width to fit within the available padded space
+        # Height will be auto-calculated to maintain aspect ratio.
+        img_obj = Image(header_img_path, width=available_width - (2 * padding_for_image), height=45)
+
+        # Put the image in a single-cell table whose width spans the available area,
+        # and apply padding to the cell to align the image correctly.
+        header_img_table = Table([[img_obj]], colWidths=[available_width])
+        header_img_table.setStyle(TableStyle([
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'), # Center the image horizontally within its cell
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'), # Center vertically
+            ('LEFTPADDING', (0,0), (-1, -1), padding_for_image),
+            ('RIGHTPADDING', (0,0), (-1, -1), padding_for_image),
+            ('TOPPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
+            ('BOTTOMPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
+        ]))
+        elements.append(header_img_table)
+    except Exception as e:
+        print(f"Error loading header image: {e}")
+        pass # If image not found, skip
+    elements.append(Spacer(1, -4))  # Minimal gap above program name
+
+    # Build left column (program/session/term/commencement/study center)
+    header_style = ParagraphStyle(
+        'HeaderStyle',
+        fontName='Helvetica-Bold',
+        fontSize=15,  # Reduced from 18
+        alignment=1,  # Center
+        leading=18,   # Reduced from 28
+        spaceAfter=0,
+        spaceBefore=0,
+    )
+    header_style_small = ParagraphStyle(
+        'HeaderStyleSmall',
+        fontName='Helvetica-Bold',
+        fontSize=11,  # Reduced from 14
+        alignment=1,
+        leading=14,   # Reduced from 22
+        spaceAfter=0,
+        spaceBefore=0,
+    )
+    header_style_normal = ParagraphStyle(
+        'HeaderStyleNormal',
+        fontName='Helvetica',
+        fontSize=10,   # Reduced from 12
+        alignment=1,
+        leading=11,   # Reduced from 20
+        spaceAfter=0,
+        spaceBefore=0,
+    )
+    header_style_bold = ParagraphStyle(
+        'HeaderStyleBold',
+        fontName='Helvetica-Bold',
+        fontSize=12,  # Reduced from 15
+        alignment=1,
+        leading=15,   # Reduced from 24
+        spaceAfter=0,
+        spaceBefore=0,
+    )
+
+    left_content = []
+    program_name = 'B. Sc in Computer Science and Engineering Program'
+    left_content.append(Paragraph(program_name, header_style))
+    session = selected_semester.session or ''
+    if session:
+        left_content.append(Paragraph(f'{session} Session', header_style_small))
+    term = selected_semester.term or ''
+    semester_full_name = selected_semester.semester_full_name or ''
+    if term or semester_full_name:
+        combined = f'{term} Term {semester_full_name}'.strip()
+        left_content.append(Paragraph(combined, header_style_small))
+    left_content.append(Spacer(1, 2))  # Reduced from 8
+    left_content.append(Paragraph('Academic Calender', header_style_bold))
+    commencement = selected_semester.start_date.strftime('%d %B %Y') if selected_semester.start_date else ''
+    study_center = selected_semester.study_center or ''
+    if commencement:
+        left_content.append(Paragraph(f'<b>Date of Commencement:</b> {commencement}', header_style_normal))
+    if study_center:
+        left_content.append(Paragraph(f'<b>Study Center:</b> {study_center}', header_style_normal))
+
+    # Build right column (contact person box)
+    contact_info_lines = []
+    contact_label = Paragraph(
+        'Contact Person',
+        ParagraphStyle(
+            'ContactLabel',
+            fontName='Helvetica-Bold',
+            fontSize=11,
+            alignment=0,  # Left align
+            textColor=colors.white,
+            spaceAfter=0,
+            spaceBefore=0,
+            leading=14,
+        )
+    )
+    # Add 4px gap below the label using a single-cell table row with bottom padding
+    contact_label_table = Table(
+        [[contact_label]],
+        colWidths=[180],
+        hAlign='RIGHT',
+        style=TableStyle([
+            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+            ('TOPPADDING', (0,0), (-1,-1), -3),
+            ('LEFTPADDING', (0,0), (-1,-1), 0),
+            ('RIGHTPADDING', (0,0), (-1,-1), 0),
+        ])
+    )
+    if selected_semester.contact_person:
+        contact_info_lines.append(selected_semester.contact_person)
+    if selected_semester.contact_person_designation:
+        contact_info_lines.append(selected_semester.contact_person_designation)
+    contact_info_lines.append('School of Science and Technology')
+    contact_info_lines.append('Bangladesh Open University')
+    if selected_semester.contact_person_phone:
+        contact_info_lines.append(f'Phone/Whatsapp: {selected_semester.contact_person_phone}')
+    if selected_semester.contact_person_email:
+        contact_info_lines.append(f'email:{selected_semester.contact_person_email}')
+    contact_info_para = Paragraph(
+        '<br/>'.join(contact_info_lines),
+        ParagraphStyle(
+            'ContactBox',
+            fontName='Helvetica',
+            fontSize=10,
+            alignment=0,  # Left align
+            textColor=colors.black,
+            leftIndent=2,
+            leading=10,
+            spaceBefore=0,
+            spaceAfter=0,
+        )
+    )
+    contact_table = Table(
+        [[contact_label_table], [contact_info_para]],
+        colWidths=[180],
+        hAlign='RIGHT',
+    )
+    contact_table.setStyle(TableStyle([
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),  # Single, lighter border
+        ('ROUNDED', (0, 0), (-1, -1), 6),  # Rounded corners
+        ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#2c3e50')),  # Label bg
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (0, 0), 6),  # Label row
+        ('BOTTOMPADDING', (0, 0), (0, 0), 4),  # Label row
+        ('TOPPADDING', (0, 1), (0, 1), 4),  # Info row
+        ('BOTTOMPADDING', (0, 1), (0, 1), 6),  # Info row
+    ]))
+
+    # Vertically center the left header content to match the contact box
+    left_box_table = Table(
+        [[left_content]],
+        colWidths=[available_width-180],
+        hAlign='LEFT',
+        style=TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ])
+    )
+    two_col_table = Table(
+        [[left_box_table, contact_table]],
+        colWidths=[available_width-180, 180],
+        hAlign='LEFT'
+    )
+    two_col_table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (0, 0), 'MIDDLE'),
+        ('VALIGN', (1, 0), (1, 0), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+    ]))
+    elements.append(Spacer(1, 4))  # Add slight gap before contact box
+    elements.append(two_col_table)
+    elements.append(Spacer(1, 4))  # Reduced from 16
+
+    # --- Academic Calendar Table ---
+    events = [(event['name'], format_event_dates(event)) for event in events]
+
+    # Table data
+    table_data = [["Events", "Dates"]] + events
+    col_widths = [0.6 * available_width, 0.4 * available_width]
+    table = Table(table_data, colWidths=col_widths)
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),
+    ])
+    table.setStyle(style)
+    elements.append(table)
+
+    # Add dean's signature block at the bottom (like export_to_pdf)
+    signature_style = ParagraphStyle(
+        'SignatureStyle',
+        fontName='Helvetica',
+        fontSize=10,
+        alignment=TA_RIGHT,
+        leading=6,
+        spaceBefore=0,
+        spaceAfter=0,
+    )
+    signature_style_left = ParagraphStyle(
+        'SignatureStyleLeft',
+        fontName='Helvetica',
+        fontSize=10,
+        alignment=0,  # Left alignment
+        leading=6,
+        spaceBefore=0,
+        spaceAfter=0,
+    )
+    dean_line = Paragraph("Dean", signature_style)
+    school_line = Paragraph("School of Science and Technology", signature_style)
+    bou_line = Paragraph("Bangladesh Open University", signature_style)
+    coordinator_line = Paragraph("Program Co-ordinator", signature_style_left)
+    school_line_left = Paragraph("School of Science and Technology", signature_style_left)
+    bou_line_left = Paragraph("Bangladesh Open University", signature_style_left)
+    signature_data = [
+        [dean_line],
+        [school_line],
+        [bou_line]
+    ]
+    signature_data_left = [
+        [coordinator_line],
+        [school_line_left],
+        [bou_line_left]
+    ]
+    signature_table_width = 250
+    signature_table = Table(signature_data, colWidths=[signature_table_width])
+    signature_table.setStyle(TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
+        ('LINEABOVE', (0,0), (0,0), 1, colors.black),
+        ('TOPPADDING', (0,0), (0,0), 4),
+    ]))
+    signature_table_left = Table(signature_data_left, colWidths=[signature_table_width])
+    signature_table_left.setStyle(TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('LINEABOVE', (0,0), (0,0), 1, colors.black),
+        ('TOPPADDING', (0,0), (0,0), 4),
+    ]))
+    wrapper_col_widths = [available_width - signature_table_width * 2, signature_table_width, signature_table_width]
+    signature_wrapper_table = Table([[signature_table_left, '', signature_table]], colWidths=wrapper_col_widths)
+    signature_wrapper_table.setStyle(TableStyle([
+        ('ALIGN', (0,0), (0,0), 'LEFT'),
+        ('ALIGN', (2,0), (2,0), 'RIGHT'),
+        ('VALIGN', (0,0), (-1,-1), 'BOTTOM'),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+        ('TOPPADDING', (0,0), (-1,-1), 0),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+    ]))
+    elements.append(Spacer(1, 48))
+    elements.append(signature_wrapper_table)
+    return elements
+
+def _teacher_file_stem(teacher):
+    return (teacher.short_name or teacher.name).replace(' ', '_').replace('.', '')
+
+def _teacher_cell_text(cell, separator):
+    content = cell['content']
+    return f"{content['course_code']}{separator}({content['semester']})" if content else ""
+
+def render_teacher_timetable_excel(teacher_id):
+    """Build the Excel timetable of a teacher across all semesters (runs in the export thread pool or a batch worker)"""
+    try:
+        teacher = Teacher.objects.get(id=teacher_id)
+        table = build_teacher_table(teacher)
+
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output)
+        worksheet = workbook.add_worksheet("Timetable")
+        title_format = workbook.add_format({'bold': True, 'font_size': 14, 'align': 'center', 'valign': 'vcenter'})
+        header_format = workbook.add_format({
+            'bold': True, 'font_size': 12, 'align': 'center', 'valign': 'vcenter',
+            'bg_color': '#2c3e50', 'font_color': 'white', 'border': 1,
+        })
+        cell_format = workbook.add_format({'align': 'center', 'valign': 'vcenter', 'border': 1})
+        date_format = workbook.add_format({'align': 'center', 'valign': 'vcenter', 'border': 1, 'bold': True, 'num_format': 'dd/mm/yyyy'})
+        course_format = workbook.add_format({
+            'align': 'center', 'valign': 'vcenter', 'border': 1,
+            'bg_color': '#3498db', 'font_color': 'white', 'text_wrap': True,
+        })
+
+        last_col = max(len(table['time_slot_labels']) + 1, 1)
+        worksheet.merge_range(0, 0, 0, last_col, f"{teacher.name} Timetable", title_format)
+        worksheet.merge_range(1, 0, 1, last_col, ", ".join(
+            f"{semester['name']}: {semester['classes']} classes" for semester in table['semesters']
+        ), cell_format)
+        row = 3
+        worksheet.write(row, 0, "Date", header_format)
+        worksheet.write(row, 1, "Day", header_format)
+        for col, label in enumerate(table['time_slot_labels']):
+            worksheet.write(row, col + 2, label, header_format)
+        worksheet.set_column(0, 0, 12)
+        worksheet.set_column(1, 1, 10)
+        worksheet.set_column(2, last_col, 15)
+
+        for table_row in table['routine_table_rows']:
+            row += 1
+            worksheet.write(row, 0, table_row['date'], date_format)
+            worksheet.write(row, 1, table_row['day'], cell_format)
+            col = 2
+            for cell in table_row['cells']:
+                text = _teacher_cell_text(cell, ' ')
+                cell_style = course_format if text else cell_format
+                if cell['colspan'] > 1:
+                    worksheet.merge_range(row, col, row, col + cell['colspan'] - 1, text, cell_style)
+                else:
+                    worksheet.write(row, col, text, cell_style)
+                col += cell['colspan']
+            worksheet.set_row(row, 40)
+
+        workbook.close()
+        output.seek(0)
+        response = HttpResponse(output.read(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        response['Content-Disposition'] = f'attachment; filename="{_teacher_file_stem(teacher)}_Timetable.xlsx"'
+        return response
+    except Exception as e:
+        return HttpResponse(f"Error generating Excel file: {str(e)}", status=500)
+
+def render_teacher_timetable_pdf(teacher_id):
+    """Build the PDF timetable of a teacher across all semesters (runs in the export thread pool or a batch worker)"""
+    try:
+        teacher = Teacher.objects.get(id=teacher_id)
+        table = build_teacher_table(teacher)
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=54, leftMargin=54, topMargin=34, bottomMargin=34)
+        available_width = landscape(A4)[0] - doc.leftMargin - doc.rightMargin
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle('TimetableTitle', parent=styles['Title'], fontSize=15, leading=18, alignment=TA_CENTER)
+        cell_style = ParagraphStyle('TimetableCell', fontName='Helvetica-Bold', fontSize=8, leading=10, alignment=TA_CENTER)
+
+        elements = [
+            Paragraph(f"{teacher.name} Timetable", title_style),
+            Paragraph(", ".join(
+                f"{semester['name']}: {semester['classes']} classes" for semester in table['semesters']
+            ) or "No classes scheduled.", styles['Normal']),
+            Spacer(1, 8),
+        ]
+        if table['routine_table_rows']:
+            labels = table['time_slot_labels']
+            data = [["Date", "Day", *labels]]
+            style = [
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ]
+            for row_idx, table_row in enumerate(table['routine_table_rows'], start=1):
+                row = [table_row['date'].strftime('%d/%m/%Y'), table_row['day']]
+                col = 2
+                for cell in table_row['cells']:
+                    text = _teacher_cell_text(cell, '<br/>')
+                    row.append(Paragraph(text, cell_style) if text else "")
+                    row.extend([""] * (cell['colspan'] - 1))
+                    if cell['colspan'] > 1:
+                        style.append(('SPAN', (col, row_idx), (col + cell['colspan'] - 1, row_idx)))
+                    if text:
+                        style.append(('BACKGROUND', (col, row_idx), (col + cell['colspan'] - 1, row_idx), colors.HexColor('#d1ecf1')))
+                    col += cell['colspan']
+                data.append(row)
+            slot_width = (available_width - 130) / max(len(labels), 1)
+            routine_table = Table(data, colWidths=[70, 60] + [slot_width] * len(labels), repeatRows=1)
+            routine_table.setStyle(TableStyle(style))
+            elements.append(routine_table)
+
+        doc.build(elements)
+        buffer.seek(0)
+        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{_teacher_file_stem(teacher)}_Timetable.pdf"'
+        return response
+    except Exception as e:
+        return HttpResponse(f"Error generating PDF file: {str(e)}", status=500)
@@ -1,7 +1,37 @@
 from django import forms
-from .models import CurrentRoutine
+from .models import CalendarEventRule, CurrentRoutine, Semester, WEEKDAYS
+from .weekdays import mask_weekdays, weekday_mask
 
 class RoutineForm(forms.ModelForm):
     class Meta:
         model = CurrentRoutine
-        fields = ['semester', 'course', 'start_time', 'end_time', 'day']
\ No newline at end of file
+        fields = ['semester', 'course', 'start_time', 'end_time', 'day']
+
+class WeekdayMaskField(forms.TypedMultipleChoiceField):
+    """Weekday bitmask (see weekdays.py) edited as one checkbox per weekday"""
+
+    def __init__(self, **kwargs):
+        super().__init__(choices=list(enumerate(WEEKDAYS)), coerce=int, widget=forms.CheckboxSelectMultiple, **kwargs)
+
+    def prepare_value(self, value):
+        return mask_weekdays(value) if isinstance(value, int) else value
+
+    def has_changed(self, initial, data):
+        return super().has_changed(self.prepare_value(initial), data)
+
+    def clean(self, value):
+        return weekday_mask(super().clean(value))
+
+class SemesterAdminForm(forms.ModelForm):
+    class_days = WeekdayMaskField(help_text="Weekdays classes are held on")
+
+    class Meta:
+        model = Semester
+        fields = '__all__'
+
+class CalendarEventRuleAdminForm(forms.ModelForm):
+    weekdays = WeekdayMaskField(required=False, help_text="Leave empty to use the semester's class days")
+
+    class Meta:
+        model = CalendarEventRule
+        fields = '__all__'
@@ -0,0 +1,228 @@
+import math
+from datetime import datetime
+
+from django.db import transaction
+
+from .makeup import place_shortfall
+from .models import CurrentRoutine, NewRoutine, SemesterCourse, bump_semester_revision
+from .occupancy import weekday_index
+from .weekdays import weekday_dates
+
+
+def parse_date_list(value):
+    """Parse a comma-separated list of YYYY-MM-DD dates (as stored on Semester)"""
+    if not value:
+        return []
+    return [
+        datetime.strptime(date.strip(), "%Y-%m-%d").date()
+        for date in value.split(',')
+        if date.strip()
+    ]
+
+
+def course_sessions_needed(semester, course, number_of_classes, slot_minutes):
+    """Sessions of slot_minutes needed to teach number_of_classes classes of a course (rounded up)"""
+    if 'P' in course.code:
+        class_duration = semester.lab_class_duration_minutes
+    else:
+        class_duration = semester.theory_class_duration_minutes
+    return math.ceil(number_of_classes * class_duration / slot_minutes)
+
+
+def weekly_course_sessions(semester):
+    """
+    {course_id: (slot, sessions_needed)} for the semester's courses that have a saved weekly slot.
+
+    slot is the course's first CurrentRoutine row (course selected), as generation only uses the
+    first schedule row of a course.
+    """
+    allowed = dict(SemesterCourse.objects.filter(semester=semester).values_list('course_id', 'number_of_classes'))
+    sessions = {}
+    for slot in CurrentRoutine.objects.filter(semester=semester, course_id__in=allowed).select_related('course').order_by('id'):
+        if slot.course_id in sessions or not (slot.start_time and slot.end_time):
+            continue
+        slot_minutes = (slot.end_time.hour * 60 + slot.end_time.minute) - (slot.start_time.hour * 60 + slot.start_time.minute)
+        if slot_minutes > 0:
+            sessions[slot.course_id] = (slot, course_sessions_needed(semester, slot.course, allowed[slot.course_id], slot_minutes))
+    return sessions
+
+
+def generate_semester_routines(semester, schedule_rows, start_date, end_date, progress_callback=None):
+    """
+    Generate the day-by-day NewRoutine entries for a semester.
+
+    schedule_rows is a list of (course_id, day, start_time, end_time) tuples taken from
+    the weekly class schedule, with times as 'HH:MM' strings. Existing NewRoutine and
+    CurrentRoutine entries of the semester are replaced. Classes that do not fit on the
+    regular dates are placed on the semester's makeup dates where possible.
+
+    Returns (generated_routines, warnings) where generated_routines has the same shape
+    the generate page uses for display.
+    """
+    days = [row[1] for row in schedule_rows]
+    course_codes = [row[0] for row in schedule_rows]
+    start_times = [row[2] for row in schedule_rows]
+    end_times = [row[3] for row in schedule_rows]
+
+    generated_routines = []
+    warnings = []
+
+    with transaction.atomic():
+        # Clear any existing generated routines for this semester
+        NewRoutine.objects.filter(semester=semester).delete()
+        # Also clear existing CurrentRoutine entries for this semester
+        CurrentRoutine.objects.filter(semester=semester).delete()
+
+        holiday_dates = parse_date_list(semester.holidays)
+        makeup_dates = parse_date_list(semester.makeup_dates)
+
+        # --- CLASS COUNT LIMIT LOGIC ---
+        # Build a map: course_id -> (allowed_classes, is_lab, slot_minutes)
+        semester_courses = SemesterCourse.objects.filter(semester=semester).select_related('course', 'course__teacher')
+        course_limits = {}
+        for sc in semester_courses:
+            is_lab = 'P' in sc.course.code
+            slot_minutes = None
+            for i in range(len(days)):
+                if str(course_codes[i]) == str(sc.course.id):
+                    start_time_str = start_times[i]
+                    end_time_str = end_times[i]
+                    if start_time_str and end_time_str:
+                        start = datetime.strptime(start_time_str, "%H:%M").time()
+                        end = datetime.strptime(end_time_str, "%H:%M").time()
+                        slot_minutes = (datetime.combine(datetime.min, end) - datetime.combine(datetime.min, start)).total_seconds() / 60
+                        break
+            course_limits[str(sc.course.id)] = {
+                'allowed': sc.number_of_classes,
+                'is_lab': is_lab,
+                'slot_minutes': slot_minutes,
+                'start_time': start_time_str if slot_minutes else None,
+                'end_time': end_time_str if slot_minutes else None,
+                'day': days[i] if slot_minutes else None,
+                'course': sc.course,
+            }
+
+        # Build a set of makeup/reserve dates
+        makeup_dates_set = set(makeup_dates)
+        # Build a set of holiday dates
+        holiday_dates_set = set(holiday_dates)
+
+        shortfalls = []
+
+        # For each course, build a list of all valid dates (its weekday, not in makeup_dates, not in holidays, not after end_date)
+        valid_dates_by_weekday = {}
+        class_weekdays = set(semester.class_weekdays)
+        total = len(course_limits)
+        for done, (course_id, limit) in enumerate(course_limits.items(), start=1):
+            if not limit['slot_minutes']:
+                if progress_callback:
+                    progress_callback(done, total)
+                continue  # skip if no slot info
+            # Calculate how many sessions are needed (round up)
+            sessions_needed = course_sessions_needed(semester, limit['course'], limit['allowed'], limit['slot_minutes'])
+            weekday = weekday_index(limit['day'])
+            if weekday not in class_weekdays:
+                warnings.append(f"{limit['course'].code} is scheduled on {limit['day']}, which is not a class day of {semester.name}.")
+                if progress_callback:
+                    progress_callback(done, total)
+                continue
+            # Build all valid dates for this course, shared by the courses on the same weekday
+            if weekday not in valid_dates_by_weekday:
+                valid_dates_by_weekday[weekday] = [
+                    d for d in weekday_dates(start_date, end_date, weekday)
+                    if d not in makeup_dates_set and d not in holiday_dates_set
+                ]
+            valid_dates = valid_dates_by_weekday[weekday]
+            start = datetime.strptime(limit['start_time'], "%H:%M").time()
+            end = datetime.strptime(limit['end_time'], "%H:%M").time()
+            # Schedule up to sessions_needed or as many as possible
+            sessions_scheduled = 0
+            for d in valid_dates:
+                if sessions_scheduled >= sessions_needed:
+                    break
+                NewRoutine.objects.create(
+                    semester=semester,
+                    course=limit['course'],
+                    start_time=start,
+                    end_time=end,
+                    day=limit['day'],
+                    class_date=d
+                )
+                generated_routines.append({
+                    'id': None,
+                    'course_id': limit['course'].id,
+                    'date': d,
+                    'day': limit['day'],
+                    'course_code': limit['course'].code,
+                    'course_name': limit['course'].name,
+                    'teacher': limit['course'].teacher.name,
+                    'start_time': limit['start_time'],
+                    'end_time': limit['end_time']
+                })
+                sessions_scheduled += 1
+            if sessions_scheduled:
+                CurrentRoutine.objects.update_or_create(
+                    semester=semester,
+                    course=limit['course'],
+                    day=limit['day'],
+                    defaults={
+                        'start_time': start,
+                        'end_time': end
+                    }
+                )
+            # If not enough valid dates, try the makeup dates below
+            if sessions_scheduled < sessions_needed:
+                shortfalls.append((limit['course'], sessions_needed, sessions_scheduled, limit))
+            if progress_callback:
+                progress_callback(done, total)
+
+        # Place the missing classes on the makeup dates, within the semester's teaching hours
+        if shortfalls:
+            lunch_break = None
+            if semester.lunch_break_start and semester.lunch_break_end:
+                lunch_break = (semester.lunch_break_start, semester.lunch_break_end)
+            timed = [i for i in range(len(days)) if start_times[i] and end_times[i]]
+            placed, unplaced = place_shortfall(
+                semester,
+                [
+                    (course, needed - scheduled, int(limit['slot_minutes']), (limit['start_time'], limit['end_time']))
+                    for course, needed, scheduled, limit in shortfalls
+                ],
+                makeup_dates_set - holiday_dates_set,
+                min(start_times[i] for i in timed),
+                max(end_times[i] for i in timed),
+                lunch_break,
+            )
+            for course, needed, scheduled, limit in shortfalls:
+                for class_date, start_str, end_str in placed.get(course.id, []):
+                    NewRoutine.objects.create(
+                        semester=semester,
+                        course=course,
+                        start_time=datetime.strptime(start_str, "%H:%M").time(),
+                        end_time=datetime.strptime(end_str, "%H:%M").time(),
+                        day=class_date.strftime('%A'),
+                        class_date=class_date
+                    )
+                    generated_routines.append({
+                        'id': None,
+                        'course_id': course.id,
+                        'date': class_date,
+                        'day': class_date.strftime('%A'),
+                        'course_code': course.code,
+                        'course_name': course.name,
+                        'teacher': course.teacher.name,
+                        'start_time': start_str,
+                        'end_time': end_str
+                    })
+                if course.id in placed:
+                    dates = ", ".join(class_date.strftime('%d/%m/%Y') for class_date, _, _ in placed[course.id])
+                    warnings.append(f"{len(placed[course.id])} of the classes of {course.code} that did not fit the semester dates were placed on makeup dates ({dates}).")
+                if course.id in unplaced:
+                    warnings.append(f"Only {needed - unplaced[course.id]} out of {needed} classes could be scheduled for {course.code}, including makeup dates. Please add the remaining classes manually.")
+
+        # One bump for the whole replacement (NewRoutine writes send no revision signals)
+        bump_semester_revision([semester.id])
+
+    # Sort generated routines by date and time for display
+    generated_routines.sort(key=lambda x: (x['date'], x['start_time']))
+    return generated_routines, warnings
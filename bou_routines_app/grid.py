@@ -0,0 +1,372 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from threading import Lock
+
+from .generation import parse_date_list
+from .models import NewRoutine, Semester, SemesterCourse
+
+
+def teacher_label(course, short=False):
+    """Teacher text shown in a routine cell for a course"""
+    return _teacher_label(course.code, course.teacher.name, course.teacher.short_name, short)
+
+
+def _teacher_label(code, name, short_name, short=False):
+    if code == 'CSE4246':
+        return 'Supervisor'
+    return short_name if short else name
+
+
+def lunch_break_interval(semester):
+    """('HH:MM', 'HH:MM') lunch break of a semester, or None"""
+    if semester.lunch_break_start and semester.lunch_break_end:
+        return (semester.lunch_break_start.strftime('%H:%M'), semester.lunch_break_end.strftime('%H:%M'))
+    return None
+
+
+def build_slot_ranges(intervals, lunch_break=None):
+    """
+    Build the merged time slot columns of a routine table.
+
+    intervals is an iterable of ('HH:MM', 'HH:MM') class times. Every start and end time is a
+    column boundary; only the columns covered by a class or by the lunch break are kept.
+    Returns a list of (start, end) tuples.
+    """
+    intervals = set(intervals)
+    if lunch_break:
+        intervals.add(lunch_break)
+    boundaries = sorted({t for interval in intervals for t in interval})
+    used = set()
+    for start, end in intervals:
+        # Columns i with boundaries[i] >= start and boundaries[i + 1] <= end
+        first = bisect_left(boundaries, start)
+        last = bisect_left(boundaries, end)
+        used.update(range(first, last))
+    return [(boundaries[i], boundaries[i + 1]) for i in sorted(used)]
+
+
+def merge_row(row_intervals, slot_ranges):
+    """
+    Place the classes of one table row onto the slot columns.
+
+    row_intervals is a list of (start, end, payload) sorted by start time. Returns a list of
+    (slot_index, colspan, payload) for the classes that start on a column boundary; when two
+    classes start at the same time the first one wins, like the routine tables always did.
+    """
+    slot_index = {start: i for i, (start, _) in enumerate(slot_ranges)}
+    slot_ends = [end for _, end in slot_ranges]
+    cells = []
+    taken_until = 0
+    for start, end, payload in row_intervals:
+        idx = slot_index.get(start)
+        if idx is None or idx < taken_until:
+            continue
+        colspan = bisect_right(slot_ends, end, lo=idx) - idx
+        if colspan <= 0:
+            continue
+        cells.append((idx, colspan, payload))
+        taken_until = idx + colspan
+    return cells
+
+
+class SemesterGridState:
+    """
+    Routine grid of one semester kept in memory, so an edit only re-merges the rows it touches.
+
+    rows maps each date to its classes [(start, end, routine_id, course_id)] sorted by start.
+    The slot columns depend only on the set of distinct class times, so interval_counts keeps
+    how many classes use each (start, end) and the columns are recomputed from its keys alone.
+    """
+
+    def __init__(self, semester):
+        self.semester = {'id': semester.id, 'name': semester.name}
+        self.revision = semester.revision
+        self.lunch_break = lunch_break_interval(semester)
+        self.makeup_dates = set(parse_date_list(semester.makeup_dates))
+        self.rows = {}
+        self.days = {}
+        self.routine_dates = {}
+        self.interval_counts = Counter()
+        self.courses = {}
+        self.slot_ranges = []
+
+    @classmethod
+    def build(cls, semester):
+        state = cls(semester)
+        state.load(NewRoutine.objects.filter(semester=semester))
+        return state
+
+    def load(self, routines):
+        """Add the timed routines of a NewRoutine queryset (with their course columns) in one query"""
+        routines = routines.filter(start_time__isnull=False, end_time__isnull=False)
+        for (routine_id, class_date, day, start, end, course_id,
+             code, name, teacher_name, teacher_short_name) in routines.order_by('class_date', 'start_time').values_list(
+            'id', 'class_date', 'day', 'start_time', 'end_time', 'course_id',
+            'course__code', 'course__name', 'course__teacher__name', 'course__teacher__short_name',
+        ):
+            self.courses[course_id] = [
+                course_id, code, name,
+                _teacher_label(code, teacher_name, teacher_short_name),
+                _teacher_label(code, teacher_name, teacher_short_name, short=True),
+            ]
+            start, end = start.strftime('%H:%M'), end.strftime('%H:%M')
+            insort(self.rows.setdefault(class_date, []), (start, end, routine_id, course_id))
+            self.days.setdefault(class_date, day)
+            self.routine_dates[routine_id] = class_date
+            self.interval_counts[(start, end)] += 1
+        self.slot_ranges = build_slot_ranges(self.interval_counts, self.lunch_break)
+
+    def remove(self, routine_ids):
+        """Drop routines from the grid; returns the dates whose rows changed"""
+        dates = set()
+        for routine_id in routine_ids:
+            class_date = self.routine_dates.pop(routine_id, None)
+            if class_date is None:
+                continue
+            row = self.rows[class_date]
+            entry = next(entry for entry in row if entry[2] == routine_id)
+            row.remove(entry)
+            self.interval_counts[entry[:2]] -= 1
+            if not self.interval_counts[entry[:2]]:
+                del self.interval_counts[entry[:2]]
+            if not row:
+                del self.rows[class_date]
+                del self.days[class_date]
+            dates.add(class_date)
+        self.slot_ranges = build_slot_ranges(self.interval_counts, self.lunch_break)
+        return dates
+
+    def grid(self, dates=None):
+        """
+        Compact, columnar representation of the grid, or of some of its rows only.
+
+        slots:   [[start, end], ...] merged time slot columns
+        dates:   [[YYYY-MM-DD, day, is_makeup], ...] table rows
+        courses: [[course_id, code, name, teacher, teacher_short], ...]
+        cells:   [[date_index, slot_index, colspan, course_index, routine_id], ...]
+        lunch:   [slot_index, colspan] of the lunch break column (shown on every row), or None
+        """
+        if dates is None:
+            dates = set(self.rows) | self.makeup_dates
+        dates = sorted(d for d in dates if d in self.rows or d in self.makeup_dates)
+
+        placed = []
+        for date_idx, class_date in enumerate(dates):
+            row_intervals = [(start, end, (routine_id, course_id)) for start, end, routine_id, course_id in self.rows.get(class_date, ())]
+            for slot_idx, colspan, (routine_id, course_id) in merge_row(row_intervals, self.slot_ranges):
+                placed.append((date_idx, slot_idx, colspan, course_id, routine_id))
+        course_ids = sorted({cell[3] for cell in placed})
+        course_index = {course_id: i for i, course_id in enumerate(course_ids)}
+
+        lunch = None
+        if self.lunch_break and self.slot_ranges:
+            lunch_cells = merge_row([(self.lunch_break[0], self.lunch_break[1], None)], self.slot_ranges)
+            if lunch_cells:
+                lunch = [lunch_cells[0][0], lunch_cells[0][1]]
+
+        return {
+            'semester': self.semester,
+            'revision': self.revision,
+            'slots': [[start, end] for start, end in self.slot_ranges],
+            'dates': [
+                [d.strftime('%Y-%m-%d'), self.days.get(d) or d.strftime('%A'), 1 if d in self.makeup_dates else 0]
+                for d in dates
+            ],
+            'courses': [self.courses[course_id] for course_id in course_ids],
+            'cells': [
+                [date_idx, slot_idx, colspan, course_index[course_id], routine_id]
+                for date_idx, slot_idx, colspan, course_id, routine_id in placed
+            ],
+            'lunch': lunch,
+        }
+
+
+_grid_states = {}
+_grid_states_lock = Lock()
+
+
+def get_grid_state(semester):
+    """Per-process grid state of a semester, rebuilt only when its revision moved on"""
+    with _grid_states_lock:
+        state = _grid_states.get(semester.id)
+        if state is None or state.revision != semester.revision:
+            state = _grid_states[semester.id] = SemesterGridState.build(semester)
+        return state
+
+
+def build_semester_grid(semester):
+    """Whole routine grid of a semester in compact columnar form (see SemesterGridState.grid)"""
+    state = get_grid_state(semester)
+    with _grid_states_lock:
+        return state.grid()
+
+
+def record_grid_change(state, removed_ids=(), changed_ids=(), bumps=1, client_revision=None):
+    """
+    Apply our own write to a grid state taken before it and return the grid patch for the client.
+
+    removed_ids are routines deleted or moved by the write, changed_ids the routines created or
+    updated by it (both may hold the same id), and bumps how many revision bumps the write made.
+    The patch has the grid format plus full and removed_dates: when full is false it only holds
+    the rows of the dates the write touched; it is the whole grid when the slot columns moved, the
+    semester was changed by somebody else meanwhile, or the client's grid (client_revision) is stale.
+    """
+    semester = Semester.objects.get(id=state.semester['id'])
+    with _grid_states_lock:
+        old_revision = state.revision
+        if _grid_states.get(semester.id) is not state or semester.revision != old_revision + bumps:
+            state = _grid_states[semester.id] = SemesterGridState.build(semester)
+            return dict(state.grid(), full=True, removed_dates=[])
+
+        old_slots = state.slot_ranges
+        dates = state.remove(removed_ids)
+        if changed_ids:
+            changed = NewRoutine.objects.filter(id__in=changed_ids)
+            dates.update(changed.values_list('class_date', flat=True))
+            state.load(changed)
+        state.revision = semester.revision
+
+        if state.slot_ranges != old_slots or (client_revision is not None and client_revision != old_revision):
+            return dict(state.grid(), full=True, removed_dates=[])
+        patch = state.grid(dates)
+        shown = {d[0] for d in patch['dates']}
+        patch['removed_dates'] = sorted(d.strftime('%Y-%m-%d') for d in dates if d.strftime('%Y-%m-%d') not in shown)
+        patch['full'] = False
+        return patch
+
+
+def build_routine_table(semester):
+    """
+    Server-rendered routine table of a semester (download page / _routine_table.html).
+
+    Returns a dict with time_slot_labels, routine_table_rows ([{date, day, cells}]),
+    routine_count and makeup_dates. Only dates that have classes get a row.
+    """
+    routines = list(
+        NewRoutine.objects.filter(semester=semester)
+        .select_related('course', 'course__teacher')
+        .order_by('class_date', 'start_time')
+    )
+    lunch_break = lunch_break_interval(semester)
+    slot_ranges = build_slot_ranges(
+        ((r.start_time.strftime('%H:%M'), r.end_time.strftime('%H:%M')) for r in routines), lunch_break
+    )
+
+    rows = {}
+    for routine in routines:
+        day, row_intervals = rows.setdefault(routine.class_date, (routine.day, []))
+        row_intervals.append((
+            routine.start_time.strftime('%H:%M'),
+            routine.end_time.strftime('%H:%M'),
+            {'course_code': routine.course.code, 'teacher': teacher_label(routine.course, short=True)},
+        ))
+
+    routine_table_rows = []
+    for class_date, (day, row_intervals) in rows.items():
+        if lunch_break:
+            row_intervals.append((lunch_break[0], lunch_break[1], None))
+        row_intervals.sort(key=lambda interval: interval[0])
+        placed = {slot_idx: (colspan, content) for slot_idx, colspan, content in merge_row(row_intervals, slot_ranges)}
+        cells = []
+        slot_idx = 0
+        while slot_idx < len(slot_ranges):
+            if slot_idx in placed:
+                colspan, content = placed[slot_idx]
+                if content is None:
+                    cells.append({'content': 'BREAK', 'colspan': colspan, 'is_lunch_break': True})
+                else:
+                    cells.append({'content': content, 'colspan': colspan, 'is_lunch_break': False})
+                slot_idx += colspan
+            else:
+                cells.append({'content': '', 'colspan': 1, 'is_lunch_break': False})
+                slot_idx += 1
+        routine_table_rows.append({'date': class_date, 'day': day, 'cells': cells})
+
+    return {
+        'time_slot_labels': [f"{start} - {end}" for start, end in slot_ranges],
+        'routine_table_rows': routine_table_rows,
+        'routine_count': len(routines),
+        'makeup_dates': parse_date_list(semester.makeup_dates),
+    }
+
+
+def build_teacher_table(teacher):
+    """
+    Timetable of a teacher across every semester, in the shape of build_routine_table.
+
+    All their classes come from one query (the course__teacher join is indexed on both sides)
+    and are merged onto slot columns with build_slot_ranges/merge_row like a semester's table.
+    Cells are {course_code, semester}; semesters lists [{name, classes}] in semester order.
+    """
+    routines = list(
+        NewRoutine.objects.filter(course__teacher=teacher, start_time__isnull=False, end_time__isnull=False)
+        .order_by('class_date', 'start_time', 'semester__order')
+        .values_list('class_date', 'day', 'start_time', 'end_time', 'course__code', 'semester__name', 'semester__order')
+    )
+    rows = {}
+    semesters = {}
+    for class_date, day, start, end, code, semester_name, semester_order in routines:
+        _, row_intervals = rows.setdefault(class_date, (day, []))
+        row_intervals.append((start.strftime('%H:%M'), end.strftime('%H:%M'), {'course_code': code, 'semester': semester_name}))
+        semesters[semester_name] = (semester_order, semesters.get(semester_name, (0, 0))[1] + 1)
+    slot_ranges = build_slot_ranges((start, end) for _, row_intervals in rows.values() for start, end, _ in row_intervals)
+
+    routine_table_rows = []
+    for class_date, (day, row_intervals) in rows.items():
+        placed = {slot_idx: (colspan, content) for slot_idx, colspan, content in merge_row(row_intervals, slot_ranges)}
+        cells = []
+        slot_idx = 0
+        while slot_idx < len(slot_ranges):
+            colspan, content = placed.get(slot_idx, (1, ''))
+            cells.append({'content': content, 'colspan': colspan, 'is_lunch_break': False})
+            slot_idx += colspan
+        routine_table_rows.append({'date': class_date, 'day': day, 'cells': cells})
+
+    return {
+        'time_slot_labels': [f"{start} - {end}" for start, end in slot_ranges],
+        'routine_table_rows': routine_table_rows,
+        'routine_count': len(routines),
+        'semesters': [
+            {'name': name, 'classes': classes}
+            for name, (_, classes) in sorted(semesters.items(), key=lambda item: (item[1][0], item[0]))
+        ],
+    }
+
+
+def routine_courses(semester):
+    """[{code, name, teacher}] of a semester's courses, by course code"""
+    return [
+        {'code': code, 'name': name, 'teacher': _teacher_label(code, teacher, short_name)}
+        for code, name, teacher, short_name in SemesterCourse.objects.filter(semester=semester).values_list(
+            'course__code', 'course__name', 'course__teacher__name', 'course__teacher__short_name'
+        ).order_by('course__code')
+    ]
+
+
+def build_routine_feed(semester):
+    """Public JSON feed of a semester's routine: semester details, courses and every class in date order"""
+    classes = []
+    for code, class_date, day, start, end in NewRoutine.objects.filter(semester=semester).values_list(
+        'course__code', 'class_date', 'day', 'start_time', 'end_time'
+    ).order_by('class_date', 'start_time'):
+        classes.append({
+            'date': class_date.strftime('%Y-%m-%d'),
+            'day': day,
+            'start_time': start.strftime('%H:%M'),
+            'end_time': end.strftime('%H:%M'),
+            'course_code': code,
+        })
+    return {
+        'semester': {
+            'id': semester.id,
+            'name': semester.name,
+            'full_name': semester.semester_full_name,
+            'term': semester.term,
+            'session': semester.session,
+            'start_date': semester.start_date.strftime('%Y-%m-%d') if semester.start_date else None,
+            'end_date': semester.end_date.strftime('%Y-%m-%d') if semester.end_date else None,
+            'revision': semester.revision,
+        },
+        'courses': routine_courses(semester),
+        'classes': classes,
+    }
@@ -0,0 +1,117 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from .academic_calendar import academic_calendars, calendar_rules_revision
+from .async_utils import queryset_chunks
+from .models import Semester
+
+# Classes fetched per database round trip and sent per chunk while a feed streams
+ICAL_CHUNK_SIZE = 500
+
+_UID_DOMAIN = 'bou-routines'
+
+
+def feed_etag(kind, object_id, semester_revisions):
+    """ETag of a feed from the (semester id, revision) pairs it is built from and the rules revision"""
+    state = f"{sorted(semester_revisions)}:{calendar_rules_revision()}"
+    return f'"{kind}{object_id}-{hashlib.sha1(state.encode()).hexdigest()[:16]}"'
+
+
+def _escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Content line folded to at most 75 octets per line (RFC 5545 3.1), CRLF terminated"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a UTF-8 sequence: back off continuation bytes
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _event(lines):
+    return ''.join(_fold(line) for line in ['BEGIN:VEVENT', *lines, 'END:VEVENT'])
+
+
+def _class_datetime(class_date, class_time, zone):
+    value = datetime.combine(class_date, class_time)
+    if zone is None:
+        # Floating time: shown at the same wall-clock time in every time zone
+        return value.strftime('%Y%m%dT%H%M%S')
+    return value.replace(tzinfo=zone).astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _calendar_events(semester, events, stamp):
+    for event in events:
+        for day in event['dates']:
+            yield _event([
+                f"UID:calendar-{semester.id}-{slugify(event['name'])}-{day:%Y%m%d}@{_UID_DOMAIN}",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+                f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+                f"SUMMARY:{_escape(semester.name + ': ' + event['name'])}",
+                "TRANSP:TRANSPARENT",
+            ])
+
+
+def ical_stream(name, routines, semesters):
+    """
+    iCalendar document of the classes in routines (a NewRoutine queryset) and the academic
+    calendar events of semesters, yielded in chunks of ICAL_CHUNK_SIZE VEVENTs. The classes are
+    read a chunk at a time, so the document is never held in memory as a whole.
+    """
+    zone = ZoneInfo(settings.ICAL_TIME_ZONE) if getattr(settings, 'ICAL_TIME_ZONE', None) else None
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield ''.join(_fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//BOUSST CSE//Routine Generator//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ])
+
+    rows = routines.order_by('class_date', 'start_time').values_list(
+        'id', 'class_date', 'start_time', 'end_time', 'semester__name', 'semester__study_center',
+        'course__code', 'course__name', 'course__teacher__name',
+    )
+    for chunk in queryset_chunks(rows, ICAL_CHUNK_SIZE):
+        events = []
+        for routine_id, class_date, start, end, semester_name, study_center, code, course_name, teacher in chunk:
+            lines = [
+                f"UID:routine-{routine_id}@{_UID_DOMAIN}",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{_class_datetime(class_date, start, zone)}",
+                f"DTEND:{_class_datetime(class_date, end, zone)}",
+                f"SUMMARY:{_escape(code + ' ' + course_name)}",
+                f"DESCRIPTION:{_escape(semester_name + ', ' + teacher)}",
+            ]
+            if study_center:
+                lines.append(f"LOCATION:{_escape(study_center)}")
+            events.append(_event(lines))
+        yield ''.join(events)
+
+    calendars = academic_calendars(semesters)
+    for semester in semesters:
+        yield ''.join(_calendar_events(semester, calendars[semester.id], stamp))
+    yield _fold('END:VCALENDAR')
+
+
+def feed_semesters(routines):
+    """Semesters the classes of a NewRoutine queryset belong to; their revisions make the feed's ETag"""
+    return Semester.objects.filter(id__in=routines.values('semester_id')).order_by('order', 'name')
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .generation import generate_semester_routines
+from .models import CurrentRoutine, GenerationJob, Semester, SemesterCourse
+from .occupancy import schedule_conflicts
+
+
+class JobSuperseded(Exception):
+    """The job was requeued and is no longer owned by this run"""
+
+
+def enqueue_generation(semester=None, user=None):
+    """Queue a background routine generation for one semester, or all semesters when semester is None"""
+    return GenerationJob.objects.create(semester=semester, requested_by=user)
+
+
+def claim_next_job():
+    """
+    Atomically take the oldest pending job and mark it as running.
+    Several worker threads/processes can call this concurrently; only one of them wins a given job.
+    The returned job carries the claim token its run must write with.
+    """
+    for job_id in GenerationJob.objects.filter(status="pending").order_by('created_at').values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = GenerationJob.objects.filter(id=job_id, status="pending").update(
+            status="running", started_at=now, heartbeat_at=now, claim_token=uuid4().hex
+        )
+        if claimed:
+            return GenerationJob.objects.select_related('semester').get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs():
+    """
+    Put jobs back in the queue whose worker stopped reporting, i.e. whose heartbeat is more than
+    GENERATION_JOB_TIMEOUT seconds old. A running job beats after every course, so a long but
+    healthy generation is left alone. Requeuing clears the claim token, so a worker that was only
+    stalled cannot write to the job anymore. Returns the number requeued.
+    """
+    timeout = getattr(settings, 'GENERATION_JOB_TIMEOUT', 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return GenerationJob.objects.filter(status="running").filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    ).update(status="pending", started_at=None, heartbeat_at=None, claim_token="", progress=0)
+
+
+def _update(job, **fields):
+    """Write fields to a running job and refresh its heartbeat; raises JobSuperseded if the run lost the job"""
+    owned = GenerationJob.objects.filter(id=job.id, status="running", claim_token=job.claim_token).update(
+        heartbeat_at=timezone.now(), **fields
+    )
+    if not owned:
+        raise JobSuperseded(job.id)
+
+
+def _finish(job, status, **fields):
+    try:
+        _update(job, status=status, finished_at=timezone.now(), **fields)
+    except JobSuperseded:
+        pass
+
+
+def _semester_schedule(semester):
+    """Weekly schedule rows (course_id, day, 'HH:MM', 'HH:MM') saved for a semester"""
+    return [
+        (str(course_id), day, start.strftime('%H:%M'), end.strftime('%H:%M'))
+        for course_id, day, start, end in CurrentRoutine.objects.filter(semester=semester).exclude(
+            start_time__isnull=True
+        ).exclude(end_time__isnull=True).values_list('course_id', 'day', 'start_time', 'end_time')
+    ]
+
+
+def _conflict_error(conflicts):
+    return "Time conflicts detected: " + "; ".join(
+        f"{name}: {item['course']} ({item['teacher']}) on {item['day']} {item['start']}-{item['end']}"
+        for name, items in conflicts.items()
+        for item in items
+    )
+
+
+def run_job(job):
+    """
+    Generate routines for the job's semester(s) from their saved class schedule and date range.
+
+    The schedules are checked like the generate page does (lunch break and teacher overlaps)
+    before anything is replaced; any conflict fails the whole job. Progress counts semester
+    courses, the unit generate_semester_routines reports in.
+    """
+    semesters = [job.semester] if job.semester else list(Semester.objects.all().order_by('order', 'name'))
+    schedules = {semester.id: _semester_schedule(semester) for semester in semesters}
+    course_counts = dict(
+        SemesterCourse.objects.filter(semester__in=semesters).order_by().values_list('semester').annotate(Count('id'))
+    )
+
+    summary = {}
+    processed = 0
+    try:
+        _update(job, total=sum(course_counts.values()))
+
+        conflicts = {}
+        for semester in semesters:
+            found = schedule_conflicts(schedules[semester.id], semester.lunch_break_start, semester.lunch_break_end)
+            if found:
+                conflicts[semester.name] = found
+        if conflicts:
+            _finish(job, "failed", error=_conflict_error(conflicts), summary={name: {'conflicts': items} for name, items in conflicts.items()})
+            return
+
+        for semester in semesters:
+            rows = schedules[semester.id]
+            courses = course_counts.get(semester.id, 0)
+            if not rows or not (semester.start_date and semester.end_date):
+                summary[semester.name] = {
+                    'skipped': "No class schedule saved for this semester." if not rows else "No date range saved for this semester."
+                }
+                processed += courses
+                _update(job, progress=processed)
+                continue
+
+            def report(done, semester_total, offset=processed):
+                _update(job, progress=offset + done)
+
+            generated, warnings = generate_semester_routines(semester, rows, semester.start_date, semester.end_date, progress_callback=report)
+            processed += courses
+            summary[semester.name] = {
+                'classes': len(generated),
+                'warnings': warnings,
+            }
+            _update(job, progress=processed, summary=summary)
+    except JobSuperseded:
+        # Requeued while this run was stalled; a newer run owns the job and its result
+        return
+    except Exception as e:
+        _finish(job, "failed", error=str(e), summary=summary)
+        return
+
+    _finish(job, "done", progress=processed, summary=summary)
+
+
+def job_status(job):
+    """JSON-serialisable progress information for a job"""
+    percent = 100 if job.status == "done" else (int(job.progress * 100 / job.total) if job.total else 0)
+    return {
+        'id': job.id,
+        'semester': job.semester.name if job.semester else None,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'percent': percent,
+        'summary': job.summary,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,85 @@
+from .models import NewRoutine
+from .occupancy import TICK_MINUTES, interval_mask, mask_windows, tick_to_time
+
+
+class MakeupSlotIndex:
+    """
+    Free time on a semester's makeup dates, as bitmasks of one-minute ticks (see occupancy.py).
+
+    Per makeup date it keeps what the semester's students are busy with (its classes and the lunch
+    break) and per (teacher, date) the teacher's classes in other semesters, so finding a free
+    window for a class is a couple of ANDs and a scan of the free runs.
+    """
+
+    def __init__(self, semester, makeup_dates, day_start, day_end, lunch_break=None):
+        self.semester = semester
+        self.dates = sorted(makeup_dates)
+        self.day_mask = interval_mask(day_start, day_end)
+        lunch_mask = interval_mask(*lunch_break) if lunch_break else 0
+        self.busy = {class_date: lunch_mask for class_date in self.dates}
+        self.teacher_busy = {}
+        self.course_dates = {}
+
+    @classmethod
+    def build(cls, semester, makeup_dates, day_start, day_end, lunch_break=None):
+        """Index over makeup_dates with the classes already booked on them, in one query"""
+        index = cls(semester, makeup_dates, day_start, day_end, lunch_break)
+        for semester_id, course_id, teacher_id, class_date, start, end in NewRoutine.objects.filter(
+            class_date__in=index.dates, start_time__isnull=False, end_time__isnull=False
+        ).values_list('semester_id', 'course_id', 'course__teacher_id', 'class_date', 'start_time', 'end_time'):
+            if semester_id == semester.id:
+                index.book(course_id, teacher_id, class_date, start, end)
+            else:
+                key = (teacher_id, class_date)
+                index.teacher_busy[key] = index.teacher_busy.get(key, 0) | interval_mask(start, end)
+        return index
+
+    def book(self, course_id, teacher_id, class_date, start, end):
+        mask = interval_mask(start, end)
+        self.busy[class_date] |= mask
+        key = (teacher_id, class_date)
+        self.teacher_busy[key] = self.teacher_busy.get(key, 0) | mask
+        self.course_dates.setdefault(course_id, set()).add(class_date)
+
+    def find(self, course_id, teacher_id, minutes, preferred=None):
+        """
+        Earliest (date, 'HH:MM', 'HH:MM') a class of the given length fits, on a makeup date the
+        course has no class on yet. The preferred (start, end) is taken when it is free on a date,
+        otherwise the start of the first long enough free window. None if nothing fits.
+        """
+        ticks = -(-minutes // TICK_MINUTES)
+        preferred_mask = interval_mask(*preferred) if preferred else 0
+        for class_date in self.dates:
+            if class_date in self.course_dates.get(course_id, ()):
+                continue
+            free = self.day_mask & ~(self.busy[class_date] | self.teacher_busy.get((teacher_id, class_date), 0))
+            if preferred_mask and preferred_mask & free == preferred_mask:
+                return class_date, preferred[0], preferred[1]
+            windows = mask_windows(free, ticks)
+            if windows:
+                start = windows[0][0]
+                return class_date, tick_to_time(start), tick_to_time(start + ticks)
+        return None
+
+
+def place_shortfall(semester, shortfalls, makeup_dates, day_start, day_end, lunch_break=None):
+    """
+    Put the classes a generation could not fit onto the semester's makeup dates.
+
+    shortfalls is a list of (course, missing, minutes, (start, end)) with the course's regular
+    class time preferred. Courses missing the most classes (longest first on ties) are placed
+    first, one class per course and date. Returns ({course_id: [(date, start, end), ...]},
+    {course_id: still_missing}); nothing is written.
+    """
+    index = MakeupSlotIndex.build(semester, makeup_dates, day_start, day_end, lunch_break)
+    placed = {}
+    unplaced = {}
+    for course, missing, minutes, preferred in sorted(shortfalls, key=lambda s: (-s[1], -s[2], s[0].code)):
+        for _ in range(missing):
+            found = index.find(course.id, course.teacher_id, minutes, preferred)
+            if found is None:
+                unplaced[course.id] = missing - len(placed.get(course.id, []))
+                break
+            index.book(course.id, course.teacher_id, *found)
+            placed.setdefault(course.id, []).append(found)
+    return placed, unplaced
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bou_routines_app.conflicts import find_double_bookings
+from bou_routines_app.generation import parse_date_list
+
+
+class Command(BaseCommand):
+    help = "Report teachers booked for overlapping classes on the same date across all semesters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dates', help="Only check these comma-separated dates (YYYY-MM-DD)")
+        parser.add_argument('--fail', action='store_true', help="Exit with an error if any double booking is found")
+
+    def handle(self, *args, **options):
+        try:
+            dates = parse_date_list(options['dates']) or None
+        except ValueError:
+            raise CommandError("Invalid --dates, expected YYYY-MM-DD")
+
+        started = time.monotonic()
+        conflicts, checked = find_double_bookings(dates=dates)
+        elapsed_ms = (time.monotonic() - started) * 1000
+
+        for conflict in conflicts:
+            first, second = conflict['classes']
+            self.stdout.write(self.style.WARNING(
+                f"{conflict['date']} {conflict['teacher']}: "
+                f"{first['course_code']} ({first['semester']}) {first['start_time']}-{first['end_time']} overlaps "
+                f"{second['course_code']} ({second['semester']}) {second['start_time']}-{second['end_time']}"
+            ))
+        summary = f"Checked {checked} classes in {elapsed_ms:.0f} ms: {len(conflicts)} double booking(s)"
+        if conflicts:
+            if options['fail']:
+                raise CommandError(summary)
+            self.stdout.write(self.style.ERROR(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
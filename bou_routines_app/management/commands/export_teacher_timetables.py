@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bou_routines_app.publishing import export_teacher_timetables
+
+FORMATS = {'pdf': ['teacher-pdf'], 'xlsx': ['teacher-xlsx'], 'both': ['teacher-pdf', 'teacher-xlsx']}
+
+
+class Command(BaseCommand):
+    help = "Write the timetable PDF/XLSX of every teacher with classes to a directory, using a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=str(settings.BASE_DIR / 'teacher_timetables'),
+            help="Directory for the files (default: teacher_timetables/ in the project)",
+        )
+        parser.add_argument('--teacher', type=int, action='append', dest='teachers', help="Only this teacher id (repeatable)")
+        parser.add_argument('--format', choices=sorted(FORMATS), default='both', help="Files to write per teacher")
+        parser.add_argument('--jobs', type=int, help="Worker processes (default: one per CPU)")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        results = export_teacher_timetables(
+            options['output'], options['teachers'], FORMATS[options['format']], jobs=options['jobs']
+        )
+        files = 0
+        for name, exports in results:
+            for kind, detail, ok in exports:
+                if ok:
+                    files += 1
+                    self.stdout.write(f"{name}: {detail}")
+                else:
+                    self.stdout.write(self.style.ERROR(f"{name} {kind}: {detail}"))
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {files} file(s) for {len(results)} teacher(s) to {options['output']} in {elapsed_ms:.0f} ms"
+        ))
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bou_routines_app.catalog_import import ImportFileError, import_catalog, read_catalog_rows
+
+
+class Command(BaseCommand):
+    help = "Create or update teachers, courses and semester courses from a CSV or XLSX sheet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or XLSX file; see catalog_import.IMPORT_COLUMNS for the columns")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and count the changes without saving them")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        try:
+            with path.open('rb') as file:
+                report = import_catalog(read_catalog_rows(file, path.name), dry_run=options['dry_run'])
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stdout.write(self.style.ERROR(f"Row {error['row']}: {error['error']}"))
+        if report['errors']:
+            raise CommandError(f"{len(report['errors'])} problem(s) in {report['rows']} row(s); nothing was saved")
+        summary = ", ".join(
+            f"{label}: {report[f'{key}_created']} created, {report[f'{key}_updated']} updated"
+            for label, key in (('Teachers', 'teachers'), ('Courses', 'courses'), ('Semester courses', 'semester_courses'))
+        )
+        verb = "Checked" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {report['rows']} row(s). {summary}"))
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter started with -X importtime; prints peak RSS (KiB) and the heavy packages loaded
+# (__import__ rather than importlib.import_module, which -X importtime does not time)
+PROBE = """
+import resource, sys
+import django
+django.setup()
+__import__(sys.argv[1])
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+print(' '.join(name for name in sys.argv[2:] if name in sys.modules))
+"""
+
+HEAVY_PACKAGES = ['reportlab', 'xlsxwriter', 'numpy']
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output, in import order"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report the import time and memory of loading app modules in a fresh interpreter (python -X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module', action='append', dest='modules',
+            help="Module to import after django.setup() (repeatable; default: the views and the export module)",
+        )
+        parser.add_argument('--top', type=int, default=10, help="Number of slowest top-level imports to list")
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or ['bou_routines_app.views', 'bou_routines_app.exports']
+        for module in modules:
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', PROBE, module, *HEAVY_PACKAGES],
+                capture_output=True, text=True, env=os.environ.copy(),
+            )
+            if result.returncode:
+                raise CommandError(f"Importing {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+            rows = parse_importtime(result.stderr)
+            max_rss_kib, heavy = (result.stdout.splitlines() + ['', ''])[:2]
+            top_level = [row for row in rows if row[3] == 0]
+            own = next((row[2] for row in top_level if row[0] == module), 0)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(module))
+            self.stdout.write(
+                f"  all imports {sum(row[2] for row in top_level) / 1000:.0f} ms, "
+                f"{module} itself {own / 1000:.0f} ms, {len(rows)} modules, peak RSS {int(max_rss_kib) / 1024:.1f} MiB"
+            )
+            for name, _, cumulative_us, _ in sorted(top_level, key=lambda row: -row[2])[:options['top']]:
+                self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+            if heavy:
+                self.stdout.write(self.style.WARNING(f"  loaded: {heavy}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"  not loaded: {', '.join(HEAVY_PACKAGES)}"))
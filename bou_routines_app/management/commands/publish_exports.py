@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+
+from bou_routines_app.publishing import publish_exports
+
+
+class Command(BaseCommand):
+    help = "Render the PDF/XLSX exports of every semester whose routine changed since it was last rendered"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, action='append', dest='semesters', help="Only this semester id (repeatable)")
+        parser.add_argument('--watch', action='store_true', help="Keep publishing changes instead of exiting")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between checks with --watch")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            published = publish_exports(options['semesters'])
+            for name, key, result in published:
+                if isinstance(result, HttpResponse):
+                    self.stdout.write(self.style.ERROR(f"{name} {key[0]}: {result.content.decode(errors='replace')}"))
+                else:
+                    self.stdout.write(f"{name} {key[0]}: {result.name}")
+            if published or not options['watch']:
+                elapsed_ms = (time.monotonic() - started) * 1000
+                self.stdout.write(self.style.SUCCESS(f"Rendered {len(published)} export(s) in {elapsed_ms:.0f} ms"))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
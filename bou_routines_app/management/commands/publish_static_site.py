@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bou_routines_app.static_site import publish_static_site, static_site_dir
+
+
+class Command(BaseCommand):
+    help = "Render the routine pages, feeds and PDF/XLSX exports as a static site nginx can serve without Django"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help=f"Site directory (default: STATIC_SITE_DIR, {static_site_dir()})")
+        parser.add_argument('--jobs', type=int, help="Worker processes rendering semesters (default: one per CPU)")
+        parser.add_argument('--force', action='store_true', help="Render every semester, not only changed ones")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rendered, manifest = publish_static_site(options['output'], jobs=options['jobs'], force=options['force'])
+        for entry in manifest['semesters'].values():
+            if entry['name'] in rendered:
+                self.stdout.write(f"{entry['name']}: revision {entry['revision']}, {entry['routine_count']} classes")
+                for error in entry['errors']:
+                    self.stdout.write(self.style.ERROR(f"  {error}"))
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(rendered)} of {len(manifest['semesters'])} semester(s) in {elapsed_ms:.0f} ms"
+        ))
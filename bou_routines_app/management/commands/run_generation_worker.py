@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from bou_routines_app.jobs import claim_next_job, requeue_stale_jobs, run_job
+from bou_routines_app.publishing import publish_exports
+
+
+class Command(BaseCommand):
+    help = "Process queued routine generation jobs in a pool of worker threads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help="Number of jobs processed in parallel (default: 2)")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to wait between polls when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty instead of polling forever")
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+        self.stdout.write(self.style.SUCCESS(f"Generation worker started with {threads} thread(s)"))
+        running = set()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            try:
+                while True:
+                    running = {future for future in running if not future.done()}
+                    # Jobs a crashed worker left "running" are taken again once they time out
+                    requeued = requeue_stale_jobs()
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale job(s)"))
+                    job = claim_next_job() if len(running) < threads else None
+                    if job:
+                        self.stdout.write(f"Running job #{job.id} ({job})")
+                        running.add(pool.submit(self._run, job))
+                        continue
+                    if getattr(settings, 'EXPORT_PUBLISH', False) and not running:
+                        # Idle: render the exports of routines changed since the last poll
+                        for name, key, _ in publish_exports():
+                            self.stdout.write(f"Published {key[0]} of {name}")
+                    if options['once'] and not running:
+                        break
+                    time.sleep(options['poll_interval'] if not running else 0.2)
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping, waiting for running jobs to finish...")
+        self.stdout.write(self.style.SUCCESS("Generation worker stopped"))
+
+    def _run(self, job):
+        try:
+            run_job(job)
+        finally:
+            # Each pool thread holds its own database connection
+            close_old_connections()
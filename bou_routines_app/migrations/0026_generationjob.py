@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('bou_routines_app', '0025_loginlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('progress', models.PositiveIntegerField(default=0, help_text='Number of courses processed so far')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Number of courses to process')),
+                ('summary', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('semester', models.ForeignKey(blank=True, help_text='Leave empty to generate routines for all semesters', null=True, on_delete=django.db.models.deletion.CASCADE, to='bou_routines_app.semester')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bou_routines_app', '0026_generationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semester',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Bumped whenever the semester's routine changes; used as cache key"),
+        ),
+    ]
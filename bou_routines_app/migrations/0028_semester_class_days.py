@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bou_routines_app', '0027_semester_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semester',
+            name='class_days',
+            field=models.PositiveSmallIntegerField(default=48, help_text='Teaching weekdays as a bitmask: bit 0 is Monday ... bit 6 is Sunday (default: Friday and Saturday)'),
+        ),
+        migrations.AlterField(
+            model_name='currentroutine',
+            name='day',
+            field=models.CharField(choices=[('Monday', 'Monday'), ('Tuesday', 'Tuesday'), ('Wednesday', 'Wednesday'), ('Thursday', 'Thursday'), ('Friday', 'Friday'), ('Saturday', 'Saturday'), ('Sunday', 'Sunday')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='newroutine',
+            name='day',
+            field=models.CharField(choices=[('Monday', 'Monday'), ('Tuesday', 'Tuesday'), ('Wednesday', 'Wednesday'), ('Thursday', 'Thursday'), ('Friday', 'Friday'), ('Saturday', 'Saturday'), ('Sunday', 'Sunday')], max_length=10),
+        ),
+    ]
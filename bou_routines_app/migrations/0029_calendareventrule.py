@@ -0,0 +1,45 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:32
+
+from django.db import migrations, models
+
+# The events the academic calendar has always listed
+DEFAULT_RULES = [
+    ('First Assignment', 4),
+    ('First Class Test', 6),
+    ('Second Assignment', 8),
+    ('Second Class Test', 10),
+    ('Third Assignment', 12),
+]
+
+
+def create_default_rules(apps, schema_editor):
+    CalendarEventRule = apps.get_model('bou_routines_app', 'CalendarEventRule')
+    CalendarEventRule.objects.bulk_create([
+        CalendarEventRule(name=name, offset_weeks=offset_weeks) for name, offset_weeks in DEFAULT_RULES
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bou_routines_app', '0028_semester_class_days'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarEventRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('offset_weeks', models.PositiveSmallIntegerField(help_text='Week after the semester start date the event falls in')),
+                ('weekdays', models.PositiveSmallIntegerField(default=0, help_text="Weekdays of the event as a bitmask (bit 0 is Monday); 0 uses the semester's class days")),
+                ('holiday_policy', models.CharField(choices=[('next_week', 'Same weekday of the next week'), ('next_day', 'Next day that is not a holiday'), ('skip', 'Leave the date out')], default='next_week', help_text='What happens to an event date that is a holiday', max_length=10)),
+                ('order', models.IntegerField(default=0, help_text='Order of events falling on the same date')),
+                ('active', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['offset_weeks', 'order', 'name'],
+            },
+        ),
+        migrations.RunPython(create_default_rules, migrations.RunPython.noop),
+    ]
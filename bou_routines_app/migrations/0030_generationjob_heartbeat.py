@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-19 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bou_routines_app', '0029_calendareventrule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='claim_token',
+            field=models.CharField(blank=True, default='', help_text='Identifies the worker run that owns a running job', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='generationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last time the worker running the job reported progress', null=True),
+        ),
+    ]
@@ -1,10 +1,11 @@
 from django.conf import settings
 from django.db import models
 
-DAYS = [
-    ("Friday", "Friday"),
-    ("Saturday", "Saturday")
-]
+# Weekday names in date.weekday() order (Monday=0); bit i of a weekday mask is WEEKDAYS[i]
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAYS = [(day, day) for day in WEEKDAYS]
+# The weekend programs teach on Friday and Saturday
+DEFAULT_CLASS_DAYS = (1 << 4) | (1 << 5)
 
 class Teacher(models.Model):
     id = models.AutoField(primary_key=True)
@@ -35,10 +36,36 @@ class Semester(models.Model):
     theory_class_duration_minutes = models.PositiveIntegerField(default=60, help_text="Duration of theory classes in minutes (default: 60)")
     lab_class_duration_minutes = models.PositiveIntegerField(default=90, help_text="Duration of lab classes in minutes (default: 90)")
     teacher_short_name_newline = models.BooleanField(default=True, help_text="Show teacher's short name on a new line in PDF routine table (otherwise, show on same line as course code)")
+    class_days = models.PositiveSmallIntegerField(default=DEFAULT_CLASS_DAYS, help_text="Teaching weekdays as a bitmask: bit 0 is Monday ... bit 6 is Sunday (default: Friday and Saturday)")
+    revision = models.PositiveIntegerField(default=0, editable=False, help_text="Bumped whenever the semester's routine changes; used as cache key")
 
     def __str__(self):
         return self.name
 
+    @property
+    def class_weekdays(self):
+        """Teaching weekdays as date.weekday() numbers, Monday first"""
+        return [i for i in range(7) if self.class_days >> i & 1]
+
+    @property
+    def class_day_names(self):
+        return [WEEKDAYS[i] for i in self.class_weekdays]
+
+    def save(self, *args, **kwargs):
+        # revision only changes through bump_semester_revision; never write back a stale in-memory value
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'revision'
+            ]
+        super().save(*args, **kwargs)
+
+def bump_semester_revision(semester_ids):
+    """Invalidate cached routine output of the given semesters by bumping their revision"""
+    semester_ids = {semester_id for semester_id in semester_ids if semester_id is not None}
+    if semester_ids:
+        Semester.objects.filter(id__in=semester_ids).update(revision=models.F('revision') + 1)
+
 class Course(models.Model):
     id = models.AutoField(primary_key=True)
     code = models.CharField(max_length=20, unique=True)
@@ -105,6 +132,26 @@ class NewRoutine(models.Model):
     class Meta:
         ordering = ['class_date', 'start_time']
 
+HOLIDAY_POLICIES = [
+    ("next_week", "Same weekday of the next week"),
+    ("next_day", "Next day that is not a holiday"),
+    ("skip", "Leave the date out"),
+]
+
+class CalendarEventRule(models.Model):
+    name = models.CharField(max_length=100)
+    offset_weeks = models.PositiveSmallIntegerField(help_text="Week after the semester start date the event falls in")
+    weekdays = models.PositiveSmallIntegerField(default=0, help_text="Weekdays of the event as a bitmask (bit 0 is Monday); 0 uses the semester's class days")
+    holiday_policy = models.CharField(max_length=10, choices=HOLIDAY_POLICIES, default="next_week", help_text="What happens to an event date that is a holiday")
+    order = models.IntegerField(default=0, help_text="Order of events falling on the same date")
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['offset_weeks', 'order', 'name']
+
+    def __str__(self):
+        return f"{self.name} (week {self.offset_weeks})"
+
 class LoginLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     login_time = models.DateTimeField(auto_now_add=True)
@@ -113,3 +160,31 @@ class LoginLog(models.Model):
 
     class Meta:
         ordering = ['-login_time']
+
+JOB_STATUSES = [
+    ("pending", "Pending"),
+    ("running", "Running"),
+    ("done", "Done"),
+    ("failed", "Failed"),
+]
+
+class GenerationJob(models.Model):
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, null=True, blank=True, help_text="Leave empty to generate routines for all semesters")
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=JOB_STATUSES, default="pending")
+    progress = models.PositiveIntegerField(default=0, help_text="Number of courses processed so far")
+    total = models.PositiveIntegerField(default=0, help_text="Number of courses to process")
+    summary = models.JSONField(default=dict, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last time the worker running the job reported progress")
+    claim_token = models.CharField(max_length=32, blank=True, default="", help_text="Identifies the worker run that owns a running job")
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        target = self.semester.name if self.semester else "All semesters"
+        return f"{target} ({self.status})"
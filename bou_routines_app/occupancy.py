@@ -0,0 +1,186 @@
+from datetime import time
+
+from .models import WEEKDAYS, Course, CurrentRoutine
+
+# Resolution of the occupancy bitmasks: bit i of a day mask covers minute i. Class times are
+# whole minutes, so masks are exact and back-to-back classes (10:00-10:32, 10:32-11:00) never
+# share a bit; a day is still only a 1440-bit integer
+TICK_MINUTES = 1
+TICKS_PER_DAY = 24 * 60 // TICK_MINUTES
+
+
+def weekday_index(day):
+    """Weekday index (Monday=0, like date.weekday()) of a day name, index or date"""
+    if isinstance(day, int):
+        return day
+    if hasattr(day, 'weekday'):
+        return day.weekday()
+    return WEEKDAYS.index(day)
+
+
+def _minutes(value):
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    hours, minutes = value.split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def interval_mask(start, end):
+    """
+    Bitmask of the ticks touched by [start, end) ('HH:MM' strings or time objects).
+    Two masks intersect exactly when the intervals overlap, like views.time_overlap.
+    """
+    first = _minutes(start) // TICK_MINUTES
+    last = -(-_minutes(end) // TICK_MINUTES)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def tick_to_time(tick):
+    minutes = tick * TICK_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def mask_windows(free_mask, min_ticks=1):
+    """[(start_tick, end_tick)] runs of set bits in free_mask that are at least min_ticks long"""
+    windows = []
+    while free_mask:
+        start = (free_mask & -free_mask).bit_length() - 1
+        # Adding the lowest set bit carries through the run and clears it
+        run_end = ((free_mask >> start) + 1) & ~(free_mask >> start)
+        length = run_end.bit_length() - 1
+        if length >= min_ticks:
+            windows.append((start, start + length))
+        free_mask &= ~(((1 << length) - 1) << start)
+    return windows
+
+
+class TeacherOccupancy:
+    """
+    Weekly teacher schedule as one integer bitmask per (teacher, weekday).
+
+    Built from CurrentRoutine in a single query; "is the teacher free" is a single AND and
+    the entries behind each mask are kept so a conflict can be traced back to its routine.
+    """
+
+    def __init__(self):
+        self.masks = {}
+        self.entries = {}
+
+    @classmethod
+    def build(cls, teacher_ids=None, days=None, exclude_semester=None):
+        """Occupancy of the saved class schedules, optionally limited to some teachers/days"""
+        routines = CurrentRoutine.objects.exclude(start_time__isnull=True).exclude(end_time__isnull=True)
+        if teacher_ids is not None:
+            routines = routines.filter(course__teacher_id__in=teacher_ids)
+        if days is not None:
+            routines = routines.filter(day__in=[WEEKDAYS[weekday_index(day)] for day in days])
+        if exclude_semester is not None:
+            routines = routines.exclude(semester=exclude_semester)
+        occupancy = cls()
+        for routine_id, teacher_id, course_id, day, start, end in routines.values_list(
+            'id', 'course__teacher_id', 'course_id', 'day', 'start_time', 'end_time'
+        ):
+            occupancy.add(teacher_id, day, start, end, course_id=course_id, routine_id=routine_id)
+        return occupancy
+
+    def add(self, teacher_id, day, start, end, course_id=None, routine_id=None):
+        key = (teacher_id, weekday_index(day))
+        mask = interval_mask(start, end)
+        self.masks[key] = self.masks.get(key, 0) | mask
+        self.entries.setdefault(key, []).append((mask, course_id, routine_id))
+
+    def busy_mask(self, teacher_id, day, exclude_course=None):
+        key = (teacher_id, weekday_index(day))
+        if exclude_course is None:
+            return self.masks.get(key, 0)
+        mask = 0
+        for entry_mask, course_id, _ in self.entries.get(key, ()):
+            if str(course_id) != str(exclude_course):
+                mask |= entry_mask
+        return mask
+
+    def is_free(self, teacher_id, day, start, end, exclude_course=None):
+        """True if the teacher has nothing scheduled on day between start and end"""
+        return not (self.busy_mask(teacher_id, day, exclude_course) & interval_mask(start, end))
+
+    def conflicts(self, teacher_id, day, start, end, exclude_course=None):
+        """[(course_id, routine_id)] of the teacher's classes overlapping start-end on day"""
+        wanted = interval_mask(start, end)
+        key = (teacher_id, weekday_index(day))
+        if not (self.masks.get(key, 0) & wanted):
+            return []
+        return [
+            (course_id, routine_id)
+            for entry_mask, course_id, routine_id in self.entries[key]
+            if entry_mask & wanted and (exclude_course is None or str(course_id) != str(exclude_course))
+        ]
+
+    def free_windows(self, teacher_ids, day, start='08:00', end='20:00', min_minutes=0, blocked=()):
+        """
+        Windows between start and end on day when all the given teachers are free.
+
+        blocked is an optional list of (start, end) intervals that are unavailable for
+        everybody, such as the lunch break. Returns [('HH:MM', 'HH:MM'), ...].
+        """
+        busy = 0
+        for teacher_id in teacher_ids:
+            busy |= self.busy_mask(teacher_id, day)
+        for blocked_start, blocked_end in blocked:
+            busy |= interval_mask(blocked_start, blocked_end)
+        free = interval_mask(start, end) & ~busy
+        min_ticks = max(1, -(-min_minutes // TICK_MINUTES))
+        return [(tick_to_time(a), tick_to_time(b)) for a, b in mask_windows(free, min_ticks)]
+
+
+def schedule_conflicts(schedule_rows, lunch_start=None, lunch_end=None):
+    """
+    Conflicts that block generating a routine from a weekly schedule.
+
+    schedule_rows is a list of (course_id, day, start_time, end_time) tuples; incomplete rows are
+    ignored. A row conflicts when it overlaps the lunch break, or when the course's teacher has
+    another course at the same time in any saved class schedule. Returns a list of
+    {'course', 'teacher', 'day', 'start', 'end'} dicts, one per lunch break or blocking class.
+    """
+    rows = [row for row in schedule_rows if all(row)]
+    conflicts = []
+    seen = set()
+
+    if lunch_start and lunch_end:
+        lunch_mask = interval_mask(lunch_start, lunch_end)
+        for _, day, start, end in rows:
+            if interval_mask(start, end) & lunch_mask and ('lunch', day) not in seen:
+                seen.add(('lunch', day))
+                conflicts.append({
+                    "course": "Lunch Break",
+                    "teacher": "All",
+                    "day": day,
+                    "start": tick_to_time(_minutes(lunch_start) // TICK_MINUTES),
+                    "end": tick_to_time(_minutes(lunch_end) // TICK_MINUTES),
+                })
+
+    row_courses = Course.objects.in_bulk({int(row[0]) for row in rows})
+    occupancy = TeacherOccupancy.build(teacher_ids={course.teacher_id for course in row_courses.values()})
+    conflicting_routine_ids = []
+    for course_id, day, start, end in rows:
+        course = row_courses.get(int(course_id))
+        if course is not None:
+            conflicting_routine_ids += [
+                routine_id for _, routine_id in occupancy.conflicts(course.teacher_id, day, start, end, exclude_course=course.id)
+            ]
+
+    routines = CurrentRoutine.objects.select_related('course', 'course__teacher').in_bulk(conflicting_routine_ids)
+    for routine_id in conflicting_routine_ids:
+        routine = routines[routine_id]
+        key = (routine.course.code, routine.day, routine.start_time, routine.end_time)
+        if key not in seen:
+            seen.add(key)
+            conflicts.append({
+                "course": routine.course.code,
+                "teacher": routine.course.teacher.name,
+                "day": routine.day,
+                "start": routine.start_time.strftime("%H:%M"),
+                "end": routine.end_time.strftime("%H:%M"),
+            })
+    return conflicts
@@ -0,0 +1,78 @@
+import numpy as np
+
+from .generation import parse_date_list, weekly_course_sessions
+from .models import WEEKDAYS, SemesterCourse
+from .occupancy import weekday_index
+
+
+def _weekmask(weekday):
+    """NumPy weekmask with only the given weekday (Monday=0) as a business day"""
+    return ''.join('1' if i == weekday else '0' for i in range(7))
+
+
+def plan_date_ranges(semester, earliest_start, latest_start, latest_end=None, limit=5):
+    """
+    Shortest date ranges in which generation can schedule every class of a semester.
+
+    A course gets one class on each date of its weekly slot's weekday that is neither a holiday
+    nor a makeup date, as in generate_semester_routines. With NumPy business-day arithmetic
+    (one weekmask per weekday, holidays and makeup dates as non-business days), the earliest
+    end date for every candidate start between earliest_start and latest_start is found with
+    one busday_offset call per weekday: the n-th class day of the weekday on or after the start,
+    n being the most sessions any course on that weekday needs.
+
+    Returns {'courses', 'unscheduled', 'candidates', 'ranges'}; ranges are sorted by length,
+    then start, and list the sessions every course gets.
+    """
+    sessions = weekly_course_sessions(semester)
+    if not sessions:
+        raise ValueError(f"{semester.name} has no saved class schedule. Click \"Save Changes\" first.")
+    blocked = np.array(
+        sorted(set(parse_date_list(semester.holidays)) | set(parse_date_list(semester.makeup_dates))),
+        dtype='datetime64[D]',
+    )
+
+    needed = {}
+    for slot, count in sessions.values():
+        weekday = weekday_index(slot.day)
+        needed[weekday] = max(needed.get(weekday, 0), count)
+
+    starts = np.arange(np.datetime64(earliest_start, 'D'), np.datetime64(latest_start, 'D') + 1)
+    ends = starts.copy()
+    for weekday, count in needed.items():
+        if count:
+            ends = np.maximum(ends, np.busday_offset(
+                starts, count - 1, roll='forward', weekmask=_weekmask(weekday), holidays=blocked
+            ))
+    lengths = (ends - starts).astype(int) + 1
+    fits = np.ones(starts.shape, dtype=bool) if latest_end is None else ends <= np.datetime64(latest_end, 'D')
+    order = np.flatnonzero(fits)[np.lexsort((starts[fits], lengths[fits]))][:limit]
+
+    # Sessions every course gets in each chosen range
+    chosen_starts, chosen_ends = starts[order], ends[order] + 1
+    achievable = {
+        weekday: np.busday_count(chosen_starts, chosen_ends, weekmask=_weekmask(weekday), holidays=blocked)
+        for weekday in needed
+    }
+    ranges = []
+    for i, k in enumerate(order):
+        ranges.append({
+            'start_date': str(starts[k]),
+            'end_date': str(ends[k]),
+            'days': int(lengths[k]),
+            'sessions': {
+                slot.course.code: int(achievable[weekday_index(slot.day)][i]) for slot, _ in sessions.values()
+            },
+        })
+
+    return {
+        'courses': [
+            {'course_code': slot.course.code, 'day': WEEKDAYS[weekday_index(slot.day)], 'sessions_needed': count}
+            for slot, count in sorted(sessions.values(), key=lambda item: item[0].course.code)
+        ],
+        'unscheduled': sorted(
+            SemesterCourse.objects.filter(semester=semester).exclude(course_id__in=sessions).values_list('course__code', flat=True)
+        ),
+        'candidates': int(starts.size),
+        'ranges': ranges,
+    }
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.db import connections
+from django.http import HttpResponse
+
+from .models import Semester, Teacher
+from .singleflight import render_export, stored_export
+
+# (kind, teacher short name on its own line) of every routine export kept rendered
+ROUTINE_EXPORTS = [('routine-pdf', True), ('routine-pdf', False), ('routine-xlsx', True)]
+
+
+def routine_export(kind, semester_id, revision, teacher_short_name_newline=True):
+    """(key, render, args) of a routine export; the export views and publish_exports share these keys"""
+    # exports.py loads reportlab and xlsxwriter, so it is imported on the first export only
+    from .exports import render_routine_excel, render_routine_pdf
+    if kind == 'routine-xlsx':
+        return (kind, semester_id, revision), render_routine_excel, (semester_id,)
+    option = 'newline' if teacher_short_name_newline else 'inline'
+    return (kind, semester_id, revision, option), render_routine_pdf, (semester_id, teacher_short_name_newline)
+
+
+def teacher_revision(teacher_id):
+    """
+    Revision of a teacher's timetable: a hash of the revisions of the semesters they teach in,
+    which change with any of their classes (and with a teacher or course rename).
+    """
+    revisions = sorted(
+        Semester.objects.filter(newroutine__course__teacher_id=teacher_id).distinct().values_list('id', 'revision')
+    )
+    return hashlib.sha1(str(revisions).encode()).hexdigest()[:12]
+
+
+def teacher_export(kind, teacher_id, revision):
+    """(key, render, args) of a teacher timetable export ('teacher-pdf' or 'teacher-xlsx')"""
+    from .exports import render_teacher_timetable_excel, render_teacher_timetable_pdf
+    render = render_teacher_timetable_excel if kind == 'teacher-xlsx' else render_teacher_timetable_pdf
+    return (kind, teacher_id, revision), render, (teacher_id,)
+
+
+def publish_exports(semester_ids=None):
+    """
+    Render the PDF and XLSX exports of every semester with a generated routine whose current
+    revision has not been rendered yet, so downloads are served from stored files.
+    Returns [(semester name, key, path or error response)] of the exports rendered.
+    """
+    semesters = Semester.objects.filter(newroutine__isnull=False).distinct().order_by('order', 'name')
+    if semester_ids is not None:
+        semesters = semesters.filter(id__in=semester_ids)
+    published = []
+    for semester_id, name, revision in semesters.values_list('id', 'name', 'revision'):
+        for kind, teacher_short_name_newline in ROUTINE_EXPORTS:
+            key, render, args = routine_export(kind, semester_id, revision, teacher_short_name_newline)
+            if stored_export(key) is None:
+                published.append((name, key, render_export(key, render, args)))
+    return published
+
+
+def init_worker_process():
+    """ProcessPoolExecutor initializer; needed when the platform starts workers with spawn rather than fork"""
+    django.setup()
+
+
+def _export_teacher_timetable(teacher_id, kinds, output):
+    """Render (or reuse from the export store) one teacher's timetables and copy them to output"""
+    revision = teacher_revision(teacher_id)
+    results = []
+    for kind in kinds:
+        key, render, args = teacher_export(kind, teacher_id, revision)
+        result = render_export(key, render, args)
+        if isinstance(result, HttpResponse):
+            results.append((kind, result.content.decode(errors='replace'), False))
+            continue
+        tmp = Path(output) / f".{result.name}.tmp"
+        shutil.copyfile(result, tmp)
+        os.replace(tmp, Path(output) / result.name)
+        results.append((kind, result.name, True))
+    return results
+
+
+def export_teacher_timetables(output, teacher_ids=None, kinds=('teacher-pdf', 'teacher-xlsx'), jobs=None):
+    """
+    Write the timetable exports of every teacher with classes (or of teacher_ids) to output,
+    one teacher per task in a process pool. Timetables already in the export store for the
+    teacher's current revision are copied instead of rendered.
+    Returns [(teacher name, [(kind, file name or error, ok)])].
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    teachers = Teacher.objects.filter(course__newroutine__isnull=False).distinct().order_by('name')
+    if teacher_ids is not None:
+        teachers = teachers.filter(id__in=teacher_ids)
+    teachers = list(teachers.values_list('id', 'name'))
+    if not teachers:
+        return []
+    # Forked workers must not share this process's database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker_process) as pool:
+        futures = [
+            (name, pool.submit(_export_teacher_timetable, teacher_id, list(kinds), str(output)))
+            for teacher_id, name in teachers
+        ]
+        return [(name, future.result()) for name, future in futures]
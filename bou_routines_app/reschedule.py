@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from django.db import transaction
+
+from .generation import weekly_course_sessions
+from .models import NewRoutine, bump_semester_revision
+from .occupancy import weekday_index
+from .validation import get_teacher_date_index, semester_rules
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+class SemesterDayPlan:
+    """
+    Classes of one semester by date, for checking whether a class can be put on another date.
+
+    A class fits on a date when the semester has no overlapping class there (same students),
+    its course has no class there yet, and its teacher is free in every other semester.
+    """
+
+    def __init__(self, semester, routines):
+        self.semester = semester
+        self.by_date = {}
+        self.course_dates = {}
+        self.index = get_teacher_date_index()
+        for routine in routines:
+            self.add(routine, routine.class_date)
+
+    def add(self, routine, class_date):
+        self.by_date.setdefault(class_date, []).append(routine)
+        self.course_dates.setdefault(routine.course_id, set()).add(class_date)
+
+    def fits(self, routine, class_date):
+        if class_date in self.course_dates.get(routine.course_id, ()):
+            return False
+        start, end = _minutes(routine.start_time), _minutes(routine.end_time)
+        for other in self.by_date.get(class_date, ()):
+            if _minutes(other.start_time) < end and start < _minutes(other.end_time):
+                return False
+        # Classes of this semester are checked above with their new dates
+        return all(
+            self.index.describe(other_id)['semester_id'] == self.semester.id
+            for other_id in self.index.overlapping(routine.course.teacher_id, class_date, routine.start_time, routine.end_time)
+        )
+
+
+def reschedule_semester(semester, dry_run=False):
+    """
+    Bring a semester's generated routine in line with its current calendar without regenerating it.
+
+    Only classes on a holiday, or outside the date range and not on a makeup date, are moved: to
+    the next free date of the same weekday, else onto the earliest free makeup date, else they are
+    removed. When the date range grew, courses short of their sessions get new ones on their weekly
+    slot after their last class. Every other class, manual edits included, is left alone.
+
+    Returns {'moved', 'added', 'dropped', 'short'} lists describing the changes.
+    """
+    rules = semester_rules(semester)
+    start_date, end_date = rules['start_date'], rules['end_date']
+    if not (start_date and end_date):
+        raise ValueError(f"{semester.name} has no date range.")
+    holidays, makeup_dates = rules['holidays'], rules['makeup_dates']
+
+    def regular_date(class_date):
+        return start_date <= class_date <= end_date and class_date not in holidays and class_date not in makeup_dates
+
+    def weekday_dates(weekday, after):
+        # Dates of a weekday (Monday=0) later than after, inside the date range
+        class_date = max(after + timedelta(days=1), start_date)
+        class_date += timedelta(days=(weekday - class_date.weekday()) % 7)
+        while class_date <= end_date:
+            yield class_date
+            class_date += timedelta(days=7)
+
+    # Makeup dates often lie after the end date; they are meant to take the classes that do not fit
+    free_makeup_dates = sorted(makeup_dates - holidays)
+
+    routines = list(
+        NewRoutine.objects.filter(semester=semester).select_related('course').order_by('class_date', 'start_time')
+    )
+    displaced = [
+        r for r in routines
+        if r.class_date in holidays or not (start_date <= r.class_date <= end_date or r.class_date in makeup_dates)
+    ]
+    displaced_ids = {r.id for r in displaced}
+    plan = SemesterDayPlan(semester, [r for r in routines if r.id not in displaced_ids])
+
+    moved, dropped = [], []
+    report = {'moved': [], 'added': [], 'dropped': [], 'short': []}
+    for routine in displaced:
+        target = next((d for d in weekday_dates(routine.class_date.weekday(), routine.class_date) if regular_date(d) and plan.fits(routine, d)), None)
+        if target is None:
+            target = next((d for d in free_makeup_dates if plan.fits(routine, d)), None)
+        if target is None:
+            dropped.append(routine)
+            report['dropped'].append({
+                'routine_id': routine.id, 'course_code': routine.course.code, 'date': routine.class_date.strftime('%Y-%m-%d'),
+            })
+            continue
+        report['moved'].append({
+            'routine_id': routine.id,
+            'course_code': routine.course.code,
+            'from': routine.class_date.strftime('%Y-%m-%d'),
+            'to': target.strftime('%Y-%m-%d'),
+            'makeup': target in makeup_dates,
+        })
+        routine.class_date = target
+        routine.day = target.strftime('%A')
+        plan.add(routine, target)
+        moved.append(routine)
+
+    # Extend courses that are short of sessions along their weekly slot
+    counts = {}
+    last_dates = {}
+    dropped_ids = {routine.id for routine in dropped}
+    for routine in routines:
+        if routine.id not in dropped_ids:
+            counts[routine.course_id] = counts.get(routine.course_id, 0) + 1
+            if routine.class_date not in makeup_dates:
+                last_dates[routine.course_id] = max(routine.class_date, last_dates.get(routine.course_id, routine.class_date))
+    added = []
+    for course_id, (slot, needed) in weekly_course_sessions(semester).items():
+        have = counts.get(course_id, 0)
+        if have < needed:
+            after = last_dates.get(course_id, start_date - timedelta(days=1))
+            for class_date in weekday_dates(weekday_index(slot.day), after):
+                if have >= needed:
+                    break
+                routine = NewRoutine(
+                    semester=semester, course=slot.course, class_date=class_date, day=slot.day,
+                    start_time=slot.start_time, end_time=slot.end_time,
+                )
+                if regular_date(class_date) and plan.fits(routine, class_date):
+                    plan.add(routine, class_date)
+                    added.append(routine)
+                    report['added'].append({'course_code': slot.course.code, 'date': class_date.strftime('%Y-%m-%d')})
+                    have += 1
+        if have < needed:
+            report['short'].append({'course_code': slot.course.code, 'scheduled': have, 'needed': needed})
+
+    if not dry_run and (moved or added or dropped):
+        with transaction.atomic():
+            if dropped:
+                NewRoutine.objects.filter(id__in=[routine.id for routine in dropped]).delete()
+            if moved:
+                NewRoutine.objects.bulk_update(moved, ['class_date', 'day'])
+            if added:
+                NewRoutine.objects.bulk_create(added)
+            bump_semester_revision([semester.id])
+    return report
@@ -0,0 +1,56 @@
+import csv
+import json
+
+from .async_utils import queryset_chunks
+from .models import NewRoutine
+
+SESSION_FIELDS = [
+    'semester', 'date', 'day', 'start_time', 'end_time', 'course_code', 'course_name', 'teacher', 'duration_minutes',
+]
+
+# Rows fetched per database round trip (and sent per chunk) while an export streams
+SESSION_CHUNK_SIZE = 2000
+
+
+def session_queryset(semester_id=None, teacher_id=None, start_date=None, end_date=None):
+    """Raw routine sessions matching the filters, in semester, date and time order, as value tuples"""
+    routines = NewRoutine.objects.all()
+    if semester_id is not None:
+        routines = routines.filter(semester_id=semester_id)
+    if teacher_id is not None:
+        routines = routines.filter(course__teacher_id=teacher_id)
+    if start_date is not None:
+        routines = routines.filter(class_date__gte=start_date)
+    if end_date is not None:
+        routines = routines.filter(class_date__lte=end_date)
+    return routines.order_by('semester__order', 'semester__name', 'class_date', 'start_time').values_list(
+        'semester__name', 'class_date', 'day', 'start_time', 'end_time', 'course__code', 'course__name', 'course__teacher__name',
+    )
+
+
+def _session(row):
+    semester, class_date, day, start, end, code, name, teacher = row
+    if start is None or end is None:
+        # A class not given a time yet is still exported, with empty times
+        return [semester, class_date.strftime('%Y-%m-%d'), day, '', '', code, name, teacher, '']
+    duration = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+    return [semester, class_date.strftime('%Y-%m-%d'), day, start.strftime('%H:%M'), end.strftime('%H:%M'), code, name, teacher, duration]
+
+
+class _Echo:
+    """File-like object whose write returns the line, so csv.writer formats rows without buffering them"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(SESSION_FIELDS)
+    for chunk in queryset_chunks(queryset, SESSION_CHUNK_SIZE):
+        yield ''.join(writer.writerow(_session(row)) for row in chunk)
+
+
+def jsonl_stream(queryset):
+    for chunk in queryset_chunks(queryset, SESSION_CHUNK_SIZE):
+        yield ''.join(json.dumps(dict(zip(SESSION_FIELDS, _session(row)))) + '\n' for row in chunk)
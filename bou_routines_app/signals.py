@@ -1,6 +1,9 @@
 from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import LoginLog
+from .academic_calendar import bump_calendar_rules_revision
+from .catalog import bump_catalog_revision
+from .models import CalendarEventRule, Course, LoginLog, NewRoutine, Semester, SemesterCourse, Teacher, bump_semester_revision
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
@@ -11,4 +14,41 @@ def log_user_login(sender, request, user, **kwargs):
     logs = LoginLog.objects.order_by('-login_time')
     if logs.count() > 100:
         for log in logs[100:]:
-            log.delete() 
\ No newline at end of file
+            log.delete()
+
+
+# Cached routine tables are keyed by Semester.revision; bump it whenever their input changes.
+# NewRoutine has no receivers: its writes come in bulk (generation, batch edits, reschedule), so
+# every write path calls bump_semester_revision once itself. That also keeps Django's fast delete
+# for NewRoutine querysets and cascades, which any delete receiver would disable.
+
+@receiver(post_save, sender=Semester)
+def semester_changed(sender, instance, **kwargs):
+    bump_semester_revision([instance.id])
+
+@receiver([post_save, post_delete], sender=SemesterCourse)
+def semester_course_changed(sender, instance, **kwargs):
+    # The routine PDF lists the semester's courses
+    bump_semester_revision([instance.semester_id])
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, instance, **kwargs):
+    bump_catalog_revision()
+
+@receiver([post_save, post_delete], sender=Teacher)
+def teacher_changed(sender, instance, **kwargs):
+    bump_catalog_revision()
+
+# pre_delete as well: by post_delete the cascade has already removed the classes that show them
+@receiver([post_save, pre_delete], sender=Course)
+def course_routines_changed(sender, instance, **kwargs):
+    bump_semester_revision(NewRoutine.objects.filter(course=instance).values_list('semester_id', flat=True).distinct())
+
+@receiver([post_save, pre_delete], sender=Teacher)
+def teacher_routines_changed(sender, instance, **kwargs):
+    bump_semester_revision(NewRoutine.objects.filter(course__teacher=instance).values_list('semester_id', flat=True).distinct())
+
+@receiver([post_save, post_delete], sender=CalendarEventRule)
+def calendar_event_rule_changed(sender, instance, **kwargs):
+    # The .ics feeds list the academic calendar events
+    bump_calendar_rules_revision()
@@ -0,0 +1,135 @@
+import asyncio
+import fcntl
+import mimetypes
+import os
+import re
+import shutil
+import threading
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+from .async_utils import submit_to_export_pool
+
+# Exports being rendered by this process: key -> concurrent.futures.Future. Not asyncio futures:
+# under WSGI every async view runs in its own event loop (async_to_sync), so requests for the
+# same export do not share a loop, only the process
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def export_dir():
+    path = Path(getattr(settings, 'EXPORT_RENDER_DIR', Path(settings.BASE_DIR) / 'exports'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _key_name(key):
+    return '-'.join(str(part) for part in key)
+
+
+def stored_export(key):
+    """Path of the stored export for key, or None if it has not been rendered"""
+    directory = export_dir() / _key_name(key)
+    try:
+        return next(directory.iterdir(), None)
+    except FileNotFoundError:
+        return None
+
+
+def _store(directory, filename, content):
+    # Written to a temporary directory that is renamed into place, so readers never see a partial file
+    tmp = directory.with_name(directory.name + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    (tmp / filename).write_bytes(content)
+    os.replace(tmp, directory)
+    return directory / filename
+
+
+def _remove_other_revisions(directory, key):
+    kind, semester_id, revision = key[:3]
+    prefix = f"{kind}-{semester_id}-"
+    for path in directory.glob(f"{prefix}*"):
+        if path.name[len(prefix):].split('-', 1)[0].split('.', 1)[0] != str(revision):
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+
+def render_export(key, render, args):
+    """
+    Render under an exclusive file lock, so one worker renders while the others wait and then
+    use the stored file. Returns the stored file's path, or the error response of render.
+
+    The lock is per (kind, semester_id), not per revision: it is never deleted (a process may
+    hold it), so one lock file per key would pile up with every revision.
+    """
+    directory = export_dir()
+    name = _key_name(key)
+    with open(directory / f"{_key_name(key[:2])}.lock", 'a') as lock_file:
+        # Released when the file is closed
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        path = stored_export(key)
+        if path is not None:
+            return path
+        response = render(*args)
+        if response.status_code != 200:
+            return response
+        filename = re.search(r'filename="([^"]+)"', response['Content-Disposition']).group(1)
+        path = _store(directory / name, filename, response.content)
+        _remove_other_revisions(directory, key)
+        return path
+
+
+def export_file_response(path):
+    """
+    Download response for a stored export. With EXPORT_SENDFILE set the web server sends the
+    file (X-Accel-Redirect for nginx, X-Sendfile for Apache/lighttpd); otherwise Django streams it.
+    """
+    mode = getattr(settings, 'EXPORT_SENDFILE', None)
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=mimetypes.guess_type(path.name)[0])
+        response['X-Accel-Redirect'] = settings.EXPORT_ACCEL_REDIRECT_PREFIX + path.relative_to(export_dir()).as_posix()
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=mimetypes.guess_type(path.name)[0])
+        response['X-Sendfile'] = str(path)
+    else:
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+    response['Content-Disposition'] = f'attachment; filename="{path.name}"'
+    return response
+
+
+def _forget_in_flight(key, future):
+    with _in_flight_lock:
+        if _in_flight.get(key) is future:
+            del _in_flight[key]
+
+
+async def single_flight_export(key, render, *args):
+    """
+    Download of render(*args), rendered once for all concurrent requests with the same key.
+
+    key is (kind, semester_id, revision, *options): the revision makes every routine change
+    a new key. An export already stored (see publish_exports) is served straight away.
+    Otherwise requests in this process await the render already in progress, and across
+    workers the file lock lets only one render while the others use the file it stores.
+    """
+    path = stored_export(key)
+    if path is None:
+        with _in_flight_lock:
+            future = _in_flight.get(key)
+            started = future is None
+            if started:
+                future = _in_flight[key] = submit_to_export_pool(render_export, key, render, args)
+        if started:
+            # Outside the lock: the callback runs right here if the render has already finished
+            future.add_done_callback(partial(_forget_in_flight, key))
+        # shield: a client going away must not cancel the render the other requests wait for
+        path = await asyncio.shield(asyncio.wrap_future(future))
+        if isinstance(path, HttpResponse):
+            return path
+    return export_file_response(path)
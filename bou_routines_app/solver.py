@@ -0,0 +1,211 @@
+import time
+from collections import Counter
+
+from .grid import lunch_break_interval
+from .models import CurrentRoutine, SemesterCourse
+from .occupancy import TeacherOccupancy, interval_mask
+
+DEFAULT_DAY_START = '08:30'
+DEFAULT_DAY_END = '17:00'
+DEFAULT_SLOT_MINUTES = 90
+
+
+def parse_slot_list(value):
+    """Parse 'HH:MM-HH:MM, HH:MM-HH:MM' into [('HH:MM', 'HH:MM'), ...]"""
+    slots = []
+    for item in (value or '').split(','):
+        if item.strip():
+            start, end = (part.strip() for part in item.split('-'))
+            slots.append((start, end))
+    return slots
+
+
+def _add_minutes(hhmm, minutes):
+    hours, mins = map(int, hhmm.split(':'))
+    total = hours * 60 + mins + minutes
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def default_time_slots(lunch_break=None):
+    """
+    Candidate class times when none are given: the distinct class times already used in
+    saved schedules, or fixed-length slots over the teaching day (restarting after lunch).
+    """
+    used = sorted({
+        (start.strftime('%H:%M'), end.strftime('%H:%M'))
+        for start, end in CurrentRoutine.objects.exclude(start_time__isnull=True).exclude(
+            end_time__isnull=True
+        ).values_list('start_time', 'end_time')
+    })
+    if used:
+        return used
+    slots = []
+    start = DEFAULT_DAY_START
+    while _add_minutes(start, DEFAULT_SLOT_MINUTES) <= DEFAULT_DAY_END:
+        end = _add_minutes(start, DEFAULT_SLOT_MINUTES)
+        if lunch_break and start < lunch_break[1] and lunch_break[0] < end:
+            start = lunch_break[1]
+            continue
+        slots.append((start, end))
+        start = end
+    return slots
+
+
+class ScheduleSolver:
+    """
+    Assigns one weekly (day, start, end) to every course of a semester.
+
+    Hard constraints: no overlap with the lunch break, no overlap between two courses of the
+    semester (same students), and no overlap with another class of the same teacher in any
+    other semester's saved schedule. Each course's domain is a bitset over the candidate
+    (day, slot) pairs; the search picks the course with the smallest domain first and removes
+    overlapping candidates from the remaining domains (forward checking). The best (largest,
+    then most evenly spread over the days) assignment found within the time budget is kept.
+    """
+
+    def __init__(self, semester, slots=None, days=None, lunch_break=None, time_budget=2.0):
+        self.semester = semester
+        self.days = days or semester.class_day_names
+        self.lunch_break = lunch_break if lunch_break is not None else lunch_break_interval(semester)
+        self.time_budget = time_budget
+        slots = slots or default_time_slots(self.lunch_break)
+        self.candidates = [(day, start, end) for day in self.days for start, end in sorted(set(slots))]
+
+        self.courses = [
+            sc.course for sc in SemesterCourse.objects.filter(semester=semester).select_related('course', 'course__teacher').order_by('course__code')
+        ]
+        # Classes of this semester are being (re)placed, so only other semesters count as busy
+        self.occupancy = TeacherOccupancy.build(
+            teacher_ids={course.teacher_id for course in self.courses}, exclude_semester=semester
+        )
+
+        # overlaps[k]: bitset of the candidates that overlap candidate k (same day, intersecting times)
+        masks = [interval_mask(start, end) for _, start, end in self.candidates]
+        self.overlaps = []
+        for k, (day, _, _) in enumerate(self.candidates):
+            bits = 0
+            for j, (other_day, _, _) in enumerate(self.candidates):
+                if other_day == day and masks[j] & masks[k]:
+                    bits |= 1 << j
+            self.overlaps.append(bits)
+
+        lunch_mask = interval_mask(*self.lunch_break) if self.lunch_break else 0
+        self.domains = {}
+        self.reasons = {}
+        for course in self.courses:
+            domain = 0
+            lunch_clash = teacher_clash = 0
+            for k, (day, start, end) in enumerate(self.candidates):
+                if masks[k] & lunch_mask:
+                    lunch_clash += 1
+                elif not self.occupancy.is_free(course.teacher_id, day, start, end):
+                    teacher_clash += 1
+                else:
+                    domain |= 1 << k
+            self.domains[course.id] = domain
+            if not domain:
+                if teacher_clash:
+                    self.reasons[course.id] = f"{course.teacher.name} is busy in every free candidate slot."
+                elif lunch_clash:
+                    self.reasons[course.id] = "Every candidate slot overlaps the lunch break."
+                else:
+                    self.reasons[course.id] = "No candidate time slots."
+
+    def _cost(self, assignment):
+        # Fewer classes on the busiest day is better
+        per_day = Counter(self.candidates[k][0] for k in assignment.values())
+        return sum(count * count for count in per_day.values())
+
+    def solve(self):
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        self.nodes = 0
+        self.timed_out = False
+        best = {'assignment': {}, 'cost': 0}
+
+        def better(assignment):
+            if len(assignment) != len(best['assignment']):
+                return len(assignment) > len(best['assignment'])
+            return self._cost(assignment) < best['cost']
+
+        def search(assignment, domains, skipped):
+            self.nodes += 1
+            if better(assignment):
+                best['assignment'] = dict(assignment)
+                best['cost'] = self._cost(assignment)
+            if len(best['assignment']) == len(self.courses) and best['cost'] <= self._balanced_cost():
+                return True
+            if time.monotonic() > deadline:
+                self.timed_out = True
+                return True
+            remaining = [course_id for course_id in domains if course_id not in assignment and course_id not in skipped]
+            if not remaining:
+                return False
+            # Upper bound: even placing every remaining course cannot beat the best size
+            if len(assignment) + len(remaining) < len(best['assignment']):
+                return False
+
+            # Most constrained course first
+            course_id = min(remaining, key=lambda c: bin(domains[c]).count('1'))
+            domain = domains[course_id]
+            per_day = Counter(self.candidates[k][0] for k in assignment.values())
+            values = [k for k in range(len(self.candidates)) if domain >> k & 1]
+            # Least loaded day first, then earliest slot
+            values.sort(key=lambda k: (per_day[self.candidates[k][0]], k))
+
+            for k in values:
+                pruned = {
+                    other: (d & ~self.overlaps[k]) if other != course_id else d
+                    for other, d in domains.items()
+                }
+                assignment[course_id] = k
+                stop = search(assignment, pruned, skipped)
+                del assignment[course_id]
+                if stop:
+                    return True
+            # Leave this course unplaced and try to place the others
+            return search(assignment, domains, skipped | {course_id})
+
+        domains = {course_id: domain for course_id, domain in self.domains.items() if domain}
+        search({}, domains, frozenset())
+        self.elapsed = time.monotonic() - started
+        return self._result(best['assignment'])
+
+    def _balanced_cost(self):
+        n, d = len(self.courses), len(self.days)
+        q, r = divmod(n, d)
+        return r * (q + 1) ** 2 + (d - r) * q ** 2
+
+    def _result(self, assignment):
+        assignments = []
+        unassigned = []
+        for course in self.courses:
+            k = assignment.get(course.id)
+            if k is None:
+                unassigned.append({
+                    'course_id': course.id,
+                    'course_code': course.code,
+                    'teacher_name': course.teacher.name,
+                    'reason': self.reasons.get(
+                        course.id, "Not enough non-overlapping slots left after placing the other courses."
+                    ),
+                })
+                continue
+            day, start, end = self.candidates[k]
+            assignments.append({
+                'course_id': course.id,
+                'course_code': course.code,
+                'teacher_name': course.teacher.name,
+                'day': day,
+                'start_time': start,
+                'end_time': end,
+            })
+        assignments.sort(key=lambda a: (self.days.index(a['day']), a['start_time']))
+        return {
+            'assignments': assignments,
+            'unassigned': unassigned,
+            'complete': not unassigned,
+            'timed_out': self.timed_out,
+            'nodes': self.nodes,
+            'elapsed': round(self.elapsed, 3),
+        }
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db import connections
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+
+from .grid import build_routine_feed, build_routine_table, routine_courses
+from .models import Semester
+from .publishing import init_worker_process, routine_export
+from .singleflight import render_export
+
+# Static files the published pages use; they are copied under content-hashed names
+SITE_ASSETS = ['global.css', 'bou_logo_icon.png']
+
+
+def static_site_dir():
+    return Path(getattr(settings, 'STATIC_SITE_DIR', Path(settings.BASE_DIR) / 'static_site'))
+
+
+def _hashed_name(name, content):
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    stem, dot, ext = name.rpartition('.')
+    return f"{stem}.{digest}.{ext}" if dot else f"{name}.{digest}"
+
+
+def _write(path, content):
+    # Renamed into place, so nginx never serves a partially written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(content if isinstance(content, bytes) else content.encode())
+    os.replace(tmp, path)
+
+
+def publish_assets(output):
+    """Copy SITE_ASSETS to output/assets under hashed names. Returns {static URL: site URL}"""
+    urls = {}
+    for name in SITE_ASSETS:
+        content = Path(finders.find(name)).read_bytes()
+        hashed = f"assets/{_hashed_name(name, content)}"
+        if not (output / hashed).exists():
+            _write(output / hashed, content)
+        urls[static(name)] = f"/{hashed}"
+    for path in (output / 'assets').iterdir():
+        if f"/assets/{path.name}" not in urls.values():
+            path.unlink()
+    return urls
+
+
+def _use_assets(html, asset_urls):
+    for static_url, site_url in asset_urls.items():
+        html = html.replace(f'"{static_url}"', f'"{site_url}"')
+    return html
+
+
+def render_semester_site(semester_id, output, asset_urls):
+    """
+    Write the public page, JSON feed, PDF and XLSX of one semester under output, mirroring the
+    app's URLs (public/<id>/, public/<id>/feed.json) so nginx can serve them in its place.
+    Returns the semester's manifest entry.
+    """
+    output = Path(output)
+    semester = Semester.objects.get(id=semester_id)
+    entry = {'name': semester.name, 'revision': semester.revision, 'downloads': {}, 'errors': []}
+
+    # Exports are rendered through the export store, so a file publish_exports or a download
+    # already rendered for this revision is reused
+    export_dir = output / 'exports' / str(semester_id)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    for label, kind in (('PDF', 'routine-pdf'), ('Excel', 'routine-xlsx')):
+        key, render, args = routine_export(kind, semester_id, semester.revision, semester.teacher_short_name_newline)
+        result = render_export(key, render, args)
+        if isinstance(result, HttpResponse):
+            entry['errors'].append(f"{label}: {result.content.decode(errors='replace')}")
+            continue
+        name = _hashed_name(result.name, result.read_bytes())
+        if not (export_dir / name).exists():
+            tmp = export_dir / f".{name}.tmp"
+            shutil.copyfile(result, tmp)
+            os.replace(tmp, export_dir / name)
+        entry['downloads'][label] = f"/exports/{semester_id}/{name}"
+    for path in export_dir.iterdir():
+        if f"/exports/{semester_id}/{path.name}" not in entry['downloads'].values():
+            path.unlink()
+
+    table = build_routine_table(semester)
+    entry['routine_count'] = table['routine_count']
+    html = render_to_string('bou_routines_app/public_routine.html', {
+        'semester': semester,
+        'table': table,
+        'courses': routine_courses(semester),
+        'downloads': entry['downloads'],
+    })
+    _write(output / 'public' / str(semester_id) / 'index.html', _use_assets(html, asset_urls))
+    _write(output / 'public' / str(semester_id) / 'feed.json', json.dumps(build_routine_feed(semester)))
+    return entry
+
+
+def publish_static_site(output=None, jobs=None, force=False):
+    """
+    Render the routines as a static site: an index of every semester with a generated routine,
+    and each semester's page, feed, PDF and XLSX (see render_semester_site).
+
+    Only semesters whose revision differs from the one in output/manifest.json (or that had
+    errors) are rendered, each in a worker process. Semesters without a routine any more are removed.
+    Returns (rendered semester names, manifest).
+    """
+    output = Path(output) if output else static_site_dir()
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_path = output / 'manifest.json'
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    previous = manifest.get('semesters', {})
+
+    asset_urls = publish_assets(output)
+    # Pages link to the assets by hash, so new assets mean every page is rendered again
+    force = force or manifest.get('assets') != asset_urls
+
+    semesters = list(
+        Semester.objects.filter(newroutine__isnull=False).distinct()
+        .order_by('order', 'name').values_list('id', 'revision')
+    )
+    stale = [
+        semester_id for semester_id, revision in semesters
+        if force or previous.get(str(semester_id), {}).get('revision') != revision
+        or previous[str(semester_id)]['errors'] or not (output / 'public' / str(semester_id) / 'index.html').exists()
+    ]
+
+    rendered = {}
+    if stale:
+        if jobs == 1 or len(stale) == 1:
+            for semester_id in stale:
+                rendered[semester_id] = render_semester_site(semester_id, output, asset_urls)
+        else:
+            # Forked workers must not share this process's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker_process) as pool:
+                futures = {
+                    semester_id: pool.submit(render_semester_site, semester_id, str(output), asset_urls)
+                    for semester_id in stale
+                }
+                rendered = {semester_id: future.result() for semester_id, future in futures.items()}
+
+    current = {str(semester_id) for semester_id, _ in semesters}
+    for semester_id in set(previous) - current:
+        shutil.rmtree(output / 'public' / semester_id, ignore_errors=True)
+        shutil.rmtree(output / 'exports' / semester_id, ignore_errors=True)
+
+    entries = {
+        str(semester_id): rendered[semester_id] if semester_id in rendered else previous[str(semester_id)]
+        for semester_id, _ in semesters
+    }
+    index_semesters = Semester.objects.in_bulk([semester_id for semester_id, _ in semesters])
+    html = render_to_string('bou_routines_app/static_site_index.html', {
+        'semesters': [
+            {'semester': index_semesters[semester_id], **entries[str(semester_id)]}
+            for semester_id, _ in semesters
+        ],
+        'published_at': datetime.now(),
+    })
+    _write(output / 'index.html', _use_assets(html, asset_urls))
+
+    manifest = {'assets': asset_urls, 'semesters': entries}
+    _write(manifest_path, json.dumps(manifest, indent=2))
+    return [entries[str(semester_id)]['name'] for semester_id in rendered], manifest
@@ -0,0 +1,43 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from bou_routines_app import grid, validation
+from bou_routines_app.models import Course, NewRoutine, Semester, Teacher
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'revisions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'revisions'},
+})
+class RoutineTestCase(TestCase):
+    """Two Friday/Saturday semesters in August 2025 (1 August is a Friday) and three courses"""
+
+    def setUp(self):
+        # Per-process indexes and cache entries are keyed by revisions, which repeat between rolled back tests
+        cache.clear()
+        validation._index = None
+        grid._grid_states.clear()
+        self.rahman = Teacher.objects.create(name="Dr. Rahman", short_name="DR")
+        self.karim = Teacher.objects.create(name="Mr. Karim", short_name="MK")
+        self.semester = Semester.objects.create(
+            name="Y1S1", order=1, start_date=date(2025, 8, 1), end_date=date(2025, 8, 30),
+            lunch_break_start=time(13, 0), lunch_break_end=time(14, 0),
+        )
+        self.other_semester = Semester.objects.create(name="Y2S1", order=2, start_date=date(2025, 8, 1), end_date=date(2025, 8, 30))
+        self.algorithms = Course.objects.create(code="CSE1101", name="Algorithms", teacher=self.rahman)
+        self.algorithms_lab = Course.objects.create(code="CSE1102P", name="Algorithms Lab", teacher=self.rahman)
+        self.networks = Course.objects.create(code="CSE2101", name="Networks", teacher=self.karim)
+
+    def routine(self, course, class_date, start, end, semester=None):
+        return NewRoutine.objects.create(
+            semester=semester or self.semester, course=course, class_date=class_date,
+            day=class_date.strftime('%A'), start_time=start, end_time=end,
+        )
+
+    def login(self):
+        user = User.objects.create_user('staff', password='staff')
+        self.client.force_login(user)
+        return user
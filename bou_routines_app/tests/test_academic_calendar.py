@@ -0,0 +1,79 @@
+from datetime import date, time
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from bou_routines_app.academic_calendar import HolidayIndex, rule_dates, semester_events
+from bou_routines_app.models import CalendarEventRule, Semester
+from bou_routines_app.weekdays import weekday_mask
+
+from .base import RoutineTestCase
+
+
+class HolidayIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.holidays = HolidayIndex([date(2025, 8, 8), date(2025, 8, 9), date(2025, 8, 15)])
+
+    def test_rolls_past_runs_of_holidays(self):
+        self.assertIn(date(2025, 8, 9), self.holidays)
+        self.assertNotIn(date(2025, 8, 10), self.holidays)
+        self.assertEqual(self.holidays.next_day(date(2025, 8, 8)), date(2025, 8, 10))
+        self.assertEqual(self.holidays.next_day(date(2025, 8, 7)), date(2025, 8, 7))
+        self.assertEqual(self.holidays.next_week(date(2025, 8, 8)), date(2025, 8, 22))
+        self.assertEqual(self.holidays.next_week(date(2025, 8, 9)), date(2025, 8, 16))
+
+    def test_rule_dates_follow_the_holiday_policy(self):
+        # Week 1 after a Friday 1 August start holds Friday 8 and Saturday 9 August
+        start, class_weekdays = date(2025, 8, 1), [4, 5]
+        rule = CalendarEventRule(name="Test", offset_weeks=1)
+        self.assertEqual(rule_dates(rule, start, class_weekdays, self.holidays), [date(2025, 8, 16), date(2025, 8, 22)])
+        rule.holiday_policy = 'skip'
+        self.assertEqual(rule_dates(rule, start, class_weekdays, self.holidays), [])
+        rule.holiday_policy, rule.weekdays = 'next_day', weekday_mask(['Friday'])
+        self.assertEqual(rule_dates(rule, start, class_weekdays, self.holidays), [date(2025, 8, 10)])
+
+
+class SemesterEventTests(RoutineTestCase):
+    def test_events_in_date_order(self):
+        self.semester.makeup_dates = "2025-08-31"
+        self.semester.holidays = "2025-09-07"
+        rules = [CalendarEventRule(name="First Assignment", offset_weeks=2)]
+        events = semester_events(self.semester, rules)
+        self.assertEqual([(e['name'], e['date']) for e in events], [
+            ("Semester Begins", date(2025, 8, 1)),
+            ("First Assignment", date(2025, 8, 15)),
+            ("Semester End", date(2025, 8, 30)),
+            ("Tentative Semester Final Exam", date(2025, 9, 8)),
+        ])
+
+    def test_semesters_without_class_days_use_the_default_ones(self):
+        self.semester.class_days = 0
+        events = semester_events(self.semester, [CalendarEventRule(name="Test", offset_weeks=0)])
+        self.assertEqual(events[1]['dates'], [date(2025, 8, 1), date(2025, 8, 2)])
+
+    def test_events_endpoint_uses_the_active_rules(self):
+        self.login()
+        CalendarEventRule.objects.exclude(name="First Assignment").update(active=False)
+        response = self.client.get(reverse('academic-calendar-events'), {'semester_id': self.semester.id})
+        events = response.json()['semesters'][0]['events']
+        self.assertEqual([e['name'] for e in events], ["Semester Begins", "First Assignment", "Semester End", "Tentative Semester Final Exam"])
+        self.assertEqual(events[1]['display'], "29/08/2025, 30/08/2025")
+        self.assertEqual(self.client.get(reverse('academic-calendar-events'), {'semester_id': 999}).status_code, 404)
+
+
+class AcademicCalendarPdfTests(RoutineTestCase):
+    def test_renders_semesters_without_a_contact_person(self):
+        from bou_routines_app.exports import render_all_academic_calendars_pdf
+
+        Semester.objects.filter(id=self.other_semester.id).update(contact_person="Dr. Rahman", contact_person_phone="0123")
+        response = render_all_academic_calendars_pdf()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+    def test_routine_pdf_without_a_contact_person(self):
+        from bou_routines_app.exports import render_routine_pdf
+
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        response = render_routine_pdf(self.semester.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
@@ -0,0 +1,62 @@
+from datetime import date, time
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from bou_routines_app.models import CurrentRoutine, SemesterCourse
+
+from .base import RoutineTestCase
+
+
+class AsyncJsonViewTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.login())
+
+    async def test_login_is_required(self):
+        response = await AsyncClient().get(reverse('get-semester-courses'), {'semester_id': self.semester.id})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/login', response['Location'])
+
+    async def test_semester_courses(self):
+        await SemesterCourse.objects.acreate(semester=self.semester, course=self.algorithms, number_of_classes=4)
+        response = await self.async_client.get(reverse('get-semester-courses'), {'semester_id': self.semester.id})
+        data = response.json()
+        self.assertEqual([(c['code'], c['teacher_name'], c['number_of_classes']) for c in data['courses']], [('CSE1101', 'Dr. Rahman', 4)])
+        self.assertEqual(data['lunch_break'], {'start': '13:00', 'end': '14:00'})
+        self.assertEqual(data['date_range'], {'start_date': '08/01/2025', 'end_date': '08/30/2025'})
+        self.assertEqual(data['class_days'], ['Friday', 'Saturday'])
+
+        response = await self.async_client.get(reverse('get-semester-courses'), {'semester_id': 999})
+        self.assertEqual(response.json(), {'courses': [], 'lunch_break': None})
+
+    async def test_existing_generated_routines(self):
+        await self.async_routine(self.networks, date(2025, 8, 2), time(11, 0), time(12, 0))
+        await self.async_routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        response = await self.async_client.get(reverse('get-existing-generated-routines'), {'semester_id': self.semester.id})
+        data = response.json()
+        self.assertTrue(data['has_routines'])
+        self.assertEqual([(r['date'], r['course_code']) for r in data['routines']], [('2025-08-01', 'CSE1101'), ('2025-08-02', 'CSE2101')])
+
+    async def test_time_overlap_reports_the_lunch_break_and_the_teachers_classes(self):
+        await CurrentRoutine.objects.acreate(
+            semester=self.other_semester, course=self.algorithms_lab, day='Friday', start_time=time(12, 0), end_time=time(13, 0)
+        )
+        params = {
+            'day': 'Friday', 'start_time': '12:30', 'end_time': '13:30', 'teacher_id': self.rahman.id,
+            'course_id': self.algorithms.id, 'semester_id': self.semester.id,
+        }
+        response = await self.async_client.get(reverse('check-time-overlap'), params)
+        data = response.json()
+        self.assertTrue(data['hasOverlaps'])
+        self.assertEqual([o['course'] for o in data['overlaps']], ['Lunch Break', 'CSE1102P'])
+
+        # The course being edited is not in its own way
+        params['course_id'] = self.algorithms_lab.id
+        params['start_time'], params['end_time'] = '11:00', '12:00'
+        response = await self.async_client.get(reverse('check-time-overlap'), params)
+        self.assertEqual(response.json()['overlaps'], [])
+
+    async def async_routine(self, *args, **kwargs):
+        return await sync_to_async(self.routine)(*args, **kwargs)
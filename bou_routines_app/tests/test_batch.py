@@ -0,0 +1,77 @@
+import json
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.batch import apply_routine_batch
+from bou_routines_app.models import NewRoutine, Semester
+
+from .base import RoutineTestCase
+
+
+class RoutineBatchTests(RoutineTestCase):
+    def create(self, course, class_date, day=None, start='09:00', end='10:00'):
+        return {
+            'op': 'create', 'course_id': course.id, 'date': class_date.isoformat(),
+            'day': day or class_date.strftime('%A'), 'start_time': start, 'end_time': end,
+        }
+
+    def test_applies_all_operations_in_one_go(self):
+        old = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        revision = Semester.objects.get(id=self.semester.id).revision
+        applied, results = apply_routine_batch(self.semester, [
+            {'op': 'delete', 'routine_id': old.id},
+            # The slot the delete frees can be reused by the same teacher
+            self.create(self.algorithms_lab, date(2025, 8, 1)),
+        ])
+        self.assertTrue(applied)
+        self.assertEqual([r['status'] for r in results], ['ok', 'ok'])
+        self.assertEqual(list(NewRoutine.objects.values_list('course__code', flat=True)), ['CSE1102P'])
+        self.assertEqual(Semester.objects.get(id=self.semester.id).revision, revision + 1)
+
+    def test_rejects_classes_outside_the_semester_or_on_the_wrong_weekday(self):
+        applied, results = apply_routine_batch(self.semester, [
+            self.create(self.algorithms, date(2025, 9, 5)),
+            self.create(self.algorithms, date(2025, 8, 1), day='Saturday'),
+            self.create(self.networks, date(2025, 8, 2)),
+        ])
+        self.assertFalse(applied)
+        self.assertIn("outside Y1S1", results[0]['error'])
+        self.assertIn("is a Friday, not a Saturday", results[1]['error'])
+        self.assertEqual(results[2]['status'], 'skipped')
+        self.assertFalse(NewRoutine.objects.exists())
+
+    def test_double_booking_needs_allow_conflicts(self):
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0), semester=self.other_semester)
+        operations = [self.create(self.algorithms_lab, date(2025, 8, 1), start='09:30', end='11:00')]
+
+        applied, results = apply_routine_batch(self.semester, operations)
+        self.assertFalse(applied)
+        self.assertTrue(results[0]['can_override'])
+
+        applied, results = apply_routine_batch(self.semester, operations, allow_conflicts=True)
+        self.assertTrue(applied)
+        self.assertEqual(len(results[0]['conflicts']), 1)
+
+    def test_rejects_the_lunch_break(self):
+        applied, results = apply_routine_batch(self.semester, [self.create(self.algorithms, date(2025, 8, 1), start='12:30', end='13:30')])
+        self.assertFalse(applied)
+        self.assertIn("lunch break", results[0]['error'])
+
+    def test_batch_endpoint(self):
+        self.login()
+        old = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        body = {'semester_id': self.semester.id, 'operations': [
+            {'op': 'update', 'routine_id': old.id, 'course_id': self.networks.id},
+            self.create(self.algorithms, date(2025, 8, 2)),
+        ]}
+        response = self.client.post(reverse('routine-batch'), json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(
+            sorted(NewRoutine.objects.values_list('course__code', 'class_date')),
+            [('CSE1101', date(2025, 8, 2)), ('CSE2101', date(2025, 8, 1))],
+        )
+
+        response = self.client.post(reverse('routine-batch'), json.dumps({'operations': []}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,30 @@
+from django.urls import reverse
+
+from .base import RoutineTestCase
+
+
+class CatalogTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.login()
+
+    def test_lists_courses_and_teachers(self):
+        data = self.client.get(reverse('catalog')).json()
+        self.assertEqual([c[1:] for c in data['courses']], [
+            ['CSE1101', 'Algorithms', self.rahman.id],
+            ['CSE1102P', 'Algorithms Lab', self.rahman.id],
+            ['CSE2101', 'Networks', self.karim.id],
+        ])
+        self.assertEqual(data['teachers'], [[self.rahman.id, 'Dr. Rahman', 'DR'], [self.karim.id, 'Mr. Karim', 'MK']])
+
+    def test_revalidates_by_etag_until_a_course_changes(self):
+        response = self.client.get(reverse('catalog'))
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertEqual(self.client.get(reverse('catalog'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.networks.name = "Computer Networks"
+        self.networks.save()
+        response = self.client.get(reverse('catalog'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(['CSE2101', 'Computer Networks', self.karim.id], [c[1:] for c in response.json()['courses']])
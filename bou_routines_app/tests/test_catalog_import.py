@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from bou_routines_app.catalog_import import IMPORT_COLUMNS, import_catalog
+from bou_routines_app.models import Course, CurrentRoutine, SemesterCourse, Teacher
+
+from .base import RoutineTestCase
+
+
+def rows(*values):
+    return [(row_number, dict(zip(IMPORT_COLUMNS, row))) for row_number, row in enumerate(values, start=2)]
+
+
+class CatalogImportTests(RoutineTestCase):
+    def test_creates_and_updates_records(self):
+        report = import_catalog(rows(
+            ('Y1S1', 'CSE1101', 'Algorithms', 'Dr. Rahman', '', '4'),
+            ('Y1S1', 'CSE1201', 'Compilers', 'Ms. Akter', 'MA', ''),
+        ))
+        self.assertEqual(report['errors'], [])
+        self.assertEqual(
+            (report['teachers_created'], report['courses_created'], report['semester_courses_created']), (1, 1, 2)
+        )
+        compilers = SemesterCourse.objects.get(course__code='CSE1201')
+        self.assertEqual((compilers.course.teacher.short_name, compilers.number_of_classes), ('MA', 1))
+
+        report = import_catalog(rows(('Y1S1', 'CSE1201', 'Compilers', 'Ms. Akter', 'MA', '6')))
+        self.assertEqual(report['semester_courses_updated'], 1)
+        self.assertEqual(SemesterCourse.objects.get(course__code='CSE1201').number_of_classes, 6)
+
+    def test_any_invalid_row_writes_nothing(self):
+        report = import_catalog(rows(
+            ('Y1S1', 'CSE1201', 'Compilers', 'Ms. Akter', 'MA', '2'),
+            ('Y9S9', 'CSE1202', 'Networks', 'Ms. Akter', 'MA', 'two'),
+        ))
+        self.assertEqual({error['row'] for error in report['errors']}, {3})
+        self.assertEqual({error['error'] for error in report['errors']}, {
+            "Semester Y9S9 does not exist",
+            "Course name Networks already belongs to CSE2101",
+            "number_of_classes must be a whole number",
+        })
+        self.assertFalse(Course.objects.filter(code='CSE1201').exists())
+
+    def test_dry_run_counts_without_saving(self):
+        report = import_catalog(rows(('', 'CSE1201', 'Compilers', 'Ms. Akter', '', '')), dry_run=True)
+        self.assertEqual(report['courses_created'], 1)
+        self.assertFalse(Teacher.objects.filter(name='Ms. Akter').exists())
+
+    def test_upload_page(self):
+        self.login()
+        url = reverse('import-catalog')
+        template = self.client.get(url, {'template': 1})
+        self.assertEqual(template.content.decode(), ','.join(IMPORT_COLUMNS) + '\r\n')
+
+        sheet = 'Course Code,Course Name,Teacher,Semester\r\nCSE1201,Compilers,Ms. Akter,Y1S1\r\n'
+        response = self.client.post(url, {'file': SimpleUploadedFile('courses.csv', sheet.encode())})
+        self.assertContains(response, '1 row(s) imported.')
+        self.assertTrue(SemesterCourse.objects.filter(semester=self.semester, course__code='CSE1201').exists())
+
+        response = self.client.post(url, {'file': SimpleUploadedFile('courses.txt', b'x')})
+        self.assertContains(response, 'Upload a .csv or .xlsx file')
+        response = self.client.post(url, {'file': SimpleUploadedFile('courses.csv', b'name\r\nx\r\n')})
+        self.assertContains(response, 'Missing column(s): course_code, course_name, teacher')
+
+
+class SeedCurrentRoutinesTests(RoutineTestCase):
+    def test_seeds_known_courses_once(self):
+        Course.objects.create(code='CSE3133', name='Databases', teacher=self.karim)
+        out = StringIO()
+        call_command('seed_current_routines', stdout=out)
+        self.assertIn('Seeded 1 CurrentRoutine entries. Skipped: 8', out.getvalue())
+        routine = CurrentRoutine.objects.get()
+        self.assertEqual((routine.semester.name, routine.day, str(routine.start_time)), ('Y3S1', 'Friday', '10:00:00'))
+
+        call_command('seed_current_routines', stdout=out)
+        self.assertEqual(CurrentRoutine.objects.count(), 1)
@@ -0,0 +1,40 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.conflicts import find_double_bookings, overlapping_pairs
+
+from .base import RoutineTestCase
+
+
+class DoubleBookingTests(RoutineTestCase):
+    def test_overlapping_pairs_ignores_touching_classes(self):
+        bookings = [
+            {'id': 1, 'start_time': time(9, 0), 'end_time': time(10, 0)},
+            {'id': 2, 'start_time': time(10, 0), 'end_time': time(11, 0)},
+            {'id': 3, 'start_time': time(9, 30), 'end_time': time(10, 30)},
+        ]
+        pairs = {(first['id'], second['id']) for first, second in overlapping_pairs(bookings)}
+        self.assertEqual(pairs, {(1, 3), (3, 2)})
+
+    def test_finds_bookings_across_semesters_and_skips_untimed_classes(self):
+        friday = date(2025, 8, 1)
+        self.routine(self.algorithms, friday, time(9, 0), time(10, 0))
+        self.routine(self.algorithms_lab, friday, time(9, 30), time(11, 0), semester=self.other_semester)
+        self.routine(self.algorithms, friday, None, None)
+        self.routine(self.networks, friday, time(9, 0), time(10, 0))
+
+        conflicts, checked = find_double_bookings()
+        self.assertEqual(checked, 3)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['teacher'], "Dr. Rahman")
+        self.assertEqual({c['semester'] for c in conflicts[0]['classes']}, {"Y1S1", "Y2S1"})
+
+    def test_double_bookings_endpoint_filters_by_date(self):
+        self.login()
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.routine(self.algorithms_lab, date(2025, 8, 1), time(9, 0), time(10, 0), semester=self.other_semester)
+
+        self.assertEqual(self.client.get(reverse('double-bookings')).json()['count'], 1)
+        self.assertEqual(self.client.get(reverse('double-bookings'), {'dates': '2025-08-02'}).json()['count'], 0)
+        self.assertEqual(self.client.get(reverse('double-bookings'), {'dates': '08/01/2025'}).status_code, 400)
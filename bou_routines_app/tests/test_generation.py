@@ -0,0 +1,85 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.generation import generate_semester_routines
+from bou_routines_app.models import CurrentRoutine, GenerationJob, NewRoutine, Semester, SemesterCourse
+
+from .base import RoutineTestCase
+
+
+class GenerationTests(RoutineTestCase):
+    def test_skips_holidays_and_bumps_the_revision_once(self):
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=3)
+        self.semester.holidays = "2025-08-08"
+        self.semester.save()
+        revision = Semester.objects.get(id=self.semester.id).revision
+
+        generated, warnings = generate_semester_routines(
+            self.semester, [(str(self.algorithms.id), 'Friday', '09:00', '10:00')], date(2025, 8, 1), date(2025, 8, 30)
+        )
+        self.assertEqual(warnings, [])
+        self.assertEqual([r['date'] for r in generated], [date(2025, 8, 1), date(2025, 8, 15), date(2025, 8, 22)])
+        self.assertEqual(NewRoutine.objects.filter(semester=self.semester).count(), 3)
+        self.assertEqual(CurrentRoutine.objects.get(semester=self.semester).day, 'Friday')
+        self.assertEqual(Semester.objects.get(id=self.semester.id).revision, revision + 1)
+
+    def test_places_missing_classes_on_makeup_dates(self):
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=3)
+        self.semester.makeup_dates = "2025-08-09"
+        self.semester.save()
+
+        generated, warnings = generate_semester_routines(
+            self.semester, [(str(self.algorithms.id), 'Friday', '09:00', '10:00')], date(2025, 8, 1), date(2025, 8, 8)
+        )
+        self.assertEqual([r['date'] for r in generated], [date(2025, 8, 1), date(2025, 8, 8), date(2025, 8, 9)])
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("placed on makeup dates (09/08/2025)", warnings[0])
+
+    def test_regenerating_replaces_the_semesters_classes(self):
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=1)
+        self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(10, 0))
+        generate_semester_routines(
+            self.semester, [(str(self.algorithms.id), 'Saturday', '10:00', '11:00')], date(2025, 8, 1), date(2025, 8, 30)
+        )
+        self.assertEqual(
+            list(NewRoutine.objects.filter(semester=self.semester).values_list('course__code', 'class_date')),
+            [('CSE1101', date(2025, 8, 2))],
+        )
+
+
+class GeneratePageTests(RoutineTestCase):
+    def post(self, start, end):
+        return self.client.post(reverse('generate-routine'), {
+            'semester': self.semester.id,
+            'date_range': '08/01/2025 - 08/30/2025',
+            'lunch_break_start': '13:00',
+            'lunch_break_end': '14:00',
+            'course_code[]': [self.algorithms.id],
+            'day[]': ['Friday'],
+            'start_time[]': [start],
+            'end_time[]': [end],
+        })
+
+    def setUp(self):
+        super().setUp()
+        self.login()
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=2)
+
+    def test_generate_saves_the_schedule_and_queues_a_job(self):
+        response = self.post('09:00', '10:00')
+        job = GenerationJob.objects.get()
+        self.assertRedirects(response, f"{reverse('generate-routine')}?semester={self.semester.id}&job={job.id}", fetch_redirect_response=False)
+        self.assertEqual((job.semester, job.status), (self.semester, "pending"))
+        self.assertTrue(CurrentRoutine.objects.filter(semester=self.semester, course=self.algorithms, day='Friday').exists())
+        # Generation itself is left to the worker
+        self.assertFalse(NewRoutine.objects.exists())
+
+        page = self.client.get(response['Location'])
+        self.assertContains(page, reverse('generation-job-status', args=[job.id]))
+
+    def test_conflicts_are_shown_instead_of_queueing(self):
+        response = self.post('12:30', '13:30')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['course'] for c in response.context['overlap_conflicts']], ["Lunch Break"])
+        self.assertFalse(GenerationJob.objects.exists())
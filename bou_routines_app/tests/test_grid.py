@@ -0,0 +1,41 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.grid import build_slot_ranges, merge_row
+
+from .base import RoutineTestCase
+
+
+class SlotMergeTests(RoutineTestCase):
+    def test_slot_columns_keep_only_covered_ranges(self):
+        slots = build_slot_ranges([('09:00', '10:00'), ('09:00', '11:00'), ('15:00', '16:00')], lunch_break=('13:00', '14:00'))
+        self.assertEqual(slots, [('09:00', '10:00'), ('10:00', '11:00'), ('13:00', '14:00'), ('15:00', '16:00')])
+
+    def test_first_class_of_a_start_time_wins(self):
+        slots = [('09:00', '10:00'), ('10:00', '11:00'), ('11:00', '12:00')]
+        cells = merge_row([('09:00', '11:00', 'a'), ('09:00', '10:00', 'b'), ('11:00', '12:00', 'c')], slots)
+        self.assertEqual(cells, [(0, 2, 'a'), (2, 1, 'c')])
+
+
+class SemesterGridTests(RoutineTestCase):
+    def test_columnar_grid(self):
+        self.login()
+        self.semester.makeup_dates = "2025-08-16"
+        self.semester.save()
+        friday = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        saturday = self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(11, 0))
+
+        response = self.client.get(reverse('semester-grid', args=[self.semester.id]))
+        grid = response.json()
+        self.assertEqual(grid['semester'], {'id': self.semester.id, 'name': 'Y1S1'})
+        self.assertEqual(grid['slots'], [['09:00', '10:00'], ['10:00', '11:00'], ['13:00', '14:00']])
+        self.assertEqual(grid['dates'], [['2025-08-01', 'Friday', 0], ['2025-08-02', 'Saturday', 0], ['2025-08-16', 'Saturday', 1]])
+        self.assertEqual([c[1] for c in grid['courses']], ['CSE1101', 'CSE2101'])
+        self.assertEqual(grid['courses'][0][3:], ['Dr. Rahman', 'DR'])
+        self.assertEqual(grid['cells'], [[0, 0, 1, 0, friday.id], [1, 0, 2, 1, saturday.id]])
+        self.assertEqual(grid['lunch'], [2, 1])
+
+    def test_unknown_semester(self):
+        self.login()
+        self.assertEqual(self.client.get(reverse('semester-grid', args=[999])).status_code, 404)
@@ -0,0 +1,70 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.grid import get_grid_state, record_grid_change
+from bou_routines_app.models import NewRoutine, Semester, bump_semester_revision
+
+from .base import RoutineTestCase
+
+
+class GridPatchTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.friday = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.saturday = self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(10, 0))
+        # Untimed classes are left out of the grid
+        self.routine(self.networks, date(2025, 8, 9), None, None)
+
+    def state(self):
+        return get_grid_state(Semester.objects.get(id=self.semester.id))
+
+    def test_patch_holds_only_the_touched_dates(self):
+        state = self.state()
+        revision = state.revision
+        NewRoutine.objects.filter(id=self.friday.id).update(course=self.networks)
+        bump_semester_revision([self.semester.id])
+
+        patch = record_grid_change(state, removed_ids=[self.friday.id], changed_ids=[self.friday.id], client_revision=revision)
+        self.assertFalse(patch['full'])
+        self.assertEqual(patch['revision'], revision + 1)
+        self.assertEqual(patch['dates'], [['2025-08-01', 'Friday', 0]])
+        self.assertEqual([c[1] for c in patch['courses']], ['CSE2101'])
+        self.assertEqual(patch['cells'], [[0, 0, 1, 0, self.friday.id]])
+        self.assertEqual(patch['removed_dates'], [])
+
+    def test_removing_the_last_class_of_a_date_lists_it_as_removed(self):
+        state = self.state()
+        NewRoutine.objects.filter(id=self.saturday.id).delete()
+        bump_semester_revision([self.semester.id])
+        patch = record_grid_change(state, removed_ids=[self.saturday.id])
+        self.assertFalse(patch['full'])
+        self.assertEqual((patch['dates'], patch['removed_dates']), ([], ['2025-08-02']))
+
+    def test_whole_grid_when_the_slot_columns_move(self):
+        state = self.state()
+        routine = self.routine(self.algorithms, date(2025, 8, 8), time(10, 0), time(11, 30))
+        bump_semester_revision([self.semester.id])
+        patch = record_grid_change(state, changed_ids=[routine.id])
+        self.assertTrue(patch['full'])
+        self.assertEqual(len(patch['dates']), 3)
+
+    def test_whole_grid_for_a_stale_client_or_somebody_elses_write(self):
+        state = self.state()
+        revision = state.revision
+        bump_semester_revision([self.semester.id])
+        self.assertTrue(record_grid_change(state, changed_ids=[self.friday.id], client_revision=revision - 1)['full'])
+
+        state = self.state()
+        bump_semester_revision([self.semester.id])
+        bump_semester_revision([self.semester.id])
+        patch = record_grid_change(state, changed_ids=[self.friday.id])
+        self.assertTrue(patch['full'])
+        self.assertEqual(patch['revision'], revision + 3)
+
+    def test_remove_endpoint_returns_a_patch(self):
+        self.login()
+        response = self.client.post(reverse('remove-routine-course'), {'routine_id': self.friday.id})
+        patch = response.json()['grid_patch']
+        self.assertFalse(patch['full'])
+        self.assertEqual(patch['removed_dates'], ['2025-08-01'])
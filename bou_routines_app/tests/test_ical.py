@@ -0,0 +1,79 @@
+from datetime import date, time
+
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from bou_routines_app.ical import _fold
+from bou_routines_app.models import bump_semester_revision
+
+from .base import RoutineTestCase
+
+
+def feed_text(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@override_settings(ICAL_TIME_ZONE='Asia/Dhaka')
+class ICalFeedTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.routine(self.networks, date(2025, 8, 2), time(11, 0), time(12, 0))
+        self.routine(self.algorithms_lab, date(2025, 8, 2), time(9, 0), time(11, 0), semester=self.other_semester)
+        bump_semester_revision([self.semester.id, self.other_semester.id])
+
+    def test_semester_feed(self):
+        response = self.client.get(reverse('semester-ical', args=[self.semester.id]))
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn('public', response['Cache-Control'])
+        body = feed_text(response)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertIn('X-WR-CALNAME:Y1S1 Routine\r\n', body)
+        self.assertEqual(body.count('BEGIN:VEVENT'), body.count('END:VEVENT'))
+        # 09:00 in Dhaka (UTC+6)
+        self.assertIn(f'UID:routine-{self.first.id}@', body)
+        self.assertIn('DTSTART:20250801T030000Z\r\n', body)
+        self.assertIn('SUMMARY:CSE1101 Algorithms\r\n', body)
+        self.assertIn('DESCRIPTION:Y1S1\\, Dr. Rahman\r\n', body)
+        self.assertNotIn('CSE1102P', body)
+
+    def test_teacher_and_course_feeds_span_semesters(self):
+        body = feed_text(self.client.get(reverse('teacher-ical', args=[self.rahman.id])))
+        self.assertIn('SUMMARY:CSE1101 Algorithms', body)
+        self.assertIn('SUMMARY:CSE1102P Algorithms Lab', body)
+        self.assertNotIn('CSE2101', body)
+
+        body = feed_text(self.client.get(reverse('course-ical', args=[self.networks.id])))
+        self.assertIn('X-WR-CALNAME:CSE2101 Networks', body)
+        self.assertEqual(body.count('UID:routine-'), 1)
+
+    def test_etag_changes_with_the_routine(self):
+        url = reverse('teacher-ical', args=[self.rahman.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        bump_semester_revision([self.other_semester.id])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unknown_ids(self):
+        for name, error in (('semester-ical', 'Semester'), ('teacher-ical', 'Teacher'), ('course-ical', 'Course')):
+            response = self.client.get(reverse(name, args=[999]))
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {"error": f"{error} not found"})
+
+    async def test_streams_under_asgi(self):
+        response = await AsyncClient().get(reverse('semester-ical', args=[self.semester.id]))
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(body.count('UID:routine-'), 2)
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+
+    def test_long_lines_are_folded_without_splitting_characters(self):
+        line = 'SUMMARY:' + 'রুটিন' * 20
+        folded = _fold(line)
+        parts = folded.split('\r\n ')
+        self.assertTrue(all(len(part.encode()) <= 75 for part in parts[:-1]))
+        self.assertEqual(''.join(parts), line + '\r\n')
@@ -0,0 +1,97 @@
+from datetime import date, time, timedelta
+
+from django.utils import timezone
+
+from bou_routines_app.jobs import claim_next_job, enqueue_generation, requeue_stale_jobs, run_job
+from bou_routines_app.models import CurrentRoutine, GenerationJob, NewRoutine, SemesterCourse
+
+from .base import RoutineTestCase
+
+
+class GenerationJobTests(RoutineTestCase):
+    def schedule(self, semester, course, day, start, end, number_of_classes=2):
+        SemesterCourse.objects.create(semester=semester, course=course, number_of_classes=number_of_classes)
+        CurrentRoutine.objects.create(semester=semester, course=course, day=day, start_time=start, end_time=end)
+
+    def test_claimed_job_generates_the_saved_schedule(self):
+        self.schedule(self.semester, self.algorithms, 'Saturday', time(9, 0), time(10, 0))
+        enqueue_generation(self.semester)
+
+        job = claim_next_job()
+        self.assertEqual(job.status, "running")
+        self.assertTrue(job.claim_token)
+        self.assertIsNone(claim_next_job())
+        run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.summary["Y1S1"]["classes"], 2)
+        self.assertEqual(job.progress, job.total)
+
+    def test_progress_counts_semester_courses(self):
+        self.schedule(self.semester, self.algorithms, 'Friday', time(9, 0), time(10, 0))
+        # A second schedule row for the same course, and a course without any
+        CurrentRoutine.objects.create(semester=self.semester, course=self.algorithms, day='Saturday', start_time=time(9, 0), end_time=time(10, 0))
+        SemesterCourse.objects.create(semester=self.semester, course=self.networks)
+        # Skipped: no date range
+        self.other_semester.start_date = None
+        self.other_semester.save()
+        self.schedule(self.other_semester, self.algorithms_lab, 'Friday', time(11, 0), time(12, 0))
+        enqueue_generation()
+
+        job = claim_next_job()
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertEqual((job.progress, job.total), (3, 3))
+        self.assertIn("No date range", job.summary["Y2S1"]["skipped"])
+
+    def test_schedule_conflicts_fail_the_job_without_generating(self):
+        self.schedule(self.semester, self.algorithms, 'Friday', time(12, 30), time(13, 30))
+        self.schedule(self.other_semester, self.algorithms_lab, 'Saturday', time(9, 0), time(10, 0))
+        self.schedule(self.semester, self.networks, 'Saturday', time(9, 0), time(10, 0))
+        CurrentRoutine.objects.create(semester=self.semester, course=self.algorithms, day='Saturday', start_time=time(9, 30), end_time=time(10, 30))
+        self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(10, 0))
+        enqueue_generation()
+
+        job = claim_next_job()
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Lunch Break", job.error)
+        self.assertEqual(
+            {(c['course'], c['day']) for c in job.summary["Y1S1"]["conflicts"]},
+            {("Lunch Break", "Friday"), ("CSE1102P", "Saturday")},
+        )
+        self.assertEqual({c['course'] for c in job.summary["Y2S1"]["conflicts"]}, {"CSE1101"})
+        self.assertEqual(NewRoutine.objects.count(), 1)
+
+    def test_stale_heartbeats_are_requeued(self):
+        hour_ago = timezone.now() - timedelta(hours=1)
+        stale = GenerationJob.objects.create(status="running", started_at=hour_ago, heartbeat_at=hour_ago, claim_token="a", progress=3)
+        # Running for an hour but still reporting progress
+        live = GenerationJob.objects.create(status="running", started_at=hour_ago, heartbeat_at=timezone.now(), claim_token="b")
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        stale.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((stale.status, stale.progress, stale.started_at, stale.claim_token), ("pending", 0, None, ""))
+        self.assertEqual(live.status, "running")
+        self.assertEqual(claim_next_job().id, stale.id)
+
+    def test_superseded_run_writes_nothing(self):
+        self.schedule(self.semester, self.algorithms, 'Saturday', time(9, 0), time(10, 0))
+        enqueue_generation(self.semester)
+        stalled = claim_next_job()
+        # The job was requeued and claimed again while the first run was stalled
+        GenerationJob.objects.filter(id=stalled.id).update(status="pending", claim_token="")
+        current = claim_next_job()
+
+        run_job(stalled)
+        job = GenerationJob.objects.get(id=stalled.id)
+        self.assertEqual((job.status, job.claim_token, job.summary), ("running", current.claim_token, {}))
+        self.assertFalse(NewRoutine.objects.exists())
+
+        run_job(current)
+        self.assertEqual(GenerationJob.objects.get(id=stalled.id).status, "done")
+        self.assertEqual(NewRoutine.objects.count(), 2)
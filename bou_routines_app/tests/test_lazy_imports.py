@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+from bou_routines_app.management.commands.import_time_report import HEAVY_PACKAGES, PROBE
+
+
+def loaded_heavy_packages(module):
+    """Heavy packages loaded by importing module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE, module, *HEAVY_PACKAGES],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if result.returncode:
+        raise AssertionError(result.stderr)
+    return set(result.stdout.splitlines()[1].split())
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_views_and_urls_do_not_load_export_or_planner_libraries(self):
+        self.assertEqual(loaded_heavy_packages('bou_routines_app.views'), set())
+        self.assertEqual(loaded_heavy_packages('bou_routines_app.urls'), set())
+
+    def test_export_module_loads_its_libraries(self):
+        self.assertTrue({'reportlab', 'xlsxwriter'} <= loaded_heavy_packages('bou_routines_app.exports'))
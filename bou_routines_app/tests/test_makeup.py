@@ -0,0 +1,35 @@
+from datetime import date, time
+
+from bou_routines_app.makeup import place_shortfall
+
+from .base import RoutineTestCase
+
+
+class MakeupPlacementTests(RoutineTestCase):
+    def test_prefers_the_regular_time_and_avoids_the_teachers_other_classes(self):
+        saturday = date(2025, 8, 9)
+        self.routine(self.algorithms_lab, saturday, time(9, 0), time(10, 0), semester=self.other_semester)
+        # Untimed classes do not block anything
+        self.routine(self.networks, saturday, None, None, semester=self.other_semester)
+        placed, unplaced = place_shortfall(
+            self.semester,
+            [(self.algorithms, 1, 60, ('09:00', '10:00')), (self.networks, 1, 60, ('09:00', '10:00'))],
+            {saturday}, '09:00', '12:00',
+        )
+        self.assertEqual(placed[self.networks.id], [(saturday, '09:00', '10:00')])
+        self.assertEqual(placed[self.algorithms.id], [(saturday, '10:00', '11:00')])
+        self.assertEqual(unplaced, {})
+
+    def test_reports_classes_that_do_not_fit(self):
+        placed, unplaced = place_shortfall(self.semester, [(self.algorithms, 2, 60, None)], {date(2025, 8, 9)}, '09:00', '12:00')
+        # One class per course and makeup date
+        self.assertEqual(len(placed[self.algorithms.id]), 1)
+        self.assertEqual(unplaced, {self.algorithms.id: 1})
+
+    def test_skips_the_lunch_break_and_the_semesters_own_classes(self):
+        saturday = date(2025, 8, 9)
+        self.routine(self.networks, saturday, time(11, 0), time(13, 0))
+        placed, _ = place_shortfall(
+            self.semester, [(self.algorithms, 1, 90, None)], {saturday}, '11:00', '16:00', lunch_break=('13:00', '14:00'),
+        )
+        self.assertEqual(placed[self.algorithms.id], [(saturday, '14:00', '15:30')])
@@ -0,0 +1,49 @@
+from datetime import time
+
+from django.test import TestCase
+
+from bou_routines_app.models import CurrentRoutine
+from bou_routines_app.occupancy import TeacherOccupancy, interval_mask, mask_windows
+
+from .base import RoutineTestCase
+
+
+class OccupancyTests(TestCase):
+    def test_back_to_back_classes_do_not_conflict(self):
+        occupancy = TeacherOccupancy()
+        occupancy.add(1, 'Friday', '10:00', '10:32', course_id=1, routine_id=11)
+        self.assertTrue(occupancy.is_free(1, 'Friday', '10:32', '11:00'))
+        self.assertEqual(occupancy.conflicts(1, 'Friday', '10:32', '11:00'), [])
+        self.assertEqual(occupancy.conflicts(1, 'Friday', '10:31', '11:00'), [(1, 11)])
+
+    def test_conflicts_exclude_the_course_being_moved(self):
+        occupancy = TeacherOccupancy()
+        occupancy.add(1, 'Friday', '09:00', '10:00', course_id=1, routine_id=11)
+        occupancy.add(1, 'Friday', '09:30', '10:30', course_id=2, routine_id=12)
+        self.assertEqual(occupancy.conflicts(1, 'Friday', '09:45', '10:15', exclude_course=1), [(2, 12)])
+        self.assertTrue(occupancy.is_free(2, 'Friday', '09:00', '10:00'))
+        self.assertTrue(occupancy.is_free(1, 'Saturday', '09:00', '10:00'))
+
+    def test_free_windows_skip_busy_teachers_and_blocked_time(self):
+        occupancy = TeacherOccupancy()
+        occupancy.add(1, 'Saturday', '09:00', '10:30')
+        occupancy.add(2, 'Saturday', '11:00', '12:00')
+        windows = occupancy.free_windows([1, 2], 'Saturday', '08:00', '15:00', blocked=[('13:00', '14:00')], min_minutes=60)
+        self.assertEqual(windows, [('08:00', '09:00'), ('12:00', '13:00'), ('14:00', '15:00')])
+
+    def test_mask_windows_finds_runs_of_free_minutes(self):
+        free = interval_mask('08:00', '09:00') | interval_mask('10:00', '10:20')
+        self.assertEqual(mask_windows(free), [(480, 540), (600, 620)])
+        self.assertEqual(mask_windows(free, min_ticks=30), [(480, 540)])
+
+
+class OccupancyBuildTests(RoutineTestCase):
+    def test_built_from_saved_schedules(self):
+        lab = CurrentRoutine.objects.create(semester=self.other_semester, course=self.algorithms_lab, day='Friday', start_time=time(9, 0), end_time=time(10, 0))
+        CurrentRoutine.objects.create(semester=self.semester, course=self.networks, day='Friday', start_time=time(9, 0), end_time=time(10, 0))
+        CurrentRoutine.objects.create(semester=self.semester, course=self.algorithms, day='Saturday')
+
+        occupancy = TeacherOccupancy.build(teacher_ids=[self.rahman.id])
+        self.assertEqual(occupancy.conflicts(self.rahman.id, 'Friday', '09:30', '10:30'), [(self.algorithms_lab.id, lab.id)])
+        self.assertTrue(occupancy.is_free(self.karim.id, 'Friday', '09:00', '10:00'))
+        self.assertTrue(TeacherOccupancy.build(exclude_semester=self.other_semester).is_free(self.rahman.id, 'Friday', '09:00', '10:00'))
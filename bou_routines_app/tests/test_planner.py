@@ -0,0 +1,52 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.generation import generate_semester_routines
+from bou_routines_app.models import CurrentRoutine, SemesterCourse
+from bou_routines_app.planner import plan_date_ranges
+
+from .base import RoutineTestCase
+
+
+class DateRangePlannerTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=3)
+        SemesterCourse.objects.create(semester=self.semester, course=self.networks, number_of_classes=2)
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms_lab)
+        CurrentRoutine.objects.create(semester=self.semester, course=self.algorithms, day='Friday', start_time=time(9, 0), end_time=time(10, 0))
+        CurrentRoutine.objects.create(semester=self.semester, course=self.networks, day='Saturday', start_time=time(9, 0), end_time=time(10, 0))
+        self.semester.holidays = "2025-08-08"
+        self.semester.save()
+
+    def test_shortest_ranges_skip_holidays(self):
+        plan = plan_date_ranges(self.semester, date(2025, 8, 1), date(2025, 8, 2))
+        self.assertEqual(plan['candidates'], 2)
+        self.assertEqual(plan['unscheduled'], ['CSE1102P'])
+        self.assertEqual([(c['course_code'], c['sessions_needed']) for c in plan['courses']], [('CSE1101', 3), ('CSE2101', 2)])
+        self.assertEqual(plan['ranges'], [
+            {'start_date': '2025-08-01', 'end_date': '2025-08-22', 'days': 22, 'sessions': {'CSE1101': 3, 'CSE2101': 3}},
+            {'start_date': '2025-08-02', 'end_date': '2025-08-29', 'days': 28, 'sessions': {'CSE1101': 3, 'CSE2101': 4}},
+        ])
+
+        # Generation over the suggested range schedules every class
+        generated, warnings = generate_semester_routines(
+            self.semester,
+            [(str(self.algorithms.id), 'Friday', '09:00', '10:00'), (str(self.networks.id), 'Saturday', '09:00', '10:00')],
+            date(2025, 8, 1), date(2025, 8, 22),
+        )
+        self.assertEqual(len(generated), 5)
+
+    def test_latest_end_filters_ranges(self):
+        plan = plan_date_ranges(self.semester, date(2025, 8, 1), date(2025, 8, 2), latest_end=date(2025, 8, 25))
+        self.assertEqual([r['start_date'] for r in plan['ranges']], ['2025-08-01'])
+
+    def test_endpoint(self):
+        self.login()
+        response = self.client.get(reverse('plan-date-range'), {'semester_id': self.semester.id, 'latest_start': '2025-08-02', 'limit': 1})
+        self.assertEqual([r['end_date'] for r in response.json()['ranges']], ['2025-08-22'])
+
+        response = self.client.get(reverse('plan-date-range'), {'semester_id': self.other_semester.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("no saved class schedule", response.json()['error'])
@@ -0,0 +1,53 @@
+from datetime import date, time
+
+from django.test import override_settings
+from django.urls import reverse
+
+from bou_routines_app.models import bump_semester_revision
+
+from .base import RoutineTestCase
+
+
+@override_settings(PUBLIC_ROUTINE_MAX_AGE=300)
+class PublicRoutineTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.routine(self.networks, date(2025, 8, 2), time(11, 0), time(12, 0))
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        bump_semester_revision([self.semester.id])
+        self.semester.refresh_from_db()
+        self.etag = f'"{self.semester.id}-{self.semester.revision}"'
+
+    def test_page_needs_no_login_and_is_publicly_cacheable(self):
+        response = self.client.get(reverse('public-routine', args=[self.semester.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'CSE1101')
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=300', response['Cache-Control'])
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+
+    def test_feed_lists_classes_in_date_order(self):
+        response = self.client.get(reverse('public-routine-feed', args=[self.semester.id]))
+        data = response.json()
+        self.assertEqual(data['semester']['revision'], self.semester.revision)
+        self.assertEqual([(c['date'], c['course_code']) for c in data['classes']], [('2025-08-01', 'CSE1101'), ('2025-08-02', 'CSE2101')])
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_matching_etag_gets_not_modified_until_the_routine_changes(self):
+        url = reverse('public-routine-feed', args=[self.semester.id])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.routine(self.algorithms, date(2025, 8, 8), time(9, 0), time(10, 0))
+        bump_semester_revision([self.semester.id])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['classes']), 3)
+
+    def test_unknown_semester(self):
+        self.assertEqual(self.client.get(reverse('public-routine', args=[999])).status_code, 404)
+        response = self.client.get(reverse('public-routine-feed', args=[999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Semester not found"})
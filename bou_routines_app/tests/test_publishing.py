@@ -0,0 +1,71 @@
+import tempfile
+from datetime import date, time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from bou_routines_app.models import bump_semester_revision
+from bou_routines_app.publishing import publish_exports, routine_export
+from bou_routines_app.singleflight import export_dir, export_file_response, stored_export
+
+from .base import RoutineTestCase
+
+
+class PublishExportsTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(EXPORT_RENDER_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.semester.refresh_from_db()
+
+    def test_renders_each_revision_once(self):
+        published = publish_exports()
+        self.assertEqual(
+            [(name, key[0], path.suffix) for name, key, path in published],
+            [('Y1S1', 'routine-pdf', '.pdf'), ('Y1S1', 'routine-pdf', '.pdf'), ('Y1S1', 'routine-xlsx', '.xlsx')],
+        )
+        self.assertTrue(all(key[2] == self.semester.revision for _, key, _ in published))
+        self.assertEqual(publish_exports(), [])
+
+        # Routine writes bump the revision themselves (see signals.py)
+        self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(10, 0))
+        bump_semester_revision([self.semester.id])
+        self.assertEqual(len(publish_exports()), 3)
+
+    def test_command_reports_rendered_exports(self):
+        out = StringIO()
+        call_command('publish_exports', semesters=[self.other_semester.id], stdout=out)
+        self.assertIn('Rendered 0 export(s)', out.getvalue())
+        call_command('publish_exports', stdout=out)
+        self.assertIn('Rendered 3 export(s)', out.getvalue())
+
+    def test_sendfile_modes(self):
+        key = routine_export('routine-xlsx', self.semester.id, self.semester.revision)[0]
+        publish_exports()
+        path = stored_export(key)
+        with override_settings(EXPORT_SENDFILE='x-accel-redirect', EXPORT_ACCEL_REDIRECT_PREFIX='/protected-exports/'):
+            response = export_file_response(path)
+            self.assertEqual(response['X-Accel-Redirect'], f'/protected-exports/{path.relative_to(export_dir()).as_posix()}')
+            self.assertEqual(response.content, b'')
+        with override_settings(EXPORT_SENDFILE='x-sendfile'):
+            response = export_file_response(path)
+            self.assertEqual(response['X-Sendfile'], str(path))
+        self.assertIn(f'filename="{path.name}"', response['Content-Disposition'])
+        self.assertEqual(
+            response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+
+    @override_settings(EXPORT_SENDFILE='x-accel-redirect')
+    def test_download_view_serves_the_published_file(self):
+        publish_exports()
+        self.login()
+        response = self.client.get(reverse('export-to-pdf', args=[self.semester.id]), {'teacher_short_name_newline': '0'})
+        self.assertEqual(response.status_code, 200)
+        path = stored_export(routine_export('routine-pdf', self.semester.id, self.semester.revision, False)[0])
+        self.assertTrue(response['X-Accel-Redirect'].endswith(path.relative_to(export_dir()).as_posix()))
@@ -0,0 +1,64 @@
+from datetime import date, time
+
+from bou_routines_app.models import CurrentRoutine, NewRoutine, Semester, SemesterCourse
+from bou_routines_app.reschedule import reschedule_semester
+
+from .base import RoutineTestCase
+
+
+class RescheduleTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=3)
+        CurrentRoutine.objects.create(semester=self.semester, course=self.algorithms, day='Friday', start_time=time(9, 0), end_time=time(10, 0))
+        for day in (1, 8, 15):
+            self.routine(self.algorithms, date(2025, 8, day), time(9, 0), time(10, 0))
+
+    def dates(self):
+        return list(NewRoutine.objects.filter(semester=self.semester).order_by('class_date').values_list('class_date', flat=True))
+
+    def update_semester(self, **fields):
+        # Saved like the generate page does, which bumps the revision the calendar rules are cached by
+        semester = Semester.objects.get(id=self.semester.id)
+        for name, value in fields.items():
+            setattr(semester, name, value)
+        semester.save()
+        return Semester.objects.get(id=self.semester.id)
+
+    def test_classes_on_a_new_holiday_move_to_the_next_free_date(self):
+        # The teacher is busy in another semester on the first candidate date
+        self.routine(self.algorithms_lab, date(2025, 8, 22), time(9, 30), time(10, 30), semester=self.other_semester)
+        report = reschedule_semester(self.update_semester(holidays="2025-08-08"))
+        self.assertEqual(report['moved'], [{
+            'routine_id': NewRoutine.objects.get(class_date=date(2025, 8, 29)).id, 'course_code': 'CSE1101',
+            'from': '2025-08-08', 'to': '2025-08-29', 'makeup': False,
+        }])
+        self.assertEqual(self.dates(), [date(2025, 8, 1), date(2025, 8, 15), date(2025, 8, 29)])
+
+    def test_classes_without_a_free_date_go_to_a_makeup_date_or_are_dropped(self):
+        semester = self.update_semester(end_date=date(2025, 8, 15), holidays="2025-08-15", makeup_dates="2025-08-16")
+        report = reschedule_semester(semester)
+        self.assertEqual([(m['to'], m['makeup']) for m in report['moved']], [('2025-08-16', True)])
+        self.assertEqual(self.dates(), [date(2025, 8, 1), date(2025, 8, 8), date(2025, 8, 16)])
+
+        semester = self.update_semester(holidays="2025-08-08,2025-08-15")
+        report = reschedule_semester(semester)
+        self.assertEqual([d['date'] for d in report['dropped']], ['2025-08-08'])
+        self.assertEqual(report['short'], [{'course_code': 'CSE1101', 'scheduled': 2, 'needed': 3}])
+
+    def test_courses_short_of_sessions_are_extended_along_their_slot(self):
+        NewRoutine.objects.filter(class_date=date(2025, 8, 15)).delete()
+        report = reschedule_semester(self.semester)
+        self.assertEqual(report['added'], [{'course_code': 'CSE1101', 'date': '2025-08-15'}])
+        self.assertEqual(NewRoutine.objects.get(class_date=date(2025, 8, 15)).start_time, time(9, 0))
+
+    def test_dry_run_changes_nothing(self):
+        semester = self.update_semester(holidays="2025-08-08")
+        report = reschedule_semester(semester, dry_run=True)
+        self.assertEqual(len(report['moved']), 1)
+        self.assertEqual(self.dates(), [date(2025, 8, 1), date(2025, 8, 8), date(2025, 8, 15)])
+        self.assertEqual(Semester.objects.get(id=self.semester.id).revision, semester.revision)
+
+    def test_needs_a_date_range(self):
+        with self.assertRaises(ValueError):
+            reschedule_semester(self.update_semester(start_date=None))
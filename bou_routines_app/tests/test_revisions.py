@@ -0,0 +1,49 @@
+from datetime import date, time
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from bou_routines_app.catalog import catalog_revision
+from bou_routines_app.models import NewRoutine, Semester
+
+from .base import RoutineTestCase
+
+
+class SemesterRevisionTests(RoutineTestCase):
+    def revision(self):
+        return Semester.objects.get(id=self.semester.id).revision
+
+    def test_course_and_teacher_changes_bump_the_semesters_that_show_them(self):
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        other = Semester.objects.get(id=self.other_semester.id).revision
+        revision = self.revision()
+
+        self.rahman.short_name = "RH"
+        self.rahman.save()
+        self.assertEqual(self.revision(), revision + 1)
+        self.algorithms.delete()
+        self.assertEqual(self.revision(), revision + 2)
+        self.assertFalse(NewRoutine.objects.exists())
+        self.assertEqual(Semester.objects.get(id=self.other_semester.id).revision, other)
+
+    def test_catalog_revision_survives_clearing_the_fragment_cache(self):
+        revision = catalog_revision()
+        cache.clear()
+        self.assertEqual(catalog_revision(), revision)
+        self.karim.save()
+        self.assertNotEqual(catalog_revision(), revision)
+
+
+class RoutineFragmentCacheTests(RoutineTestCase):
+    def test_download_page_shows_edits_through_the_cache(self):
+        self.login()
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.assertContains(self.client.get(reverse('download-routines')), "CSE1101")
+
+        # A cached card is reused until the semester's revision moves on
+        NewRoutine.objects.update(course=self.networks)
+        self.assertNotContains(self.client.get(reverse('download-routines')), "CSE2101")
+        self.semester.save()
+        response = self.client.get(reverse('download-routines'))
+        self.assertContains(response, "CSE2101")
+        self.assertNotContains(response, "CSE1101")
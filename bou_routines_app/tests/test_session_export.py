@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.models import NewRoutine
+from bou_routines_app.session_export import SESSION_FIELDS
+
+from .base import RoutineTestCase
+
+
+def streamed_text(response):
+    return b''.join(response.streaming_content).decode()
+
+
+class SessionExportTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.login())
+        self.routine(self.networks, date(2025, 8, 2), time(11, 0), time(12, 0))
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 30))
+        self.routine(self.algorithms_lab, date(2025, 8, 9), time(9, 0), time(11, 0), semester=self.other_semester)
+        self.url = reverse('export-sessions')
+
+    def test_csv(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="routine_sessions.csv"', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(streamed_text(response))))
+        self.assertEqual(rows[0], SESSION_FIELDS)
+        self.assertEqual(rows[1], ['Y1S1', '2025-08-01', 'Friday', '09:00', '10:30', 'CSE1101', 'Algorithms', 'Dr. Rahman', '90'])
+        self.assertEqual([row[5] for row in rows[1:]], ['CSE1101', 'CSE2101', 'CSE1102P'])
+
+    def test_jsonl_with_filters(self):
+        response = self.client.get(self.url, {'format': 'jsonl', 'teacher_id': self.rahman.id, 'start_date': '2025-08-02'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        sessions = [json.loads(line) for line in streamed_text(response).splitlines()]
+        self.assertEqual(sessions, [{
+            'semester': 'Y2S1', 'date': '2025-08-09', 'day': 'Saturday', 'start_time': '09:00', 'end_time': '11:00',
+            'course_code': 'CSE1102P', 'course_name': 'Algorithms Lab', 'teacher': 'Dr. Rahman', 'duration_minutes': 120,
+        }])
+
+        response = self.client.get(self.url, {'format': 'jsonl', 'semester_id': self.semester.id, 'end_date': '2025-08-01'})
+        self.assertEqual([json.loads(line)['course_code'] for line in streamed_text(response).splitlines()], ['CSE1101'])
+
+    def test_class_without_a_time_has_empty_times(self):
+        NewRoutine.objects.create(semester=self.semester, course=self.networks, class_date=date(2025, 8, 8), day='Friday')
+        rows = list(csv.reader(io.StringIO(streamed_text(self.client.get(self.url, {'semester_id': self.semester.id})))))
+        self.assertIn(['Y1S1', '2025-08-08', 'Friday', '', '', 'CSE2101', 'Networks', 'Mr. Karim', ''], rows)
+
+    def test_invalid_parameters(self):
+        for params in ({'format': 'xml'}, {'semester_id': 'one'}, {'start_date': '01/08/2025'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+
+    def test_login_is_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    async def test_streams_under_asgi(self):
+        response = await self.async_client.get(self.url, {'format': 'jsonl'})
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.splitlines()), 3)
@@ -0,0 +1,85 @@
+import asyncio
+import tempfile
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, JsonResponse
+from django.test import SimpleTestCase, override_settings
+
+from bou_routines_app import singleflight
+
+
+class FakeRender:
+    """Export render that counts its calls"""
+
+    def __init__(self, content=b'routine'):
+        self.calls = 0
+        self.content = content
+
+    def __call__(self, semester_id):
+        self.calls += 1
+        response = HttpResponse(self.content, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="routine-{semester_id}.pdf"'
+        return response
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+        settings_override = override_settings(EXPORT_RENDER_DIR=export_dir.name, EXPORT_SENDFILE=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.directory = singleflight.export_dir()
+
+    def test_render_export_stores_the_file_once(self):
+        render = FakeRender()
+        path = singleflight.render_export(('routine-pdf', 1, 3, 'newline'), render, (1,))
+        self.assertEqual(path.name, 'routine-1.pdf')
+        self.assertEqual(path.read_bytes(), b'routine')
+        self.assertEqual(singleflight.render_export(('routine-pdf', 1, 3, 'newline'), render, (1,)), path)
+        self.assertEqual(render.calls, 1)
+        self.assertEqual(singleflight.stored_export(('routine-pdf', 1, 3, 'newline')), path)
+
+    def test_error_response_is_returned_and_not_stored(self):
+        render = lambda semester_id: JsonResponse({"error": "No routine"}, status=404)
+        result = singleflight.render_export(('routine-pdf', 1, 3, 'newline'), render, (1,))
+        self.assertEqual(result.status_code, 404)
+        self.assertIsNone(singleflight.stored_export(('routine-pdf', 1, 3, 'newline')))
+
+    def test_new_revision_removes_older_ones_and_keeps_one_lock_file(self):
+        render = FakeRender()
+        for revision in (1, 2, 3):
+            singleflight.render_export(('routine-pdf', 1, revision, 'newline'), render, (1,))
+            singleflight.render_export(('routine-pdf', 1, revision, 'inline'), render, (1,))
+        singleflight.render_export(('routine-pdf', 2, 1, 'newline'), render, (2,))
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), [
+            'routine-pdf-1-3-inline', 'routine-pdf-1-3-newline', 'routine-pdf-1.lock',
+            'routine-pdf-2-1-newline', 'routine-pdf-2.lock',
+        ])
+
+    def test_concurrent_requests_render_once(self):
+        render = FakeRender()
+        key = ('routine-pdf', 1, 3, 'newline')
+
+        async def download_twice():
+            return await asyncio.gather(
+                singleflight.single_flight_export(key, render, 1),
+                singleflight.single_flight_export(key, render, 1),
+            )
+
+        responses = async_to_sync(download_twice)()
+        self.assertEqual(render.calls, 1)
+        for response in responses:
+            self.assertEqual(b''.join(response.streaming_content), b'routine')
+            self.assertIn('routine-1.pdf', response['Content-Disposition'])
+            response.close()
+        self.assertEqual(singleflight._in_flight, {})
+
+    def test_stored_export_is_served_without_rendering(self):
+        key = ('routine-xlsx', 1, 3)
+        singleflight.render_export(key, FakeRender(b'stored'), (1,))
+        render = FakeRender()
+        response = async_to_sync(singleflight.single_flight_export)(key, render, 1)
+        self.assertEqual(b''.join(response.streaming_content), b'stored')
+        response.close()
+        self.assertEqual(render.calls, 0)
@@ -0,0 +1,47 @@
+from datetime import time
+
+from django.urls import reverse
+
+from bou_routines_app.models import CurrentRoutine, SemesterCourse
+from bou_routines_app.solver import ScheduleSolver, parse_slot_list
+
+from .base import RoutineTestCase
+
+
+class ScheduleSolverTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms)
+        SemesterCourse.objects.create(semester=self.semester, course=self.networks)
+
+    def test_courses_of_a_semester_never_overlap(self):
+        result = ScheduleSolver(self.semester, slots=[('09:00', '10:00'), ('10:00', '11:00')], days=['Friday']).solve()
+        self.assertTrue(result['complete'])
+        self.assertEqual(sorted(a['start_time'] for a in result['assignments']), ['09:00', '10:00'])
+
+    def test_teacher_busy_in_another_semester_gets_another_slot(self):
+        CurrentRoutine.objects.create(
+            semester=self.other_semester, course=self.algorithms_lab, day='Friday', start_time=time(9, 0), end_time=time(10, 0)
+        )
+        result = ScheduleSolver(self.semester, slots=[('09:00', '10:00'), ('10:00', '11:00')], days=['Friday']).solve()
+        starts = {a['course_code']: a['start_time'] for a in result['assignments']}
+        self.assertEqual(starts, {'CSE1101': '10:00', 'CSE2101': '09:00'})
+
+    def test_slots_in_the_lunch_break_are_never_used(self):
+        result = ScheduleSolver(self.semester, slots=[('13:00', '14:00')], days=['Friday']).solve()
+        self.assertFalse(result['complete'])
+        self.assertEqual(len(result['unassigned']), 2)
+        self.assertIn("lunch break", result['unassigned'][0]['reason'])
+
+    def test_auto_schedule_endpoint(self):
+        self.login()
+        response = self.client.post(reverse('auto-schedule'), {'semester': self.semester.id, 'slots': '09:00-10:00,10:00-11:00'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['assignments']), 2)
+
+        response = self.client.post(reverse('auto-schedule'), {'semester': self.semester.id, 'slots': '09:00'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_parse_slot_list(self):
+        self.assertEqual(parse_slot_list(' 08:30-10:00, 10:00 - 11:30,'), [('08:30', '10:00'), ('10:00', '11:30')])
+        self.assertEqual(parse_slot_list(None), [])
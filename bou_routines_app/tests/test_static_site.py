@@ -0,0 +1,73 @@
+import json
+import tempfile
+from datetime import date, time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from bou_routines_app.models import NewRoutine, bump_semester_revision
+from bou_routines_app.static_site import publish_static_site
+
+from .base import RoutineTestCase
+
+
+class StaticSiteTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        site_dir, export_dir = tempfile.TemporaryDirectory(), tempfile.TemporaryDirectory()
+        self.addCleanup(site_dir.cleanup)
+        self.addCleanup(export_dir.cleanup)
+        self.output = Path(site_dir.name)
+        settings_override = override_settings(STATIC_SITE_DIR=self.output, EXPORT_RENDER_DIR=export_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(10, 0), semester=self.other_semester)
+        bump_semester_revision([self.semester.id, self.other_semester.id])
+
+    def test_writes_pages_feeds_and_downloads(self):
+        # jobs=1: worker processes would not see the test database
+        rendered, manifest = publish_static_site(jobs=1)
+        self.assertEqual(rendered, ['Y1S1', 'Y2S1'])
+        entry = manifest['semesters'][str(self.semester.id)]
+        self.assertEqual((entry['routine_count'], entry['errors']), (1, []))
+        self.assertEqual(set(entry['downloads']), {'PDF', 'Excel'})
+        for url in entry['downloads'].values():
+            self.assertTrue((self.output / url.lstrip('/')).exists())
+
+        page = (self.output / 'public' / str(self.semester.id) / 'index.html').read_text()
+        self.assertIn('CSE1101', page)
+        self.assertIn(entry['downloads']['PDF'], page)
+        for site_url in manifest['assets'].values():
+            self.assertTrue((self.output / site_url.lstrip('/')).exists())
+            self.assertIn(site_url, page)
+        feed = json.loads((self.output / 'public' / str(self.semester.id) / 'feed.json').read_text())
+        self.assertEqual([c['course_code'] for c in feed['classes']], ['CSE1101'])
+        self.assertEqual(json.loads((self.output / 'manifest.json').read_text()), manifest)
+        self.assertIn('Y2S1', (self.output / 'index.html').read_text())
+
+    def test_only_changed_semesters_are_rendered_again(self):
+        publish_static_site(jobs=1)
+        self.assertEqual(publish_static_site(jobs=1)[0], [])
+
+        bump_semester_revision([self.semester.id])
+        self.assertEqual(publish_static_site(jobs=1)[0], ['Y1S1'])
+        self.assertEqual(publish_static_site(jobs=1, force=True)[0], ['Y1S1', 'Y2S1'])
+
+    def test_semester_without_a_routine_is_removed(self):
+        publish_static_site(jobs=1)
+        NewRoutine.objects.filter(semester=self.other_semester).delete()
+        bump_semester_revision([self.other_semester.id])
+        rendered, manifest = publish_static_site(jobs=1)
+        self.assertEqual(rendered, [])
+        self.assertEqual(list(manifest['semesters']), [str(self.semester.id)])
+        self.assertFalse((self.output / 'public' / str(self.other_semester.id)).exists())
+        self.assertFalse((self.output / 'exports' / str(self.other_semester.id)).exists())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('publish_static_site', jobs=1, stdout=out)
+        self.assertIn('Y1S1: revision', out.getvalue())
+        self.assertIn('Rendered 2 of 2 semester(s)', out.getvalue())
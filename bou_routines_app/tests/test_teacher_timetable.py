@@ -0,0 +1,64 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app.exports import render_teacher_timetable_excel, render_teacher_timetable_pdf
+from bou_routines_app.grid import build_teacher_table
+from bou_routines_app.models import NewRoutine, bump_semester_revision
+from bou_routines_app.publishing import teacher_revision
+
+from .base import RoutineTestCase
+
+
+class TeacherTimetableTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        self.routine(self.algorithms_lab, date(2025, 8, 1), time(11, 0), time(13, 0), semester=self.other_semester)
+        self.routine(self.algorithms, date(2025, 8, 2), time(9, 0), time(10, 0))
+        self.routine(self.networks, date(2025, 8, 2), time(11, 0), time(12, 0))
+
+    def test_table_merges_every_semester(self):
+        NewRoutine.objects.create(semester=self.semester, course=self.algorithms, class_date=date(2025, 8, 8), day='Friday')
+        table = build_teacher_table(self.rahman)
+        self.assertEqual(table['routine_count'], 3)
+        self.assertEqual(table['time_slot_labels'], ['09:00 - 10:00', '11:00 - 13:00'])
+        self.assertEqual(table['semesters'], [{'name': 'Y1S1', 'classes': 2}, {'name': 'Y2S1', 'classes': 1}])
+        first = table['routine_table_rows'][0]
+        self.assertEqual((first['date'], first['day']), (date(2025, 8, 1), 'Friday'))
+        self.assertEqual([cell['content'] for cell in first['cells']], [
+            {'course_code': 'CSE1101', 'semester': 'Y1S1'}, {'course_code': 'CSE1102P', 'semester': 'Y2S1'},
+        ])
+        self.assertEqual([cell['content'] for cell in table['routine_table_rows'][1]['cells']], [
+            {'course_code': 'CSE1101', 'semester': 'Y1S1'}, '',
+        ])
+
+    def test_page(self):
+        self.login()
+        response = self.client.get(reverse('teacher-timetable', args=[self.karim.id]))
+        self.assertContains(response, 'CSE2101')
+        self.assertNotContains(response, 'CSE1101')
+        self.assertEqual(self.client.get(reverse('teacher-timetable', args=[999])).status_code, 404)
+        self.assertIsNone(self.client.get(reverse('teacher-timetable')).context['table'])
+
+    def test_revision_follows_the_teachers_semesters(self):
+        revision = teacher_revision(self.karim.id)
+        bump_semester_revision([self.other_semester.id])
+        self.assertEqual(teacher_revision(self.karim.id), revision)
+        bump_semester_revision([self.semester.id])
+        self.assertNotEqual(teacher_revision(self.karim.id), revision)
+
+    def test_exports(self):
+        pdf = render_teacher_timetable_pdf(self.rahman.id)
+        self.assertEqual(pdf.status_code, 200)
+        self.assertTrue(pdf.content.startswith(b'%PDF'))
+        xlsx = render_teacher_timetable_excel(self.rahman.id)
+        self.assertEqual(xlsx.status_code, 200)
+        self.assertTrue(xlsx.content.startswith(b'PK'))
+        self.assertIn('filename="', xlsx['Content-Disposition'])
+
+    def test_export_of_unknown_teacher(self):
+        self.login()
+        response = self.client.get(reverse('export-teacher-timetable-pdf', args=[999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Teacher not found"})
@@ -0,0 +1,71 @@
+from datetime import date, time
+
+from django.urls import reverse
+
+from bou_routines_app import validation
+from bou_routines_app.models import NewRoutine, Semester, bump_semester_revision
+from bou_routines_app.validation import record_routine_change, validate_routine_edit
+
+from .base import RoutineTestCase
+
+
+class RoutineEditValidationTests(RoutineTestCase):
+    def test_holidays_and_the_lunch_break_block_an_edit(self):
+        self.semester.holidays = "2025-08-08"
+        self.semester.save()
+        semester = Semester.objects.get(id=self.semester.id)
+        errors, conflicts, _ = validate_routine_edit(semester, self.algorithms, date(2025, 8, 8), time(12, 30), time(13, 30), routine_id=1)
+        self.assertEqual(errors, ["08/08/2025 is a holiday in Y1S1.", "The class overlaps the lunch break."])
+        self.assertEqual(conflicts, [])
+
+    def test_new_classes_must_fall_in_the_semester_on_their_weekday(self):
+        errors, _, _ = validate_routine_edit(self.semester, self.algorithms, date(2025, 9, 6), time(9, 0), time(10, 0), day='Friday')
+        self.assertEqual(errors, [
+            "06/09/2025 is outside Y1S1 (01/08/2025 - 30/08/2025).",
+            "06/09/2025 is a Saturday, not a Friday.",
+        ])
+
+    def test_reports_the_teachers_overlapping_classes_in_any_semester(self):
+        lab = self.routine(self.algorithms_lab, date(2025, 8, 1), time(9, 30), time(11, 0), semester=self.other_semester)
+        self.routine(self.algorithms_lab, date(2025, 8, 1), time(10, 0), time(11, 0))
+        # Without a time it cannot overlap, and must not break the index
+        self.routine(self.algorithms_lab, date(2025, 8, 1), None, None)
+        own = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+
+        errors, conflicts, _ = validate_routine_edit(self.semester, self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0), routine_id=own.id)
+        self.assertEqual(errors, [])
+        self.assertEqual(conflicts, [{
+            'routine_id': lab.id, 'semester_id': self.other_semester.id, 'course_code': 'CSE1102P',
+            'start_time': '09:30', 'end_time': '11:00',
+        }])
+
+    def test_own_writes_update_the_index_in_place(self):
+        _, _, index = validate_routine_edit(self.semester, self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0), day='Friday')
+        routine = self.routine(self.algorithms, date(2025, 8, 1), time(9, 0), time(10, 0))
+        bump_semester_revision([self.semester.id])
+        record_routine_change(index, routine)
+        self.assertIs(validation.get_teacher_date_index(), index)
+        self.assertEqual(index.overlapping(self.rahman.id, date(2025, 8, 1), time(9, 30), time(10, 30)), [routine.id])
+
+        # A write by somebody else in between drops the index
+        other = self.routine(self.networks, date(2025, 8, 2), time(9, 0), time(10, 0))
+        bump_semester_revision([self.semester.id, self.other_semester.id])
+        record_routine_change(index, other)
+        self.assertIsNot(validation.get_teacher_date_index(), index)
+
+
+class UpdateRoutineCourseTests(RoutineTestCase):
+    def test_double_booking_needs_allow_conflicts(self):
+        self.login()
+        self.routine(self.algorithms_lab, date(2025, 8, 1), time(9, 0), time(10, 0), semester=self.other_semester)
+        routine = self.routine(self.networks, date(2025, 8, 1), time(9, 0), time(10, 0))
+        data = {'routine_id': routine.id, 'course_id': self.algorithms.id}
+
+        response = self.client.post(reverse('update-routine-course'), data)
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()['can_override'])
+
+        response = self.client.post(reverse('update-routine-course'), dict(data, allow_conflicts='1'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['warnings']), 1)
+        self.assertEqual(NewRoutine.objects.get(id=routine.id).course, self.algorithms)
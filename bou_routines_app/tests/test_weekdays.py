@@ -0,0 +1,56 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from bou_routines_app.generation import generate_semester_routines
+from bou_routines_app.models import GenerationJob, SemesterCourse
+from bou_routines_app.weekdays import class_dates, mask_weekdays, weekday_dates, weekday_mask
+
+from .base import RoutineTestCase
+
+
+class WeekdayHelperTests(SimpleTestCase):
+    def test_masks(self):
+        self.assertEqual(weekday_mask(['Monday', 'Wednesday']), 0b101)
+        self.assertEqual(weekday_mask([4, 'Saturday']), 0b110000)
+        self.assertEqual(mask_weekdays(0b1000001), [0, 6])
+
+    def test_dates(self):
+        self.assertEqual(weekday_dates(date(2025, 8, 1), date(2025, 8, 18), 0), [date(2025, 8, 4), date(2025, 8, 11), date(2025, 8, 18)])
+        self.assertEqual(
+            class_dates(date(2025, 8, 1), date(2025, 8, 9), weekday_mask(['Friday', 'Saturday']), exclude={date(2025, 8, 2)}),
+            [date(2025, 8, 1), date(2025, 8, 8), date(2025, 8, 9)],
+        )
+
+
+class ClassDayTests(RoutineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.semester.class_days = weekday_mask(['Monday', 'Wednesday'])
+        self.semester.save()
+        SemesterCourse.objects.create(semester=self.semester, course=self.algorithms, number_of_classes=2)
+        SemesterCourse.objects.create(semester=self.semester, course=self.networks, number_of_classes=2)
+
+    def test_generation_uses_the_semesters_class_days(self):
+        self.assertEqual(self.semester.class_day_names, ['Monday', 'Wednesday'])
+        generated, warnings = generate_semester_routines(
+            self.semester,
+            [(str(self.algorithms.id), 'Wednesday', '09:00', '10:00'), (str(self.networks.id), 'Friday', '09:00', '10:00')],
+            date(2025, 8, 1), date(2025, 8, 30),
+        )
+        self.assertEqual([r['date'] for r in generated], [date(2025, 8, 6), date(2025, 8, 13)])
+        self.assertEqual(warnings, ["CSE2101 is scheduled on Friday, which is not a class day of Y1S1."])
+
+    def test_generate_page_needs_a_class_on_a_class_day(self):
+        self.login()
+        response = self.client.post(reverse('generate-routine'), {
+            'semester': self.semester.id,
+            'date_range': '08/01/2025 - 08/30/2025',
+            'course_code[]': [self.algorithms.id],
+            'day[]': ['Friday'],
+            'start_time[]': ['09:00'],
+            'end_time[]': ['10:00'],
+        })
+        self.assertContains(response, "You must schedule at least one course for Monday or Wednesday.")
+        self.assertFalse(GenerationJob.objects.exists())
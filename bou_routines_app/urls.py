@@ -8,10 +8,31 @@ urlpatterns = [
     path('download-routines/', views.download_routines, name='download-routines'),
     path('get-semester-courses/', views.get_semester_courses, name='get-semester-courses'),
     path('get-existing-generated-routines/', views.get_existing_generated_routines, name='get-existing-generated-routines'),
+    path('catalog/', views.catalog, name='catalog'),
+    path('auto-schedule/', views.auto_schedule, name='auto-schedule'),
+    path('double-bookings/', views.double_bookings, name='double-bookings'),
+    path('plan-date-range/', views.plan_date_range, name='plan-date-range'),
+    path('semester-grid/<int:semester_id>/', views.semester_grid, name='semester-grid'),
     path('check-time-overlap/', views.check_time_overlap, name='check-time-overlap'),
     path('update-routine-course/', views.update_routine_course, name='update-routine-course'),
+    path('routine-batch/', views.routine_batch, name='routine-batch'),
     path('remove-routine-course/', views.remove_routine_course, name='remove-routine-course'),
     path('reset-routine/', views.reset_routine, name='reset-routine'),
     path('export-to-excel/<int:semester_id>/', views.export_to_excel, name='export-to-excel'),
     path('export-to-pdf/<int:semester_id>/', views.export_to_pdf, name='export-to-pdf'),
+    path('public/<int:semester_id>/', views.public_routine, name='public-routine'),
+    path('public/<int:semester_id>/feed.json', views.public_routine_feed, name='public-routine-feed'),
+    path('ical/semester/<int:semester_id>.ics', views.semester_ical, name='semester-ical'),
+    path('ical/teacher/<int:teacher_id>.ics', views.teacher_ical, name='teacher-ical'),
+    path('ical/course/<int:course_id>.ics', views.course_ical, name='course-ical'),
+    path('import-catalog/', views.import_catalog_view, name='import-catalog'),
+    path('teacher-timetable/', views.teacher_timetable, name='teacher-timetable'),
+    path('teacher-timetable/<int:teacher_id>/', views.teacher_timetable, name='teacher-timetable'),
+    path('export-teacher-timetable-pdf/<int:teacher_id>/', views.export_teacher_timetable_pdf, name='export-teacher-timetable-pdf'),
+    path('export-teacher-timetable-excel/<int:teacher_id>/', views.export_teacher_timetable_excel, name='export-teacher-timetable-excel'),
+    path('export-sessions/', views.export_sessions, name='export-sessions'),
+    path('academic-calendar-events/', views.academic_calendar_events, name='academic-calendar-events'),
+    path('export-academic-calendars/', views.export_all_academic_calendars_pdf, name='export-all-academic-calendars-pdf'),
+    path('generation-jobs/', views.enqueue_generation_job, name='enqueue-generation-job'),
+    path('generation-jobs/<int:job_id>/', views.generation_job_status, name='generation-job-status'),
 ]
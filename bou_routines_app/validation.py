@@ -0,0 +1,175 @@
+from bisect import bisect_left, insort
+from threading import Lock
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from .generation import parse_date_list
+from .models import WEEKDAYS, NewRoutine, Semester
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def semester_rules(semester):
+    """Calendar of a semester (date range, holidays, makeup dates, lunch window), cached by its revision"""
+    key = f'semester_calendar:{semester.id}:{semester.revision}'
+    rules = cache.get(key)
+    if rules is None:
+        lunch = None
+        if semester.lunch_break_start and semester.lunch_break_end:
+            lunch = (_minutes(semester.lunch_break_start), _minutes(semester.lunch_break_end))
+        rules = {
+            'start_date': semester.start_date,
+            'end_date': semester.end_date,
+            'holidays': frozenset(parse_date_list(semester.holidays)),
+            'makeup_dates': frozenset(parse_date_list(semester.makeup_dates)),
+            'lunch': lunch,
+        }
+        cache.set(key, rules, None)
+    return rules
+
+
+def rule_violations(semester, class_date, start_time, end_time):
+    """Holiday and lunch break violations of a class, as messages"""
+    rules = semester_rules(semester)
+    errors = []
+    if class_date in rules['holidays']:
+        errors.append(f"{class_date.strftime('%d/%m/%Y')} is a holiday in {semester.name}.")
+    if rules['lunch'] and _minutes(start_time) < rules['lunch'][1] and rules['lunch'][0] < _minutes(end_time):
+        errors.append("The class overlaps the lunch break.")
+    return errors
+
+
+def new_class_violations(semester, class_date, day):
+    """Date range and weekday violations of a class being created (not moved there by generation), as messages"""
+    rules = semester_rules(semester)
+    errors = []
+    if (rules['start_date'] and class_date < rules['start_date']) or (rules['end_date'] and class_date > rules['end_date']):
+        start = rules['start_date'].strftime('%d/%m/%Y') if rules['start_date'] else '...'
+        end = rules['end_date'].strftime('%d/%m/%Y') if rules['end_date'] else '...'
+        errors.append(f"{class_date.strftime('%d/%m/%Y')} is outside {semester.name} ({start} - {end}).")
+    if day != WEEKDAYS[class_date.weekday()]:
+        errors.append(f"{class_date.strftime('%d/%m/%Y')} is a {WEEKDAYS[class_date.weekday()]}, not a {day}.")
+    return errors
+
+
+def routines_revision():
+    """
+    Revision of all generated routines. Semester revisions only grow and every NewRoutine
+    write bumps one, so (count, sum, max id) changes whenever any routine does.
+    """
+    totals = Semester.objects.aggregate(count=Count('id'), revision=Sum('revision'), last=Max('id'))
+    return (totals['count'], totals['revision'] or 0, totals['last'])
+
+
+class TeacherDateIndex:
+    """
+    Classes of every semester grouped by (teacher, date), each group sorted by start minute.
+
+    Looking up the classes a new one would overlap is a dict lookup plus a bisect; a
+    teacher rarely has more than a handful of classes on one date.
+    """
+
+    def __init__(self, revision):
+        self.revision = revision
+        self.groups = {}
+        self.routines = {}
+
+    @classmethod
+    def build(cls):
+        index = cls(routines_revision())
+        # Classes without a time cannot overlap anything
+        for row in NewRoutine.objects.filter(start_time__isnull=False, end_time__isnull=False).values_list(
+            'id', 'course__teacher_id', 'class_date', 'start_time', 'end_time', 'semester_id', 'course__code'
+        ):
+            index.add(*row)
+        return index
+
+    def add(self, routine_id, teacher_id, class_date, start, end, semester_id, course_code):
+        entry = (_minutes(start), _minutes(end), routine_id)
+        insort(self.groups.setdefault((teacher_id, class_date), []), entry)
+        self.routines[routine_id] = (teacher_id, class_date, entry, semester_id, course_code)
+
+    def remove(self, routine_id):
+        found = self.routines.pop(routine_id, None)
+        if found:
+            teacher_id, class_date, entry = found[:3]
+            self.groups[(teacher_id, class_date)].remove(entry)
+
+    def overlapping(self, teacher_id, class_date, start, end, exclude_routine=None):
+        """routine_ids of the teacher's classes on class_date overlapping start-end"""
+        group = self.groups.get((teacher_id, class_date), [])
+        start, end = _minutes(start), _minutes(end)
+        # Only classes starting before our end can overlap
+        last = bisect_left(group, (end,))
+        return [
+            routine_id for other_start, other_end, routine_id in group[:last]
+            if other_end > start and routine_id != exclude_routine
+        ]
+
+    def describe(self, routine_id):
+        _, _, (start, end, _), semester_id, course_code = self.routines[routine_id]
+        return {
+            'routine_id': routine_id,
+            'semester_id': semester_id,
+            'course_code': course_code,
+            'start_time': f"{start // 60:02d}:{start % 60:02d}",
+            'end_time': f"{end // 60:02d}:{end % 60:02d}",
+        }
+
+
+_index = None
+_index_lock = Lock()
+
+
+def get_teacher_date_index():
+    """Per-process index, rebuilt only when routines were changed by somebody else"""
+    global _index
+    revision = routines_revision()
+    with _index_lock:
+        if _index is None or _index.revision != revision:
+            _index = TeacherDateIndex.build()
+        return _index
+
+
+def record_routine_change(index, routine, removed_id=None):
+    """
+    Apply our own write to the index instead of rebuilding it. The write bumped one
+    semester revision; if anything else changed meanwhile the index is dropped.
+    """
+    global _index
+    expected = (index.revision[0], index.revision[1] + 1, index.revision[2])
+    with _index_lock:
+        if _index is not index:
+            return
+        if routines_revision() != expected:
+            _index = None
+            return
+        if removed_id is not None:
+            index.remove(removed_id)
+        if routine is not None:
+            index.add(routine.id, routine.course.teacher_id, routine.class_date, routine.start_time,
+                      routine.end_time, routine.semester_id, routine.course.code)
+        index.revision = expected
+
+
+def validate_routine_edit(semester, course, class_date, start_time, end_time, routine_id=None, day=None):
+    """
+    Check a single-cell edit before it is written.
+
+    Returns (errors, conflicts, index): errors are holiday/lunch break violations (and for a new
+    class, without routine_id, date range and weekday violations) that always block the edit;
+    conflicts are the teacher's other classes on that date overlapping the new time; index is
+    the TeacherDateIndex used, to be passed to record_routine_change.
+    """
+    errors = rule_violations(semester, class_date, start_time, end_time)
+    if routine_id is None:
+        errors = new_class_violations(semester, class_date, day) + errors
+    index = get_teacher_date_index()
+    conflicts = [
+        index.describe(other_id)
+        for other_id in index.overlapping(course.teacher_id, class_date, start_time, end_time, exclude_routine=routine_id)
+    ]
+    return errors, conflicts, index
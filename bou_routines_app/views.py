@@ -1,23 +1,40 @@
 from django.shortcuts import render, redirect
-from .models import CurrentRoutine, Teacher, Semester, Course, NewRoutine, SemesterCourse
+from .models import CurrentRoutine, Teacher, Semester, Course, NewRoutine, SemesterCourse, GenerationJob, bump_semester_revision
 from .forms import RoutineForm
-from datetime import datetime, timedelta, date
-from collections import defaultdict
+from .generation import parse_date_list
+from .jobs import enqueue_generation, job_status
+from .async_utils import async_login_required, run_in_export_pool, streaming_response
+from .publishing import routine_export, teacher_export, teacher_revision
+from .singleflight import single_flight_export
+from .grid import build_routine_feed, build_routine_table, build_teacher_table, routine_courses, build_semester_grid, get_grid_state, record_grid_change
+from .catalog import catalog_revision, get_catalog
+from .occupancy import TeacherOccupancy, schedule_conflicts
+from .solver import ScheduleSolver, parse_slot_list
+from .conflicts import find_double_bookings
+from .validation import record_routine_change, validate_routine_edit
+from .batch import apply_routine_batch
+from .reschedule import reschedule_semester
+from .weekdays import class_dates
+from .academic_calendar import academic_calendars, format_event_dates
+from .ical import feed_etag, feed_semesters, ical_stream
+from .session_export import csv_stream, jsonl_stream, session_queryset
+from .catalog_import import IMPORT_COLUMNS, ImportFileError, import_catalog, read_catalog_rows
+from datetime import datetime, timedelta
+from functools import partial
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse, FileResponse
-import io
-import xlsxwriter
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from django.utils.functional import SimpleLazyObject
+from django.http import Http404, HttpResponse, JsonResponse
+import json
 from django.urls import reverse
 from django.utils.http import urlencode
 from django.contrib.auth.decorators import login_required
-import math
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import condition, require_GET, require_POST
+from django.core.cache import cache
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.db.models import Q
+from asgiref.sync import sync_to_async
 
 
 @login_required
@@ -80,7 +97,6 @@ def generate_routine(request):
     if not SemesterCourse.objects.exists():
         messages.warning(request, "No courses have been assigned to any semester yet. Please add courses to a semester first via the 'Semester Courses' menu.")
 
-    generated_routines = []
     overlap_conflicts = []
     form_rows = []
 
@@ -102,216 +118,10 @@ def generate_routine(request):
         except Semester.DoesNotExist:
             selected_semester = None
 
-    # Load existing generated routines if semester is selected via GET
-    if selected_semester_id and request.method == "GET":
-        try:
-            selected_semester = Semester.objects.get(id=selected_semester_id)
-            existing_routines = NewRoutine.objects.filter(semester=selected_semester).select_related('course', 'course__teacher').order_by('class_date', 'start_time')
-            
-            if existing_routines.exists():
-                for routine in existing_routines:
-                    generated_routines.append({
-                        'id': routine.id,
-                        'course_id': routine.course.id,
-                        'date': routine.class_date,
-                        'day': routine.day,
-                        'course_code': routine.course.code,
-                        'course_name': routine.course.name,
-                        'teacher': routine.course.teacher.name,
-                        'start_time': routine.start_time.strftime('%H:%M'),
-                        'end_time': routine.end_time.strftime('%H:%M')
-                    })
-                
-                # Sort generated routines by date and time for display
-                generated_routines.sort(key=lambda x: (x['date'], x['start_time']))
-
-                # Build the routine table structure for existing routines
-                if generated_routines:
-                    unique_dates = []
-                    seen_dates = set()
-                    for routine in generated_routines:
-                        date_str = routine['date'].strftime('%Y-%m-%d')
-                        if date_str not in seen_dates:
-                            seen_dates.add(date_str)
-                            unique_dates.append((routine['date'], routine['day']))
-
-                    # Add makeup dates to unique_dates for existing routines display
-                    if selected_semester.makeup_dates:
-                        makeup_dates = [
-                            datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                            for date in selected_semester.makeup_dates.split(',')
-                            if date.strip()
-                        ]
-                        for makeup_date in makeup_dates:
-                            day_name = makeup_date.strftime('%A')
-                            # Only add Friday and Saturday makeup dates
-                            if day_name in ['Friday', 'Saturday']:
-                                date_str = makeup_date.strftime('%Y-%m-%d')
-                                # Check if this date is not already in unique_dates
-                                date_already_exists = any(date[0].strftime('%Y-%m-%d') == date_str for date in unique_dates)
-                                if not date_already_exists:
-                                    unique_dates.append((makeup_date, day_name))
-
-                    unique_dates.sort(key=lambda x: x[0])
-
-                    # Build merged time slot structure
-                    time_boundaries = set()
-                    for routine in generated_routines:
-                        time_boundaries.add(routine['start_time'])
-                        time_boundaries.add(routine['end_time'])
-                    if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                        time_boundaries.add(selected_semester.lunch_break_start.strftime('%H:%M'))
-                        time_boundaries.add(selected_semester.lunch_break_end.strftime('%H:%M'))
-                    time_boundaries = sorted(time_boundaries)
-
-                    # Build contiguous time slots
-                    all_time_slot_labels = []
-                    for i in range(len(time_boundaries)-1):
-                        all_time_slot_labels.append(f"{time_boundaries[i]} - {time_boundaries[i+1]}")
-
-                    # Filter only slots that are actually used
-                    used_slots = set()
-                    for routine in generated_routines:
-                        r_start = routine['start_time']
-                        r_end = routine['end_time']
-                        for i in range(len(time_boundaries)-1):
-                            slot_start = time_boundaries[i]
-                            slot_end = time_boundaries[i+1]
-                            if (slot_start >= r_start and slot_end <= r_end):
-                                used_slots.add((slot_start, slot_end))
-                    
-                    # Add lunch break as used slot if present
-                    if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                        lb_start = selected_semester.lunch_break_start.strftime('%H:%M')
-                        lb_end = selected_semester.lunch_break_end.strftime('%H:%M')
-                        for i in range(len(time_boundaries)-1):
-                            slot_start = time_boundaries[i]
-                            slot_end = time_boundaries[i+1]
-                            if (slot_start >= lb_start and slot_end <= lb_end):
-                                used_slots.add((slot_start, slot_end))
-                    
-                    # Filter time slot labels
-                    time_slot_labels = []
-                    slot_ranges = []
-                    for i in range(len(time_boundaries)-1):
-                        slot_start = time_boundaries[i]
-                        slot_end = time_boundaries[i+1]
-                        if (slot_start, slot_end) in used_slots:
-                            label = f"{slot_start} - {slot_end}"
-                            time_slot_labels.append(label)
-                            slot_ranges.append((slot_start, slot_end, label))
-
-                    # Build routine table rows
-                    from collections import defaultdict
-                    routines_by_date = defaultdict(list)
-                    for routine in generated_routines:
-                        routines_by_date[(routine['date'], routine['day'])].append(routine)
-
-                    # Add lunch break as a pseudo-routine if present
-                    lunch_break = None
-                    if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                        lunch_break = {
-                            'start_time': selected_semester.lunch_break_start.strftime('%H:%M'),
-                            'end_time': selected_semester.lunch_break_end.strftime('%H:%M'),
-                            'is_lunch_break': True
-                        }
-
-                    routine_table_rows = []
-                    for date, day in unique_dates:
-                        row_cells = []
-                        slot_idx = 0
-                        routines = routines_by_date.get((date, day), [])
-                        routines_for_row = routines.copy()
-                        if lunch_break:
-                            routines_for_row.append({
-                                'start_time': lunch_break['start_time'],
-                                'end_time': lunch_break['end_time'],
-                                'is_lunch_break': True
-                            })
-                        routines_for_row.sort(key=lambda r: r['start_time'])
-                        
-                        while slot_idx < len(slot_ranges):
-                            slot_start, slot_end, slot_label = slot_ranges[slot_idx]
-                            found = False
-                            for r in routines_for_row:
-                                r_start = r['start_time']
-                                r_end = r['end_time']
-                                if r_start == slot_start:
-                                    colspan = 0
-                                    for j in range(slot_idx, len(slot_ranges)):
-                                        s2, e2, _ = slot_ranges[j]
-                                        if e2 <= r_end:
-                                            colspan += 1
-                                        else:
-                                            break
-                                    if r.get('is_lunch_break'):
-                                        content = 'BREAK'
-                                        cell = {'content': content, 'colspan': colspan, 'is_lunch_break': True}
-                                    else:
-                                        content = {
-                                            'course_code': r['course_code'],
-                                            'teacher': 'Supervisor' if r['course_code'] == 'CSE4246' else r['teacher'],
-                                        }
-                                        if 'id' in r and 'course_id' in r:
-                                            content['routine_id'] = r['id']
-                                            content['course_id'] = r['course_id']
-                                        cell = {'content': content, 'colspan': colspan, 'is_lunch_break': False}
-                                    row_cells.append(cell)
-                                    slot_idx += colspan
-                                    found = True
-                                    break
-                            if not found:
-                                row_cells.append({'content': '', 'colspan': 1, 'is_lunch_break': False})
-                                slot_idx += 1
-                        routine_table_rows.append({'date': date, 'day': day, 'cells': row_cells})
-
-                    # Prepare data for the calendar view
-                    time_slots = []
-                    time_slot_set = set()
-                    for routine in generated_routines:
-                        time_slot = f"{routine['start_time']} - {routine['end_time']}"
-                        if time_slot not in time_slot_set:
-                            time_slot_set.add(time_slot)
-                            time_slots.append(time_slot)
-
-                    # Sort time slots chronologically
-                    time_slots.sort(key=lambda x: x.split(' - ')[0])
-
-                    # Add lunch break if configured
-                    if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                        lunch_break_slot = f"{selected_semester.lunch_break_start.strftime('%H:%M')} - {selected_semester.lunch_break_end.strftime('%H:%M')}"
-                        if lunch_break_slot not in time_slot_set:
-                            time_slots.append(lunch_break_slot)
-                            time_slots.sort(key=lambda x: x.split(' - ')[0])
-
-                    # Format routines for the calendar view with time slot info
-                    calendar_routines = []
-                    for routine in generated_routines:
-                        time_slot = f"{routine['start_time']} - {routine['end_time']}"
-
-                        calendar_routines.append({
-                            'date': routine['date'],
-                            'day': routine['day'],
-                            'course_code': routine['course_code'],
-                            'course_name': routine['course_name'],
-                            'teacher': routine['teacher'],
-                            'start_time': routine['start_time'],
-                            'end_time': routine['end_time'],
-                            'time_slot': time_slot,
-                            'is_lunch_break': False
-                        })
-
-        except Semester.DoesNotExist:
-            pass
-    
-    # Initialize variables for when no routines are found
-    if not generated_routines:
-        unique_dates = []
-        time_slots = []
-        calendar_routines = []
-        lunch_break = None
-        routine_table_rows = []
-        time_slot_labels = []
+    # The routine grid itself is fetched by the page from the semester-grid endpoint
+    has_routines = False
+    if selected_semester and request.method == "GET":
+        has_routines = NewRoutine.objects.filter(semester=selected_semester).exists()
 
     if request.method == "POST":
         save_only = request.POST.get("save_only") == "1"
@@ -326,9 +136,6 @@ def generate_routine(request):
         lunch_break_end = request.POST.get('lunch_break_end')
         form_rows = list(zip(course_codes, days, start_times, end_times))
         
-        # Create a set to track unique conflicts
-        unique_conflicts = set()
-        
         # Always update the semester's lunch break if times are provided
         if selected_semester_id and lunch_break_start and lunch_break_end:
             try:
@@ -385,7 +192,6 @@ def generate_routine(request):
                 continue
         
         # Delete CurrentRoutine entries for this semester that are not in the submitted form
-        from django.db.models import Q
         submitted_pairs = set(
             (int(course_codes[i]), days[i])
             for i in range(len(days))
@@ -403,85 +209,39 @@ def generate_routine(request):
         # EARLY RETURN IF SAVE ONLY
         if save_only:
             messages.success(request, "Semester info and class schedule saved successfully.")
+            if request.POST.get("reschedule") == "1" and selected_semester_id:
+                # Move only the classes the new calendar affects instead of regenerating everything
+                try:
+                    report = reschedule_semester(Semester.objects.get(id=selected_semester_id))
+                except (Semester.DoesNotExist, ValueError) as e:
+                    messages.error(request, f"Could not reschedule: {e}")
+                else:
+                    messages.success(request, f"Rescheduled: {len(report['moved'])} classes moved, {len(report['added'])} added, {len(report['dropped'])} removed.")
+                    for item in report['dropped']:
+                        messages.warning(request, f"{item['course_code']} on {item['date']} was removed: no free date left for it.")
+                    for item in report['short']:
+                        messages.warning(request, f"Only {item['scheduled']} out of {item['needed']} classes are scheduled for {item['course_code']}.")
             return redirect(f"{reverse('generate-routine')}?semester={selected_semester_id}")
         
-        # Check for lunch break overlaps (always enforced)
+        # Check for lunch break overlaps (always enforced) and for classes overlapping another
+        # class of the same teacher in any saved class schedule
         try:
             selected_semester = Semester.objects.get(id=selected_semester_id)
             # Use the form-provided lunch break times if available, otherwise fall back to semester's lunch break
             if lunch_break_start and lunch_break_end:
-                lunch_start = datetime.strptime(lunch_break_start, "%H:%M").time()
-                lunch_end = datetime.strptime(lunch_break_end, "%H:%M").time()
-            elif selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                lunch_start = selected_semester.lunch_break_start
-                lunch_end = selected_semester.lunch_break_end
+                lunch_start, lunch_end = lunch_break_start, lunch_break_end
             else:
-                # No lunch break defined
-                lunch_start = None
-                lunch_end = None
-            
-            if lunch_start and lunch_end:
-                for i in range(len(days)):
-                    day = days[i]
-                    start = datetime.strptime(start_times[i], "%H:%M").time()
-                    end = datetime.strptime(end_times[i], "%H:%M").time()
-                    
-                    # Check if time slot overlaps with lunch break
-                    if time_overlap(start, end, lunch_start, lunch_end):
-                        conflict_key = f"lunch_break_{day}_{lunch_start}_{lunch_end}"
-                        
-                        if conflict_key not in unique_conflicts:
-                            unique_conflicts.add(conflict_key)
-                            overlap_conflicts.append({
-                                "course": "Lunch Break",
-                                "teacher": "All",
-                                "day": day,
-                                "start": lunch_start.strftime("%H:%M"),
-                                "end": lunch_end.strftime("%H:%M"),
-                            })
+                lunch_start, lunch_end = selected_semester.lunch_break_start, selected_semester.lunch_break_end
         except Semester.DoesNotExist:
-            # Handle case when semester doesn't exist
-            pass
-            
-        # Check for time slot overlaps between classes
-        for i in range(len(days)):
-            day = days[i]
-            start = datetime.strptime(start_times[i], "%H:%M").time()
-            end = datetime.strptime(end_times[i], "%H:%M").time()
-            course_id = course_codes[i]
-            
-            # Get the teacher ID for this course
-            try:
-                course = Course.objects.get(id=course_id)
-                teacher_id = course.teacher.id
-                
-                # Only check for routines with the same teacher, same day, and overlapping time
-                # But exclude the course we're currently checking
-                for routine in CurrentRoutine.objects.filter(day=day, course__teacher_id=teacher_id).exclude(course_id=course_id):
-                    if time_overlap(start, end, routine.start_time, routine.end_time):
-                        # Create a unique key for this conflict to avoid duplicates
-                        conflict_key = f"{routine.course.code}_{routine.day}_{routine.start_time}_{routine.end_time}"
-                        
-                        if conflict_key not in unique_conflicts:
-                            unique_conflicts.add(conflict_key)
-                            overlap_conflicts.append({
-                                "course": routine.course.code,
-                                "teacher": routine.course.teacher.name,
-                                "day": routine.day,
-                                "start": routine.start_time.strftime("%H:%M"),
-                                "end": routine.end_time.strftime("%H:%M"),
-                            })
-            except Course.DoesNotExist:
-                # Skip if course doesn't exist
-                continue
-                
+            lunch_start = lunch_end = None
+        overlap_conflicts = schedule_conflicts(form_rows, lunch_start, lunch_end)
+
         if overlap_conflicts:
             messages.error(request, "Time conflicts detected. Please resolve all overlaps before generating a routine.")
             return render(request, "bou_routines_app/generate_routine.html", {
                 "semesters": semesters,
                 "courses": courses,
                 "teachers": teachers,
-                "generated_routines": generated_routines,
                 "overlap_conflicts": overlap_conflicts,
                 "form_rows": form_rows,
             })
@@ -519,394 +279,31 @@ def generate_routine(request):
                 selected_semester.end_date = end_date
                 selected_semester.save()
             
-            # Check if the date range includes at least one Friday or Saturday
-            current_check = start_date
-            has_target_day = False
-            while current_check <= end_date:
-                if current_check.strftime('%A') in ['Friday', 'Saturday']:
-                    has_target_day = True
-                    break
-                current_check += timedelta(days=1)
-                
-            if not has_target_day:
-                messages.warning(request, "The selected date range does not include any Friday or Saturday. Please select a date range that includes at least one Friday or Saturday.")
+            # Check if the date range includes at least one of the semester's class days
+            class_day_names = " or ".join(selected_semester.class_day_names)
+            if not class_dates(start_date, end_date, selected_semester.class_days):
+                messages.warning(request, f"The selected date range does not include any {class_day_names}. Please select a date range that includes at least one {class_day_names}.")
                 return render(request, "bou_routines_app/generate_routine.html", {
                     "semesters": semesters,
                     "courses": courses,
                     "teachers": teachers,
                 })
             
-            # Clear any existing generated routines for this semester
-            NewRoutine.objects.filter(semester=selected_semester).delete()
-            # Also clear existing CurrentRoutine entries for this semester
-            CurrentRoutine.objects.filter(semester=selected_semester).delete()
-            
-            # Generate day-by-day routines
-            current_date = start_date
-            
-            # Add debugging logs to identify potential issues
-            processed_days = []
-            matched_days = []
-            skipped_holidays = []
-
-            # Check if we have at least one Friday and one Saturday in the form data
-            has_friday = 'Friday' in days
-            has_saturday = 'Saturday' in days
-            
-            if not (has_friday or has_saturday):
-                messages.warning(request, "You must schedule at least one course for Friday or Saturday.")
+            # Check if we have at least one course on a class day of the semester in the form data
+            if not set(days) & set(selected_semester.class_day_names):
+                messages.warning(request, f"You must schedule at least one course for {class_day_names}.")
                 return render(request, "bou_routines_app/generate_routine.html", {
                     "semesters": semesters,
                     "courses": courses,
                     "teachers": teachers,
                 })
             
-            # Get holiday dates from the semester model
-            holiday_dates = []
-            if selected_semester.holidays:
-                holiday_dates = [
-                    datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                    for date in selected_semester.holidays.split(',')
-                    if date.strip()
-                ]
-
-            # Get makeup dates from the semester model
-            makeup_dates = []
-            if selected_semester.makeup_dates:
-                makeup_dates = [
-                    datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                    for date in selected_semester.makeup_dates.split(',')
-                    if date.strip()
-                ]
-
-            # --- CLASS COUNT LIMIT LOGIC ---
-            # Build a map: course_id -> (allowed_classes, is_lab, slot_minutes)
-            course_limits = {}
-            for sc in semester_courses:
-                is_lab = 'P' in sc.course.code
-                slot_minutes = None
-                for i in range(len(days)):
-                    if str(course_codes[i]) == str(sc.course.id):
-                        start_time_str = start_times[i]
-                        end_time_str = end_times[i]
-                        if start_time_str and end_time_str:
-                            start = datetime.strptime(start_time_str, "%H:%M").time()
-                            end = datetime.strptime(end_time_str, "%H:%M").time()
-                            slot_minutes = (datetime.combine(datetime.min, end) - datetime.combine(datetime.min, start)).total_seconds() / 60
-                            break
-                course_limits[str(sc.course.id)] = {
-                    'allowed': sc.number_of_classes,
-                    'is_lab': is_lab,
-                    'slot_minutes': slot_minutes,
-                    'start_time': start_time_str if slot_minutes else None,
-                    'end_time': end_time_str if slot_minutes else None,
-                    'day': days[i] if slot_minutes else None,
-                    'course': sc.course,
-                }
-
-            # Build a set of makeup/reserve dates
-            makeup_dates_set = set(makeup_dates)
-            # Build a set of holiday dates
-            holiday_dates_set = set(holiday_dates)
-
-            # For each course, build a list of all valid dates (Fridays/Saturdays, not in makeup_dates, not in holidays, not after end_date)
-            for course_id, limit in course_limits.items():
-                if not limit['slot_minutes']:
-                    continue  # skip if no slot info
-                # Determine class duration
-                if limit['is_lab']:
-                    class_duration = selected_semester.lab_class_duration_minutes
-                else:
-                    class_duration = selected_semester.theory_class_duration_minutes
-                # Calculate how many sessions are needed (round up)
-                sessions_needed = math.ceil(limit['allowed'] * class_duration / limit['slot_minutes'])
-                # Build all valid dates for this course
-                valid_dates = []
-                current_date = start_date
-                while current_date <= end_date:
-                    if current_date in makeup_dates_set or current_date in holiday_dates_set:
-                        current_date += timedelta(days=1)
-                        continue
-                    if current_date.strftime('%A') == limit['day']:
-                        valid_dates.append(current_date)
-                    current_date += timedelta(days=1)
-                # Schedule up to sessions_needed or as many as possible
-                sessions_scheduled = 0
-                for d in valid_dates:
-                    if sessions_scheduled >= sessions_needed:
-                        break
-                    NewRoutine.objects.create(
-                        semester=selected_semester,
-                        course=limit['course'],
-                        start_time=datetime.strptime(limit['start_time'], "%H:%M").time(),
-                        end_time=datetime.strptime(limit['end_time'], "%H:%M").time(),
-                        day=limit['day'],
-                        class_date=d
-                    )
-                    CurrentRoutine.objects.update_or_create(
-                        semester=selected_semester,
-                        course=limit['course'],
-                        day=limit['day'],
-                        defaults={
-                            'start_time': datetime.strptime(limit['start_time'], "%H:%M").time(),
-                            'end_time': datetime.strptime(limit['end_time'], "%H:%M").time()
-                        }
-                    )
-                    generated_routines.append({
-                        'id': None,
-                        'course_id': limit['course'].id,
-                        'date': d,
-                        'day': limit['day'],
-                        'course_code': limit['course'].code,
-                        'course_name': limit['course'].name,
-                        'teacher': limit['course'].teacher.name,
-                        'start_time': limit['start_time'],
-                        'end_time': limit['end_time']
-                    })
-                    sessions_scheduled += 1
-                # If not enough valid dates, warn the user
-                if sessions_scheduled < sessions_needed:
-                    messages.warning(request, f"Only {sessions_scheduled} out of {sessions_needed} classes could be scheduled for {limit['course'].code} due to semester date constraints. Please add the remaining classes manually.")
-
-            # Sort generated routines by date and time for display
-            generated_routines.sort(key=lambda x: (x['date'], x['start_time']))
-
-            # Ensure unique_dates is always defined
-            if generated_routines:
-                unique_dates = []
-                seen_dates = set()
-                for routine in generated_routines:
-                    date_str = routine['date'].strftime('%Y-%m-%d')
-                    if date_str not in seen_dates:
-                        seen_dates.add(date_str)
-                        unique_dates.append((routine['date'], routine['day']))
-                unique_dates.sort(key=lambda x: x[0])
-            else:
-                unique_dates = []
-
-            # Add makeup dates to unique_dates as blank rows (only date and day, no classes)
-            if makeup_dates:
-                for makeup_date in makeup_dates:
-                    # Only add if the makeup date is within the date range
-                    if start_date <= makeup_date <= end_date:
-                        day_name = makeup_date.strftime('%A')
-                        # Only add Friday and Saturday makeup dates
-                        if day_name in ['Friday', 'Saturday']:
-                            date_str = makeup_date.strftime('%Y-%m-%d')
-                            # Check if this date is not already in unique_dates
-                            date_already_exists = any(date[0].strftime('%Y-%m-%d') == date_str for date in unique_dates)
-                            if not date_already_exists:
-                                unique_dates.append((makeup_date, day_name))
-
-                # Sort again after adding makeup dates
-                unique_dates.sort(key=lambda x: x[0])
-
-            # --- NEW: Build merged time slot structure ---
-            # 1. Collect all unique time boundaries (start and end times)
-            time_boundaries = set()
-            for routine in generated_routines:
-                time_boundaries.add(routine['start_time'])
-                time_boundaries.add(routine['end_time'])
-            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                time_boundaries.add(selected_semester.lunch_break_start.strftime('%H:%M'))
-                time_boundaries.add(selected_semester.lunch_break_end.strftime('%H:%M'))
-            # Convert to sorted list
-            time_boundaries = sorted(time_boundaries)
-
-            # 2. Build contiguous time slots (pairs of adjacent boundaries)
-            all_time_slot_labels = []  # e.g., ['08:45 - 09:45', ...]
-            for i in range(len(time_boundaries)-1):
-                all_time_slot_labels.append(f"{time_boundaries[i]} - {time_boundaries[i+1]}")
-
-            # 2.5. Filter only slots that are actually used by a class or lunch break
-            # Build a set of (start, end) for all routines and lunch break
-            used_slots = set()
-            for routine in generated_routines:
-                r_start = routine['start_time']
-                r_end = routine['end_time']
-                for i in range(len(time_boundaries)-1):
-                    slot_start = time_boundaries[i]
-                    slot_end = time_boundaries[i+1]
-                    # If the slot is fully within the routine
-                    if (slot_start >= r_start and slot_end <= r_end):
-                        used_slots.add((slot_start, slot_end))
-            # Add lunch break as used slot if present
-            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                lb_start = selected_semester.lunch_break_start.strftime('%H:%M')
-                lb_end = selected_semester.lunch_break_end.strftime('%H:%M')
-                for i in range(len(time_boundaries)-1):
-                    slot_start = time_boundaries[i]
-                    slot_end = time_boundaries[i+1]
-                    if (slot_start >= lb_start and slot_end <= lb_end):
-                        used_slots.add((slot_start, slot_end))
-            # Now, filter all_time_slot_labels to only those in used_slots
-            time_slot_labels = []
-            slot_ranges = []
-            for i in range(len(time_boundaries)-1):
-                slot_start = time_boundaries[i]
-                slot_end = time_boundaries[i+1]
-                if (slot_start, slot_end) in used_slots:
-                    label = f"{slot_start} - {slot_end}"
-                    time_slot_labels.append(label)
-                    slot_ranges.append((slot_start, slot_end, label))
-
-            # 3. For each date/day, build a row of cells (with content and colspan)
-            from collections import defaultdict
-            routines_by_date = defaultdict(list)
-            for routine in generated_routines:
-                routines_by_date[(routine['date'], routine['day'])].append(routine)
-
-            # Add lunch break as a pseudo-routine if present
-            lunch_break = None
-            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                lunch_break = {
-                    'start_time': selected_semester.lunch_break_start.strftime('%H:%M'),
-                    'end_time': selected_semester.lunch_break_end.strftime('%H:%M'),
-                    'is_lunch_break': True
-                }
-
-            routine_table_rows = []  # Each row: {'date':..., 'day':..., 'cells': [ {content, colspan, is_lunch_break}, ... ]}
-            for date, day in unique_dates:
-                row_cells = []
-                slot_idx = 0
-                # Use filtered slot_ranges
-                # For this date, get all routines (by start/end)
-                routines = routines_by_date.get((date, day), [])
-                # Add lunch break as a pseudo-routine
-                routines_for_row = routines.copy()
-                if lunch_break:
-                    routines_for_row.append({
-                        'start_time': lunch_break['start_time'],
-                        'end_time': lunch_break['end_time'],
-                        'is_lunch_break': True
-                    })
-                # Sort by start_time
-                routines_for_row.sort(key=lambda r: r['start_time'])
-                # For each slot, check if a routine (or lunch) starts at this slot
-                while slot_idx < len(slot_ranges):
-                    slot_start, slot_end, slot_label = slot_ranges[slot_idx]
-                    found = False
-                    for r in routines_for_row:
-                        r_start = r['start_time']
-                        r_end = r['end_time']
-                        if r_start == slot_start:
-                            # Determine how many slots this routine spans
-                            colspan = 0
-                            for j in range(slot_idx, len(slot_ranges)):
-                                s2, e2, _ = slot_ranges[j]
-                                if e2 <= r_end:
-                                    colspan += 1
-                                else:
-                                    break
-                            if r.get('is_lunch_break'):
-                                content = 'BREAK'
-                                cell = {'content': content, 'colspan': colspan, 'is_lunch_break': True}
-                            else:
-                                content = {
-                                    'course_code': r['course_code'],
-                                    'teacher': 'Supervisor' if r['course_code'] == 'CSE4246' else r['teacher'],
-                                }
-                                if 'id' in r and 'course_id' in r:
-                                    content['routine_id'] = r['id']
-                                    content['course_id'] = r['course_id']
-                                cell = {'content': content, 'colspan': colspan, 'is_lunch_break': False}
-                            row_cells.append(cell)
-                            slot_idx += colspan
-                            found = True
-                            break
-                    if not found:
-                        # If this is a makeup/reserved date, show 'Reserved Class'
-                        if date in makeup_dates:
-                            row_cells.append({'content': 'Makeup Class', 'colspan': 1, 'is_makeup_class': True})
-                        else:
-                            row_cells.append({'content': '', 'colspan': 1, 'is_lunch_break': False})
-                        slot_idx += 1
-                routine_table_rows.append({'date': date, 'day': day, 'cells': row_cells})
-
-            # Prepare data for the calendar view
-            if generated_routines:
-                # Get unique dates and days for column headers
-                unique_dates = []
-                seen_dates = set()
-                for routine in generated_routines:
-                    date_str = routine['date'].strftime('%Y-%m-%d')
-                    if date_str not in seen_dates:
-                        seen_dates.add(date_str)
-                        unique_dates.append((routine['date'], routine['day']))
-
-                # Sort dates chronologically
-                unique_dates.sort(key=lambda x: x[0])
-
-                # Dynamically generate time slots from the actual start and end times
-                # of scheduled courses
-                time_slots = []
-                time_slot_set = set()
-                for routine in generated_routines:
-                    time_slot = f"{routine['start_time']} - {routine['end_time']}"
-                    if time_slot not in time_slot_set:
-                        time_slot_set.add(time_slot)
-                        time_slots.append(time_slot)
-
-                # Sort time slots chronologically
-                time_slots.sort(key=lambda x: x.split(' - ')[0])
-
-                # Add lunch break if configured
-                lunch_break = None
-                if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                    lunch_break = f"{selected_semester.lunch_break_start.strftime('%H:%M')} - {selected_semester.lunch_break_end.strftime('%H:%M')}"
-                    if lunch_break not in time_slot_set:
-                        time_slots.append(lunch_break)
-                        time_slots.sort(key=lambda x: x.split(' - ')[0])
-
-                # Format routines for the calendar view with time slot info
-                calendar_routines = []
-                for routine in generated_routines:
-                    time_slot = f"{routine['start_time']} - {routine['end_time']}"
-
-                    calendar_routines.append({
-                        'date': routine['date'],
-                        'day': routine['day'],
-                        'course_code': routine['course_code'],
-                        'course_name': routine['course_name'],
-                        'teacher': routine['teacher'],
-                        'start_time': routine['start_time'],
-                        'end_time': routine['end_time'],
-                        'time_slot': time_slot,
-                        'is_lunch_break': False
-                    })
+            # The generation worker replaces the semester's routine with one generated from the
+            # schedule saved above; the page follows the job's progress
+            job = enqueue_generation(semester=selected_semester, user=request.user)
+            messages.info(request, f"Routine generation for {selected_semester.name} has been queued.")
+            return redirect(f"{reverse('generate-routine')}?{urlencode({'semester': selected_semester.id, 'job': job.id})}")
 
-                # Add lunch break info to calendar routines context
-                if lunch_break:
-                    context_lunch_break = {
-                        'is_lunch_break': True,
-                        'time_slot': lunch_break
-                    }
-                else:
-                    context_lunch_break = None
-            else:
-                unique_dates = []
-                time_slots = []
-                calendar_routines = []
-                context_lunch_break = None
-
-            # Add success or warning message based on whether routines were generated
-            if generated_routines:
-                messages.success(request, f"Successfully generated routine for {selected_semester.name} with {len(generated_routines)} classes")
-            else:
-                # Create a detailed debug message
-                debug_info = {
-                    'date_range': f"{start_date} to {end_date}",
-                    'processed_days': processed_days,
-                    'matched_days': matched_days,
-                    'form_days': days,
-                    'course_codes_count': len(course_codes),
-                    'friday_courses': [course_codes[i] for i in range(len(days)) if days[i] == 'Friday'],
-                    'saturday_courses': [course_codes[i] for i in range(len(days)) if days[i] == 'Saturday'],
-                }
-                
-                # Add debug info to the warning message
-                messages.warning(request, f"No classes were generated for {selected_semester.name}. Debug info: {debug_info}")
-                
         except Exception as e:
             return render(request, "bou_routines_app/generate_routine.html", {
                 "semesters": semesters,
@@ -921,64 +318,26 @@ def generate_routine(request):
         "semesters": semesters,
         "courses": courses,
         "teachers": teachers,
-        "generated_routines": generated_routines,
+        "has_routines": has_routines,
         "selected_semester_id": selected_semester_id,
         "teacher_short_name_newline": teacher_short_name_newline,
     }
+    # Follow a generation job queued by the Generate button
+    if request.GET.get('job', '').isdigit():
+        context["generation_job_status_url"] = reverse('generation-job-status', args=[int(request.GET['job'])])
     
-    # Add calendar view data if routines were generated (either from POST or GET)
-    if generated_routines:
-        context.update({
-            "routine_dates": unique_dates,
-            "time_slots": time_slots,
-            "calendar_routines": calendar_routines,
-            "lunch_break": lunch_break,
-            # New keys for merged table
-            "routine_table_rows": routine_table_rows,
-            "time_slot_labels": time_slot_labels,
-            "makeup_dates": makeup_dates,  # <-- Add this line
-        })
-
     # Include the selected semester ID if available in POST
     if request.method == "POST" and request.POST.get("semester"):
         context["selected_semester_id"] = request.POST.get("semester")
-        
-    # After routine_table_rows is built, append selected makeup/extra class dates as empty rows (if not already present)
-    if routine_table_rows and time_slot_labels:
-        # Get all dates already present in the table
-        existing_dates = set(row['date'] for row in routine_table_rows)
-        # Get makeup dates from the semester
-        makeup_dates = []
-        if selected_semester.makeup_dates:
-            makeup_dates = [
-                datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                for date in selected_semester.makeup_dates.split(',')
-                if date.strip()
-            ]
-        # Add makeup dates as empty rows only if not already present
-        for makeup_date in makeup_dates:
-            if makeup_date not in existing_dates:
-                routine_table_rows.append({
-                    'date': makeup_date,
-                    'day': makeup_date.strftime('%A'),
-                    'cells': [
-                        {'content': None, 'colspan': 1, 'start_time': slot[0], 'end_time': slot[1]}
-                        for slot in slot_ranges
-                    ]
-                })
 
     return render(request, "bou_routines_app/generate_routine.html", context)
 
 @login_required
 def update_semester_courses(request):
     semesters = Semester.objects.all().order_by('name')
-    courses = Course.objects.all().order_by('code')
-    from .models import Teacher
-    teachers = Teacher.objects.all().order_by('name')
+    # Course and teacher options are loaded by the page from the catalog endpoint
     context = {
         "semesters": semesters,
-        "courses": courses,
-        "teachers": teachers,
     }
     
     if request.method == "POST":
@@ -1048,14 +407,14 @@ def update_semester_courses(request):
         context["selected_semester_id"] = semester_id
     return render(request, "bou_routines_app/semester_courses.html", context)
 
-@login_required
-def get_semester_courses(request):
+@async_login_required
+async def get_semester_courses(request):
     """AJAX view to get courses for a specific semester"""
     if request.method == "GET":
         semester_id = request.GET.get("semester_id")
         if semester_id:
             try:
-                semester = Semester.objects.get(id=semester_id)
+                semester = await Semester.objects.aget(id=semester_id)
                 semester_courses = SemesterCourse.objects.filter(semester_id=semester_id).select_related('course', 'course__teacher')
                 courses_data = [{
                     'id': sc.course.id,
@@ -1064,7 +423,7 @@ def get_semester_courses(request):
                     'teacher_name': sc.course.teacher.name,
                     'teacher_id': sc.course.teacher.id,
                     'number_of_classes': sc.number_of_classes
-                } for sc in semester_courses]
+                } async for sc in semester_courses]
                 lunch_break_info = None
                 if semester.lunch_break_start and semester.lunch_break_end:
                     lunch_break_info = {
@@ -1104,35 +463,35 @@ def get_semester_courses(request):
                     'date_range': date_range_info,
                     'holidays': holidays_info,
                     'makeup_dates': makeup_dates_info,
+                    'class_days': semester.class_day_names,
                     'semester_data': semester_data
                 })
             except Semester.DoesNotExist:
                 return JsonResponse({'courses': [], 'lunch_break': None})
     return JsonResponse({'courses': [], 'lunch_break': None})
 
-@login_required
-def get_existing_generated_routines(request):
+@async_login_required
+async def get_existing_generated_routines(request):
     """AJAX view to get existing generated routines for a specific semester"""
     if request.method == "GET":
         semester_id = request.GET.get("semester_id")
         if semester_id:
             try:
-                semester = Semester.objects.get(id=semester_id)
+                semester = await Semester.objects.aget(id=semester_id)
                 existing_routines = NewRoutine.objects.filter(semester=semester).select_related('course', 'course__teacher').order_by('class_date', 'start_time')
                 
                 routines_data = []
-                if existing_routines.exists():
-                    for routine in existing_routines:
-                        routines_data.append({
-                            'id': routine.id,
-                            'date': routine.class_date.strftime('%Y-%m-%d'),
-                            'day': routine.day,
-                            'course_code': routine.course.code,
-                            'course_name': routine.course.name,
-                            'teacher': routine.course.teacher.name,
-                            'start_time': routine.start_time.strftime('%H:%M'),
-                            'end_time': routine.end_time.strftime('%H:%M')
-                        })
+                async for routine in existing_routines:
+                    routines_data.append({
+                        'id': routine.id,
+                        'date': routine.class_date.strftime('%Y-%m-%d'),
+                        'day': routine.day,
+                        'course_code': routine.course.code,
+                        'course_name': routine.course.name,
+                        'teacher': routine.course.teacher.name,
+                        'start_time': routine.start_time.strftime('%H:%M'),
+                        'end_time': routine.end_time.strftime('%H:%M')
+                    })
                 
                 return JsonResponse({
                     'routines': routines_data,
@@ -1143,7 +502,24 @@ def get_existing_generated_routines(request):
     return JsonResponse({'routines': [], 'has_routines': False})
 
 @login_required
-def check_time_overlap(request):
+@condition(etag_func=lambda request: str(catalog_revision()))
+def catalog(request):
+    """AJAX view returning the compact course/teacher catalog (revalidated by ETag)"""
+    response = JsonResponse(get_catalog())
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+@login_required
+def semester_grid(request, semester_id):
+    """AJAX view returning a semester's routine grid in compact columnar form (see grid.build_semester_grid)"""
+    try:
+        semester = Semester.objects.get(id=semester_id)
+    except Semester.DoesNotExist:
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    return JsonResponse(build_semester_grid(semester))
+
+@async_login_required
+async def check_time_overlap(request):
     """AJAX endpoint to check for time overlaps in real-time"""
     if request.method == "GET":
         # Check if this is a request to get all routines for a semester
@@ -1164,7 +540,7 @@ def check_time_overlap(request):
                         'day': routine.day,
                         'start_time': routine.start_time.strftime('%H:%M'),
                         'end_time': routine.end_time.strftime('%H:%M')
-                    } for routine in routines]
+                    } async for routine in routines]
                     
                     return JsonResponse({
                         'routines': routines_data
@@ -1210,7 +586,7 @@ def check_time_overlap(request):
             # Fall back to semester's lunch break if no custom times provided
             elif semester_id:
                 try:
-                    semester = Semester.objects.get(id=semester_id)
+                    semester = await Semester.objects.aget(id=semester_id)
                     if semester.lunch_break_start and semester.lunch_break_end:
                         lunch_start = semester.lunch_break_start
                         lunch_end = semester.lunch_break_end
@@ -1229,15 +605,15 @@ def check_time_overlap(request):
                 except Semester.DoesNotExist:
                     pass
             
-            # Find routines with the same day and same teacher
-            query = CurrentRoutine.objects.filter(day=day, course__teacher_id=teacher_id)
-            
-            # Exclude current course if provided (for editing scenarios)
-            if course_id:
-                query = query.exclude(course_id=course_id)
-                
-            for routine in query:
-                if time_overlap(start, end, routine.start_time, routine.end_time):
+            # Occupancy bitmask of the teacher on that day; the current course is
+            # excluded if provided (for editing scenarios)
+            occupancy = await sync_to_async(TeacherOccupancy.build)(teacher_ids=[teacher_id], days=[day])
+            conflicts = occupancy.conflicts(int(teacher_id), day, start, end, exclude_course=course_id or None)
+            if conflicts:
+                query = CurrentRoutine.objects.filter(
+                    id__in=[routine_id for _, routine_id in conflicts]
+                ).select_related('course', 'course__teacher').order_by('start_time')
+                async for routine in query:
                     overlaps.append({
                         "course": routine.course.code,
                         "course_name": routine.course.name,
@@ -1257,37 +633,42 @@ def check_time_overlap(request):
     
     return JsonResponse({"overlaps": []})
 
+def _grid_revision(data):
+    """Client grid revision sent with an edit, or None"""
+    value = data.get('grid_revision')
+    return int(value) if str(value).isdigit() else None
+
 @login_required
 def update_routine_course(request):
-    """Update a routine's course or create a new routine entry via AJAX"""
+    """
+    Update a routine's course or create a new routine entry via AJAX.
+
+    Edits on holidays or over the lunch break are rejected. Edits that double-book the
+    teacher on that date are rejected too unless allow_conflicts=1 is sent, in which case
+    they are saved with a warning. The response carries a grid_patch with the re-merged
+    rows of the edited date (see grid.record_grid_change); send grid_revision, the revision
+    of the grid shown, to get the whole grid back when it is out of date.
+    """
     if request.method == 'POST':
         try:
             routine_id = request.POST.get('routine_id')
             new_course_id = request.POST.get('course_id')
+            allow_conflicts = request.POST.get('allow_conflicts') == '1'
             
             if not new_course_id:
                 return JsonResponse({"error": "Missing course_id"}, status=400)
             
             # Get the course
-            new_course = Course.objects.get(id=new_course_id)
+            new_course = Course.objects.select_related('teacher').get(id=new_course_id)
             
             if routine_id:
                 # Updating existing routine
                 try:
-                    routine = NewRoutine.objects.get(id=routine_id)
-                    routine.course = new_course
-                    routine.save()
-                    
-                    # Return updated course information
-                    return JsonResponse({
-                        "success": True,
-                        "course_code": new_course.code,
-                        "course_name": new_course.name,
-                        "teacher_name": new_course.teacher.name,
-                        "teacher_short_name": new_course.teacher.short_name if new_course.teacher.short_name else new_course.teacher.name
-                    })
+                    routine = NewRoutine.objects.select_related('semester').get(id=routine_id)
                 except NewRoutine.DoesNotExist:
                     return JsonResponse({"error": "Routine not found"}, status=404)
+                semester = routine.semester
+                class_date, start_time, end_time = routine.class_date, routine.start_time, routine.end_time
             else:
                 # Creating new routine entry
                 date_str = request.POST.get('date')
@@ -1305,31 +686,60 @@ def update_routine_course(request):
                     class_date = datetime.strptime(date_str, '%Y-%m-%d').date()
                     start_time = datetime.strptime(start_time_str, '%H:%M').time()
                     end_time = datetime.strptime(end_time_str, '%H:%M').time()
-                    
-                    # Create new routine entry
-                    new_routine = NewRoutine.objects.create(
-                        semester=semester,
-                        course=new_course,
-                        class_date=class_date,
-                        day=day,
-                        start_time=start_time,
-                        end_time=end_time
-                    )
-                    
-                    # Return new routine information
-                    return JsonResponse({
-                        "success": True,
-                        "routine_id": new_routine.id,
-                        "course_code": new_course.code,
-                        "course_name": new_course.name,
-                        "teacher_name": new_course.teacher.name,
-                        "teacher_short_name": new_course.teacher.short_name if new_course.teacher.short_name else new_course.teacher.name
-                    })
-                    
                 except Semester.DoesNotExist:
                     return JsonResponse({"error": "Semester not found"}, status=404)
                 except ValueError:
                     return JsonResponse({"error": "Invalid date or time format"}, status=400)
+
+            # Validate against the cached semester rules and teacher-date index before writing
+            errors, conflicts, index = validate_routine_edit(
+                semester, new_course, class_date, start_time, end_time,
+                routine_id=int(routine_id) if routine_id else None, day=None if routine_id else day,
+            )
+            if errors:
+                return JsonResponse({"error": " ".join(errors), "conflicts": conflicts}, status=409)
+            if conflicts and not allow_conflicts:
+                return JsonResponse({
+                    "error": f"{new_course.teacher.name} already has a class at this time on {class_date.strftime('%d/%m/%Y')}.",
+                    "conflicts": conflicts,
+                    "can_override": True,
+                }, status=409)
+
+            grid_state = get_grid_state(semester)
+            if routine_id:
+                routine.course = new_course
+                routine.save()
+            else:
+                routine = NewRoutine.objects.create(
+                    semester=semester,
+                    course=new_course,
+                    class_date=class_date,
+                    day=day,
+                    start_time=start_time,
+                    end_time=end_time
+                )
+            bump_semester_revision([semester.id])
+            record_routine_change(index, routine, removed_id=routine.id if routine_id else None)
+            grid_patch = record_grid_change(
+                grid_state, removed_ids=[routine.id] if routine_id else [], changed_ids=[routine.id],
+                client_revision=_grid_revision(request.POST),
+            )
+
+            # Return the routine information together with the conflict state of that date
+            return JsonResponse({
+                "success": True,
+                "routine_id": routine.id,
+                "course_code": new_course.code,
+                "course_name": new_course.name,
+                "teacher_name": new_course.teacher.name,
+                "teacher_short_name": new_course.teacher.short_name if new_course.teacher.short_name else new_course.teacher.name,
+                "conflicts": conflicts,
+                "warnings": [
+                    f"{new_course.teacher.name} is double-booked with {conflict['course_code']} ({conflict['start_time']}-{conflict['end_time']})."
+                    for conflict in conflicts
+                ],
+                "grid_patch": grid_patch,
+            })
             
         except Course.DoesNotExist:
             return JsonResponse({"error": "Course not found"}, status=404)
@@ -1340,7 +750,7 @@ def update_routine_course(request):
 
 @login_required
 def remove_routine_course(request):
-    """Remove a routine entry via AJAX"""
+    """Remove a routine entry via AJAX; the response carries a grid_patch like update_routine_course"""
     if request.method == 'POST':
         try:
             routine_id = request.POST.get('routine_id')
@@ -1350,12 +760,18 @@ def remove_routine_course(request):
             
             # Get and delete the routine
             try:
-                routine = NewRoutine.objects.get(id=routine_id)
+                routine = NewRoutine.objects.select_related('semester').get(id=routine_id)
+                grid_state = get_grid_state(routine.semester)
+                removed_id = routine.id
                 routine.delete()
+                bump_semester_revision([routine.semester_id])
                 
                 return JsonResponse({
                     "success": True,
-                    "message": "Routine entry removed successfully"
+                    "message": "Routine entry removed successfully",
+                    "grid_patch": record_grid_change(
+                        grid_state, removed_ids=[removed_id], client_revision=_grid_revision(request.POST)
+                    ),
                 })
                 
             except NewRoutine.DoesNotExist:
@@ -1366,242 +782,18 @@ def remove_routine_course(request):
     
     return JsonResponse({"error": "Invalid request method"}, status=405)
 
-@login_required
-def export_to_excel(request, semester_id):
-    """Export the routine to Excel file"""
-    try:
-        selected_semester = Semester.objects.get(id=semester_id)
-
-        # Create a response for Excel file
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet("Routine")
-
-        # Add some formatting
-        title_format = workbook.add_format({
-            'bold': True,
-            'font_size': 14,
-            'align': 'center',
-            'valign': 'vcenter'
-        })
-        header_format = workbook.add_format({
-            'bold': True,
-            'font_size': 12,
-            'align': 'center',
-            'valign': 'vcenter',
-            'bg_color': '#2c3e50',
-            'font_color': 'white',
-            'border': 1
-        })
-        cell_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1
-        })
-        date_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1,
-            'bold': True,
-            'num_format': 'dd/mm/yyyy'
-        })
-        lunch_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1,
-            'bg_color': '#fff2cc',
-            'bold': True
-        })
-        course_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1,
-            'bg_color': '#3498db',
-            'font_color': 'white',
-            'text_wrap': True
-        })
-
-        # Add formats for even row background and even row class cell
-        even_row_bg_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1,
-            'bg_color': '#e3f0fa',
-        })
-        even_class_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1,
-            'bg_color': '#d0e6f7',
-            'font_color': 'black',
-            'text_wrap': True
-        })
-
-        # Get the routines from the database
-        routines = NewRoutine.objects.filter(semester=selected_semester).order_by('class_date', 'start_time')
-
-        # Get unique dates and days
-        unique_dates_days = []
-        seen_dates = set()
-        for routine in routines:
-            date_str = routine.class_date.strftime('%Y-%m-%d')
-            if date_str not in seen_dates:
-                seen_dates.add(date_str)
-                unique_dates_days.append((routine.class_date, routine.day))
-
-        # Sort dates chronologically
-        unique_dates_days.sort(key=lambda x: x[0])
-
-        # --- Build slot_ranges for merging logic ---
-        time_boundaries = set()
-        for routine in routines:
-            time_boundaries.add(routine.start_time.strftime('%H:%M'))
-            time_boundaries.add(routine.end_time.strftime('%H:%M'))
-        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-            time_boundaries.add(selected_semester.lunch_break_start.strftime('%H:%M'))
-            time_boundaries.add(selected_semester.lunch_break_end.strftime('%H:%M'))
-        time_boundaries = sorted(time_boundaries)
-
-        slot_ranges = []
-        for i in range(len(time_boundaries)-1):
-            slot_start = time_boundaries[i]
-            slot_end = time_boundaries[i+1]
-            slot_ranges.append((slot_start, slot_end, f"{slot_start} - {slot_end}"))
-
-        used_slots = set()
-        for routine in routines:
-            r_start = routine.start_time.strftime('%H:%M')
-            r_end = routine.end_time.strftime('%H:%M')
-            for i in range(len(time_boundaries)-1):
-                slot_start = time_boundaries[i]
-                slot_end = time_boundaries[i+1]
-                if (slot_start >= r_start and slot_end <= r_end):
-                    used_slots.add((slot_start, slot_end))
-        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-            lb_start = selected_semester.lunch_break_start.strftime('%H:%M')
-            lb_end = selected_semester.lunch_break_end.strftime('%H:%M')
-            for i in range(len(time_boundaries)-1):
-                slot_start = time_boundaries[i]
-                slot_end = time_boundaries[i+1]
-                if (slot_start >= lb_start and slot_end <= lb_end):
-                    used_slots.add((slot_start, slot_end))
-
-        filtered_slot_ranges = []
-        for slot_start, slot_end, label in slot_ranges:
-            if (slot_start, slot_end) in used_slots:
-                filtered_slot_ranges.append((slot_start, slot_end, label))
-        slot_ranges = filtered_slot_ranges
-
-        # Add title
-        worksheet.merge_range(0, 0, 0, len(slot_ranges) + 1, f"{selected_semester.name} Routine", title_format)
-
-        # Write headers
-        row = 2
-        worksheet.write(row, 0, "Date", header_format)
-        worksheet.write(row, 1, "Day", header_format)
-        for col, (_, _, label) in enumerate(slot_ranges):
-            worksheet.write(row, col + 2, label, header_format)
-
-        # Set column widths
-        worksheet.set_column(0, 0, 12)  # Date column
-        worksheet.set_column(1, 1, 10)  # Day column
-        worksheet.set_column(2, len(slot_ranges) + 1, 15)  # Time slot columns
-
-        # Merge unique_dates_days and makeup_dates, sort, and output in order
-        makeup_dates = []
-        if selected_semester.makeup_dates:
-            makeup_dates = [
-                datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                for date in selected_semester.makeup_dates.split(',')
-                if date.strip()
-            ]
-        # Build a dict for quick lookup of routines by date
-        routines_by_date = {date: day for date, day in unique_dates_days}
-        all_dates = set(routines_by_date.keys()) | set(makeup_dates)
-        sorted_dates = sorted(all_dates)
-        # Write data with merging
-        row = 3
-        for date_idx, date in enumerate(sorted_dates):
-            day = routines_by_date.get(date, date.strftime('%A'))
-            is_even_row = (date_idx % 2 == 1)
-            worksheet.write(row, 0, date, date_format if not is_even_row else even_row_bg_format)
-            worksheet.write(row, 1, day, cell_format if not is_even_row else even_row_bg_format)
-            # Build routines for this row
-            routines_for_row = []
-            for r in routines:
-                if r.class_date == date and r.day == day:
-                    routines_for_row.append({
-                        'course_code': r.course.code,
-                        'teacher': 'Supervisor' if r.course.code == 'CSE4246' else r.course.teacher.short_name,
-                        'start_time': r.start_time.strftime('%H:%M'),
-                        'end_time': r.end_time.strftime('%H:%M'),
-                        'is_lunch_break': False
-                    })
-            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                routines_for_row.append({
-                    'start_time': selected_semester.lunch_break_start.strftime('%H:%M'),
-                    'end_time': selected_semester.lunch_break_end.strftime('%H:%M'),
-                    'is_lunch_break': True
-                })
-            routines_for_row.sort(key=lambda r: r['start_time'])
-            # Process each slot and handle merging
-            slot_idx = 0
-            col_idx = 2  # Start after date and day columns
-            while slot_idx < len(slot_ranges):
-                slot_start, slot_end, slot_label = slot_ranges[slot_idx]
-                found = False
-                for r in routines_for_row:
-                    r_start = r['start_time']
-                    r_end = r['end_time']
-                    is_lunch = r.get('is_lunch_break', False)
-                    if r_start == slot_start:
-                        # Determine colspan
-                        colspan = 0
-                        for j in range(slot_idx, len(slot_ranges)):
-                            s2, e2, _ = slot_ranges[j]
-                            if e2 <= r_end:
-                                colspan += 1
-                            else:
-                                break
-                        # Prepare cell content
-                        if is_lunch:
-                            cell_content = "BREAK"
-                            format_to_use = lunch_format
-                        else:
-                            cell_content = f"{r['course_code']} ({r['teacher']})"
-                            format_to_use = course_format if not is_even_row else even_class_format
-                        # Write content and merge if needed
-                        if colspan > 1:
-                            worksheet.merge_range(row, col_idx, row, col_idx + colspan - 1, cell_content, format_to_use)
-                        else:
-                            worksheet.write(row, col_idx, cell_content, format_to_use)
-                        col_idx += colspan
-                        slot_idx += colspan
-                        found = True
-                        break
-                if not found:
-                    # If this is a makeup/reserved date, show 'Reserved Class'
-                    if date in makeup_dates:
-                        worksheet.write(row, col_idx, "Makeup Class", cell_format if not is_even_row else even_row_bg_format)
-                    else:
-                        worksheet.write(row, col_idx, "", cell_format if not is_even_row else even_row_bg_format)
-                    col_idx += 1
-                    slot_idx += 1
-            row += 1
-        # Set row heights
-        for i in range(3, row):
-            worksheet.set_row(i, 50)
-
-        workbook.close()
-
-        # Prepare the response
-        output.seek(0)
-        response = HttpResponse(output.read(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-        response['Content-Disposition'] = f'attachment; filename="{selected_semester.name}_Routine.xlsx"'
-        return response
+async def _semester_revision(semester_id):
+    # Exports are stored per semester revision and rendered once (see singleflight.py)
+    return await Semester.objects.filter(id=semester_id).values_list('revision', flat=True).afirst()
 
-    except Exception as e:
-        return HttpResponse(f"Error generating Excel file: {str(e)}", status=500)
+@async_login_required
+async def export_to_excel(request, semester_id):
+    """Export the routine to Excel file"""
+    revision = await _semester_revision(semester_id)
+    key, render_export, args = routine_export('routine-xlsx', semester_id, revision)
+    if revision is None:
+        return await run_in_export_pool(render_export, *args)
+    return await single_flight_export(key, render_export, *args)
 
 @login_required
 def download_routines(request):
@@ -1611,779 +803,29 @@ def download_routines(request):
         newroutine__isnull=False
     ).distinct().order_by('order', 'name')
     
-    # For each semester, get the last generated routine data
+    # Each semester card is fragment-cached by (semester id, revision); the table is
+    # only built when the template misses the cache and touches it
     semester_routines = []
     for semester in semesters_with_routines:
-        # Get the latest routines for this semester
-        latest_routines = NewRoutine.objects.filter(
-            semester=semester
-        ).order_by('class_date', 'start_time')
-        
-        if latest_routines.exists():
-            # Get unique dates and days
-            unique_dates_days = []
-            seen_dates = set()
-            for routine in latest_routines:
-                date_str = routine.class_date.strftime('%Y-%m-%d')
-                if date_str not in seen_dates:
-                    seen_dates.add(date_str)
-                    unique_dates_days.append((routine.class_date, routine.day))
-            
-            # Sort dates chronologically
-            unique_dates_days.sort(key=lambda x: x[0])
-            
-            # Build time slot structure for merged view
-            time_boundaries = set()
-            for routine in latest_routines:
-                time_boundaries.add(routine.start_time.strftime('%H:%M'))
-                time_boundaries.add(routine.end_time.strftime('%H:%M'))
-            if semester.lunch_break_start and semester.lunch_break_end:
-                time_boundaries.add(semester.lunch_break_start.strftime('%H:%M'))
-                time_boundaries.add(semester.lunch_break_end.strftime('%H:%M'))
-            time_boundaries = sorted(time_boundaries)
-            
-            slot_ranges = []
-            for i in range(len(time_boundaries)-1):
-                slot_start = time_boundaries[i]
-                slot_end = time_boundaries[i+1]
-                slot_ranges.append((slot_start, slot_end, f"{slot_start} - {slot_end}"))
-            
-            used_slots = set()
-            for routine in latest_routines:
-                r_start = routine.start_time.strftime('%H:%M')
-                r_end = routine.end_time.strftime('%H:%M')
-                for i in range(len(time_boundaries)-1):
-                    slot_start = time_boundaries[i]
-                    slot_end = time_boundaries[i+1]
-                    if (slot_start >= r_start and slot_end <= r_end):
-                        used_slots.add((slot_start, slot_end))
-            if semester.lunch_break_start and semester.lunch_break_end:
-                lb_start = semester.lunch_break_start.strftime('%H:%M')
-                lb_end = semester.lunch_break_end.strftime('%H:%M')
-                for i in range(len(time_boundaries)-1):
-                    slot_start = time_boundaries[i]
-                    slot_end = time_boundaries[i+1]
-                    if (slot_start >= lb_start and slot_end <= lb_end):
-                        used_slots.add((slot_start, slot_end))
-            
-            filtered_slot_ranges = []
-            for slot_start, slot_end, label in slot_ranges:
-                if (slot_start, slot_end) in used_slots:
-                    filtered_slot_ranges.append((slot_start, slot_end, label))
-            slot_ranges = filtered_slot_ranges
-            
-            # Build routine table rows
-            routine_table_rows = []
-            for date, day in unique_dates_days:
-                row_cells = []
-                slot_idx = 0
-                routines_for_row = []
-                for r in latest_routines:
-                    if r.class_date == date and r.day == day:
-                        routines_for_row.append({
-                            'course_code': r.course.code,
-                            'teacher': 'Supervisor' if r.course.code == 'CSE4246' else r.course.teacher.short_name,
-                            'start_time': r.start_time.strftime('%H:%M'),
-                            'end_time': r.end_time.strftime('%H:%M'),
-                            'is_lunch_break': False
-                        })
-                if semester.lunch_break_start and semester.lunch_break_end:
-                    routines_for_row.append({
-                        'start_time': semester.lunch_break_start.strftime('%H:%M'),
-                        'end_time': semester.lunch_break_end.strftime('%H:%M'),
-                        'is_lunch_break': True
-                    })
-                routines_for_row.sort(key=lambda r: r['start_time'])
-                
-                while slot_idx < len(slot_ranges):
-                    slot_start, slot_end, slot_label = slot_ranges[slot_idx]
-                    found = False
-                    for r in routines_for_row:
-                        r_start = r['start_time']
-                        r_end = r['end_time']
-                        if r_start == slot_start:
-                            colspan = 0
-                            for j in range(slot_idx, len(slot_ranges)):
-                                s2, e2, _ = slot_ranges[j]
-                                if e2 <= r_end:
-                                    colspan += 1
-                                else:
-                                    break
-                            if r.get('is_lunch_break'):
-                                content = 'BREAK'
-                                cell = {'content': content, 'colspan': colspan, 'is_lunch_break': True}
-                            else:
-                                content = {
-                                    'course_code': r['course_code'],
-                                    'teacher': 'Supervisor' if r['course_code'] == 'CSE4246' else r['teacher'],
-                                }
-                                if 'id' in r and 'course_id' in r:
-                                    content['routine_id'] = r['id']
-                                    content['course_id'] = r['course_id']
-                                cell = {'content': content, 'colspan': colspan, 'is_lunch_break': False}
-                            row_cells.append(cell)
-                            slot_idx += colspan
-                            found = True
-                            break
-                    if not found:
-                        row_cells.append({'content': '', 'colspan': 1, 'is_lunch_break': False})
-                        slot_idx += 1
-                routine_table_rows.append({'date': date, 'day': day, 'cells': row_cells})
-            
-            # Add makeup dates for this semester
-            makeup_dates = []
-            if semester.makeup_dates:
-                makeup_dates = [
-                    datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                    for date in semester.makeup_dates.split(',')
-                    if date.strip()
-                ]
-            semester_routines.append({
-                'semester': semester,
-                'routine_table_rows': routine_table_rows,
-                'time_slot_labels': [label for _, _, label in slot_ranges],
-                'routine_count': latest_routines.count(),
-                'makeup_dates': makeup_dates,  # <-- Add this line
-            })
+        semester_routines.append({
+            'semester': semester,
+            'table': SimpleLazyObject(partial(build_routine_table, semester)),
+        })
     
     return render(request, 'bou_routines_app/download_routines.html', {
         'semester_routines': semester_routines
     })
 
-@login_required
-def export_to_pdf(request, semester_id):
+@async_login_required
+async def export_to_pdf(request, semester_id):
     """Export the routine to PDF file"""
-    try:
-        selected_semester = Semester.objects.get(id=semester_id)
-
-        # Read the teacher short name display option from GET params
-        teacher_short_name_newline = request.GET.get('teacher_short_name_newline', '1') == '1'
-
-        # Create a response for PDF file
-        buffer = io.BytesIO()
-
-        # Create the PDF document with A4 landscape orientation and decent print margins
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=landscape(A4),
-            rightMargin=54,  # 0.75 inch
-            leftMargin=54,   # 0.75 inch
-            topMargin=34,    # 0.75 inch
-            bottomMargin=34  # Reduced from 54 (about 1/3 inch)
-        )
-
-        # Get page width and height for calculations
-        page_width, page_height = landscape(A4)
-
-        # Calculate available width for all tables (accounting for document margins)
-        available_width = page_width - doc.leftMargin - doc.rightMargin
-
-        elements = []
-
-        # --- HEADER IMAGE SECTION ---
-        header_img_path = 'bou_routines_app/static/pdf_routine_top.png'
-        try:
-            # Padding for the image cell (matching routine table cell padding of 2)
-            padding_for_image = 2
-
-            # Create an Image object, scaled by width to fit within the available padded space
-            # Height will be auto-calculated to maintain aspect ratio.
-            img_obj = Image(header_img_path, width=available_width - (2 * padding_for_image), height=45)
-
-            # Put the image in a single-cell table whose width spans the available area,
-            # and apply padding to the cell to align the image correctly.
-            header_img_table = Table([[img_obj]], colWidths=[available_width])
-            header_img_table.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'), # Center the image horizontally within its cell
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'), # Center vertically
-                ('LEFTPADDING', (0,0), (-1, -1), padding_for_image),
-                ('RIGHTPADDING', (0,0), (-1, -1), padding_for_image),
-                ('TOPPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
-                ('BOTTOMPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
-            ]))
-            elements.append(header_img_table)
-        except Exception as e:
-            print(f"Error loading header image: {e}")
-            pass # If image not found, skip
-        elements.append(Spacer(1, -4))  # Minimal gap above program name
-
-        # Build left column (program/session/term/commencement/study center)
-        header_style = ParagraphStyle(
-            'HeaderStyle',
-            fontName='Helvetica-Bold',
-            fontSize=15,  # Reduced from 18
-            alignment=1,  # Center
-            leading=18,   # Reduced from 28
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-        header_style_small = ParagraphStyle(
-            'HeaderStyleSmall',
-            fontName='Helvetica-Bold',
-            fontSize=11,  # Reduced from 14
-            alignment=1,
-            leading=14,   # Reduced from 22
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-        header_style_normal = ParagraphStyle(
-            'HeaderStyleNormal',
-            fontName='Helvetica',
-            fontSize=10,   # Reduced from 12
-            alignment=1,
-            leading=11,   # Reduced from 20
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-        header_style_bold = ParagraphStyle(
-            'HeaderStyleBold',
-            fontName='Helvetica-Bold',
-            fontSize=12,  # Reduced from 15
-            alignment=1,
-            leading=15,   # Reduced from 24
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-
-        left_content = []
-        program_name = 'B. Sc in Computer Science and Engineering Program'
-        left_content.append(Paragraph(program_name, header_style))
-        session = selected_semester.session or ''
-        if session:
-            left_content.append(Paragraph(f'{session} Session', header_style_small))
-        term = selected_semester.term or ''
-        semester_full_name = selected_semester.semester_full_name or ''
-        if term or semester_full_name:
-            combined = f'{term} Term {semester_full_name}'.strip()
-            left_content.append(Paragraph(combined, header_style_small))
-        left_content.append(Spacer(1, 2))  # Reduced from 8
-        left_content.append(Paragraph('Class Routine', header_style_bold))
-        commencement = selected_semester.start_date.strftime('%d %B %Y') if selected_semester.start_date else ''
-        study_center = selected_semester.study_center or ''
-        if commencement:
-            left_content.append(Paragraph(f'<b>Date of Commencement:</b> {commencement}', header_style_normal))
-        if study_center:
-            left_content.append(Paragraph(f'<b>Study Center:</b> {study_center}', header_style_normal))
-
-        # Build right column (contact person box)
-        contact_lines = []
-        if selected_semester.contact_person:
-            contact_label = Paragraph(
-                'Contact Person',
-                ParagraphStyle(
-                    'ContactLabel',
-                    fontName='Helvetica-Bold',
-                    fontSize=11,
-                    alignment=0,  # Left align
-                    textColor=colors.white,
-                    spaceAfter=0,
-                    spaceBefore=0,
-                    leading=14,
-                )
-            )
-            # Add 4px gap below the label using a single-cell table row with bottom padding
-            contact_label_table = Table(
-                [[contact_label]],
-                colWidths=[180],
-                hAlign='RIGHT',
-                style=TableStyle([
-                    ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-                    ('TOPPADDING', (0,0), (-1,-1), -3),
-                    ('LEFTPADDING', (0,0), (-1,-1), 0),
-                    ('RIGHTPADDING', (0,0), (-1,-1), 0),
-                ])
-            )
-            contact_info_lines = []
-            contact_info_lines.append(selected_semester.contact_person)
-        if selected_semester.contact_person_designation:
-            contact_info_lines.append(selected_semester.contact_person_designation)
-        contact_info_lines.append('School of Science and Technology')
-        contact_info_lines.append('Bangladesh Open University')
-        if selected_semester.contact_person_phone:
-            contact_info_lines.append(f'Phone/Whatsapp: {selected_semester.contact_person_phone}')
-        if selected_semester.contact_person_email:
-            contact_info_lines.append(f'email:{selected_semester.contact_person_email}')
-        contact_info_para = Paragraph(
-            '<br/>'.join(contact_info_lines),
-            ParagraphStyle(
-                'ContactBox',
-                fontName='Helvetica',
-                fontSize=10,
-                alignment=0,  # Left align
-                textColor=colors.black,
-                leftIndent=2,
-                leading=10,
-                spaceBefore=0,
-                spaceAfter=0,
-            )
-        )
-        contact_table = Table(
-            [[contact_label_table], [contact_info_para]],
-            colWidths=[180],
-            hAlign='RIGHT',
-        )
-        contact_table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),  # Single, lighter border
-            ('ROUNDED', (0, 0), (-1, -1), 6),  # Rounded corners
-            ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#2c3e50')),  # Label bg
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (0, 0), 6),  # Label row
-            ('BOTTOMPADDING', (0, 0), (0, 0), 4),  # Label row
-            ('TOPPADDING', (0, 1), (0, 1), 4),  # Info row
-            ('BOTTOMPADDING', (0, 1), (0, 1), 6),  # Info row
-        ]))
-
-        # Vertically center the left header content to match the contact box
-        left_box_table = Table(
-            [[left_content]],
-            colWidths=[available_width-180],
-            hAlign='LEFT',
-            style=TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ])
-        )
-        two_col_table = Table(
-            [[left_box_table, contact_table]],
-            colWidths=[available_width-180, 180],
-            hAlign='LEFT'
-        )
-        two_col_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (0, 0), 'MIDDLE'),
-            ('VALIGN', (1, 0), (1, 0), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-        ]))
-        elements.append(Spacer(1, 4))  # Add slight gap before contact box
-        elements.append(two_col_table)
-        elements.append(Spacer(1, 4))  # Reduced from 16
-
-        # Get the routines from the database
-        routines = NewRoutine.objects.filter(semester=selected_semester).order_by('class_date', 'start_time')
-
-        # Get unique dates and days
-        unique_dates_days = []
-        seen_dates = set()
-        for routine in routines:
-            date_str = routine.class_date.strftime('%Y-%m-%d')
-            if date_str not in seen_dates:
-                seen_dates.add(date_str)
-                unique_dates_days.append((routine.class_date, routine.day))
-
-        # Sort dates chronologically
-        unique_dates_days.sort(key=lambda x: x[0])
-
-        # Get unique time slots
-        time_slot_set = set()
-        for routine in routines:
-            time_slot = f"{routine.start_time.strftime('%H:%M')} - {routine.end_time.strftime('%H:%M')}"
-            time_slot_set.add(time_slot)
-
-        # Add lunch break if configured
-        lunch_break = None
-        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-            lunch_break = f"{selected_semester.lunch_break_start.strftime('%H:%M')} - {selected_semester.lunch_break_end.strftime('%H:%M')}"
-            time_slot_set.add(lunch_break)
-
-        # Sort time slots
-        time_slots = sorted(list(time_slot_set), key=lambda x: x.split(' - ')[0])
-
-        # Title
-        styles = getSampleStyleSheet()
-        title_style = styles['Title']
-        title_style.alignment = 1  # Center alignment
-        # title = Paragraph(f"{selected_semester.name} Routine", title_style)
-        # elements.append(title)
-        elements.append(Paragraph("<br/>", styles['Normal']))
-
-        # --- Build slot_ranges before using it ---
-        time_boundaries = set()
-        for routine in routines:
-            time_boundaries.add(routine.start_time.strftime('%H:%M'))
-            time_boundaries.add(routine.end_time.strftime('%H:%M'))
-        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-            time_boundaries.add(selected_semester.lunch_break_start.strftime('%H:%M'))
-            time_boundaries.add(selected_semester.lunch_break_end.strftime('%H:%M'))
-        time_boundaries = sorted(time_boundaries)
-
-        slot_ranges = []
-        for i in range(len(time_boundaries)-1):
-            slot_start = time_boundaries[i]
-            slot_end = time_boundaries[i+1]
-            slot_ranges.append((slot_start, slot_end, f"{slot_start} - {slot_end}"))
-
-        used_slots = set()
-        for routine in routines:
-            r_start = routine.start_time.strftime('%H:%M')
-            r_end = routine.end_time.strftime('%H:%M')
-            for i in range(len(time_boundaries)-1):
-                slot_start = time_boundaries[i]
-                slot_end = time_boundaries[i+1]
-                if (slot_start >= r_start and slot_end <= r_end):
-                    used_slots.add((slot_start, slot_end))
-        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-            lb_start = selected_semester.lunch_break_start.strftime('%H:%M')
-            lb_end = selected_semester.lunch_break_end.strftime('%H:%M')
-            for i in range(len(time_boundaries)-1):
-                slot_start = time_boundaries[i]
-                slot_end = time_boundaries[i+1]
-                if (slot_start >= lb_start and slot_end <= lb_end):
-                    used_slots.add((slot_start, slot_end))
-
-        filtered_slot_ranges = []
-        for slot_start, slot_end, label in slot_ranges:
-            if (slot_start, slot_end) in used_slots:
-                filtered_slot_ranges.append((slot_start, slot_end, label))
-        slot_ranges = filtered_slot_ranges
-
-        # --- Build table_data for PDF with colspans and track spans ---
-        span_commands = []  # To collect ('SPAN', ...) commands
-        header_row = ["Date", "Day"] + [label for _, _, label in slot_ranges]
-        table_data = [header_row]
-        # Merge all routine dates and makeup dates, sort, and ensure each date appears only once in order
-        makeup_dates = []
-        if selected_semester.makeup_dates:
-            makeup_dates = [
-                datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                for date in selected_semester.makeup_dates.split(',')
-                if date.strip()
-            ]
-        day_by_date = {date: day for date, day in unique_dates_days}
-        all_dates = set(day_by_date.keys()) | set(makeup_dates)
-        sorted_dates = sorted(all_dates)
-
-        for row_idx, date in enumerate(sorted_dates, start=1):
-            day = day_by_date.get(date, date.strftime('%A'))
-            row = [date.strftime('%d/%m/%y'), day]
-            slot_idx = 0
-            # Build routines_for_row: all routines for this date, plus lunch break if present
-            routines_for_row = []
-            for r in routines:
-                if r.class_date == date:
-                    routines_for_row.append({
-                        'course_code': r.course.code,
-                        'teacher': 'Supervisor' if r.course.code == 'CSE4246' else r.course.teacher.short_name,
-                        'start_time': r.start_time.strftime('%H:%M'),
-                        'end_time': r.end_time.strftime('%H:%M'),
-                        'is_lunch_break': False
-                    })
-            if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-                routines_for_row.append({
-                    'start_time': selected_semester.lunch_break_start.strftime('%H:%M'),
-                    'end_time': selected_semester.lunch_break_end.strftime('%H:%M'),
-                    'is_lunch_break': True
-                })
-            routines_for_row.sort(key=lambda r: r['start_time'])
-            col_idx = 2
-            while slot_idx < len(slot_ranges):
-                slot_start, slot_end, slot_label = slot_ranges[slot_idx]
-                found = False
-                for r in routines_for_row:
-                    r_start = r['start_time']
-                    r_end = r['end_time']
-                    is_lunch = r.get('is_lunch_break', False)
-                    if r_start == slot_start:
-                        # Determine colspan
-                        colspan = 0
-                        for j in range(slot_idx, len(slot_ranges)):
-                            s2, e2, _ = slot_ranges[j]
-                            if e2 <= r_end:
-                                colspan += 1
-                            else:
-                                break
-                        # Add content and None for colspan-1
-                        if is_lunch:
-                            cell_content = Paragraph("BREAK", ParagraphStyle(
-                                'BreakContent',
-                                fontName='Helvetica-Bold',
-                                fontSize=9,
-                                alignment=TA_CENTER,
-                                leading=8,
-                                spaceBefore=0,
-                                spaceAfter=0,
-                            ))
-                        else:
-                            course_code = r['course_code']
-                            teacher_short = r['teacher']
-                            if teacher_short_name_newline:
-                                cell_content = Paragraph(f"{course_code}<br/>({teacher_short})", ParagraphStyle(
-                                    'CourseContent',
-                                    fontName='Helvetica',
-                                    fontSize=9,
-                                    alignment=TA_CENTER,
-                                    leading=10,
-                                    spaceBefore=0,
-                                    spaceAfter=0,
-                                ))
-                            else:
-                                cell_content = Paragraph(f"{course_code} ({teacher_short})", ParagraphStyle(
-                                    'CourseContent',
-                                    fontName='Helvetica',
-                                    fontSize=9,
-                                    alignment=TA_CENTER,
-                                    leading=10,
-                                    spaceBefore=0,
-                                    spaceAfter=0,
-                                ))
-                        row.append(cell_content)
-                        for _ in range(colspan-1):
-                            row.append(None)
-                        if colspan > 1:
-                            span_commands.append(('SPAN', (col_idx, row_idx), (col_idx + colspan - 1, row_idx)))
-                        col_idx += colspan
-                        slot_idx += colspan
-                        found = True
-                        break
-                if not found:
-                    # If this is a makeup date, show 'Makeup Class'
-                    if date in makeup_dates:
-                        cell_content = Paragraph("Makeup Class", ParagraphStyle(
-                            'MakeupClass',
-                            fontName='Helvetica-Bold',
-                            fontSize=9,
-                            alignment=TA_CENTER,
-                            textColor=colors.blue,
-                            leading=10,
-                            spaceBefore=0,
-                            spaceAfter=0,
-                        ))
-                        row.append(cell_content)
-                    else:
-                        row.append("")
-                    col_idx += 1
-                    slot_idx += 1
-            table_data.append(row)
-
-        # Calculate available width for all tables
-        available_width = page_width - doc.leftMargin - doc.rightMargin
-
-        # Set column widths directly without depending on lunch_col_idx
-        num_cols = len(header_row)
-        date_col_width = 47   # decreased date column width
-        day_col_width = 47    # narrow day column
-
-        # Find the lunch break time label (if present)
-        lunch_break_label = None
-        if selected_semester.lunch_break_start and selected_semester.lunch_break_end:
-            lunch_break_label = f"{selected_semester.lunch_break_start.strftime('%H:%M')} - {selected_semester.lunch_break_end.strftime('%H:%M')}"
-
-        # Identify lunch break column index (if present)
-        lunch_col_idx = None
-        for idx, label in enumerate(header_row):
-            if lunch_break_label and label == lunch_break_label:
-                lunch_col_idx = idx
-                break
-        lunch_col_width = 60  # smaller width for lunch break column
-        # Calculate remaining width for other columns
-        if lunch_col_idx is not None:
-            remaining_width = available_width - date_col_width - day_col_width - lunch_col_width
-            other_col_count = num_cols - 3  # date, day, lunch
-        else:
-            remaining_width = available_width - date_col_width - day_col_width
-            other_col_count = num_cols - 2
-        other_col_width = remaining_width / other_col_count if other_col_count > 0 else 0
-
-        # Build column widths list
-        col_widths = []
-        for i in range(num_cols):
-            if i == 0:
-                col_widths.append(date_col_width)
-            elif i == 1:
-                col_widths.append(day_col_width)
-            elif i == lunch_col_idx:
-                col_widths.append(lunch_col_width)
-            else:
-                col_widths.append(other_col_width)
-
-        # Scale down if sum(col_widths) > available_width
-        total_width = sum(col_widths)
-        if total_width > available_width:
-            scale = available_width / total_width
-            col_widths = [w * scale for w in col_widths]
-
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        # Custom style for the table
-        style = TableStyle([
-            # Headers styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            # Alignment and spacing
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 2),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            # Grid and borders
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-            # Set a fixed row height
-            ('ROWHEIGHT', (0, 1), (-1, -1), 28),  # Reduced cell height
-            # Text wrapping for all cells
-            ('WORDWRAP', (0, 0), (-1, -1), True),
-        ])
-        # Add background color for lunch breaks and classes, and alternate row colors
-        for i, row in enumerate(table_data[1:], 1):
-            # Row background for non-class, non-break cells
-            even_row_bg = colors.HexColor('#e3f0fa')  # Even row background
-            odd_class_bg = colors.lightblue           # Odd row class cell
-            even_class_bg = colors.HexColor('#d0e6f7') # Even row class cell
-            row_bg = even_row_bg if i % 2 == 0 else None
-            # Set the background for the entire row if even (for non-class, non-break cells)
-            if row_bg:
-                style.add('BACKGROUND', (0, i), (-1, i), row_bg)
-            # Override with special colors for break and class cells
-            for j, cell in enumerate(row[2:], 2):
-                if isinstance(cell, Paragraph) and hasattr(cell, 'text') and "BREAK" in cell.text:
-                    style.add('BACKGROUND', (j, i), (j, i), colors.lightgrey)
-                elif cell:  # If there's content (a class)
-                    class_bg = odd_class_bg if i % 2 == 1 else even_class_bg
-                    style.add('BACKGROUND', (j, i), (j, i), class_bg)
-
-        # After creating the TableStyle, add the span commands
-        for cmd in span_commands:
-            style.add(*cmd)
-        table.setStyle(style)
-        elements.append(table)
-
-        # Add vertical space before the N.B. note
-        elements.append(Spacer(1, 6))  # 18 points = 0.25 inch
-
-        # Add the note section as a table for proper border and wrapping
-        note_text = (
-            "N.B.  For any changes in the schedule, concerned coordinator/class teachers are requested to inform the students and the Dean/Program Co-ordinator, School of Science and Technology, BOU in advance."
-        )
-        note_table = Table(
-            [[note_text]],
-            colWidths=[available_width]
-        )
-        note_table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 3, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),  # Decreased font size
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),  # Reduced padding
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ]))
-        elements.append(note_table)
-        elements.append(Spacer(1, 6))  # Gap below the N.B. note
-        elements.append(Paragraph("<br/>", styles['Normal']))
-
-        # Add the summary table of semester courses
-        semester_courses = SemesterCourse.objects.filter(semester=selected_semester).select_related('course', 'course__teacher')
-        summary_data = [[
-            'Course Code', 'Title', 'Number of Class', 'Course Teacher'
-        ]]
-        for sc in semester_courses:
-            teacher_full_name = sc.course.teacher.name + ' ('+sc.course.teacher.short_name+')'
-            if(sc.course.teacher.name == "N/A"):
-                teacher_full_name = ""
-            
-            if(sc.number_of_classes == 0):
-                sc.number_of_classes = ""
-            
-
-            summary_data.append([
-                sc.course.code,
-                sc.course.name,
-                str(sc.number_of_classes),
-                teacher_full_name
-            ])
-        summary_col_widths = [0.12 * available_width, 0.38 * available_width, 0.14 * available_width, 0.36 * available_width]
-        summary_table = Table(summary_data, colWidths=summary_col_widths)
-        summary_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.white),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BOX', (0, 0), (-1, -1), 2, colors.black),
-        ])
-        summary_table.setStyle(summary_style)
-        # --- SIGNATURE FIELD SECTION ---
-        signature_style = ParagraphStyle(
-            'SignatureStyle',
-            fontName='Helvetica',
-            fontSize=10,
-            alignment=TA_RIGHT,  # Right alignment
-            leading=6, # Reduced line height for less gap
-            spaceBefore=0,
-            spaceAfter=0,
-        )
-        signature_style_left = ParagraphStyle(
-            'SignatureStyleLeft',
-            fontName='Helvetica',
-            fontSize=10,
-            alignment=0,  # Left alignment
-            leading=6,
-            spaceBefore=0,
-            spaceAfter=0,
-        )
-        dean_line = Paragraph("Dean", signature_style)
-        school_line = Paragraph("School of Science and Technology", signature_style)
-        bou_line = Paragraph("Bangladesh Open University", signature_style)
-        coordinator_line = Paragraph("Program Co-ordinator", signature_style_left)
-        school_line_left = Paragraph("School of Science and Technology", signature_style_left)
-        bou_line_left = Paragraph("Bangladesh Open University", signature_style_left)
-        signature_data = [
-            [dean_line],
-            [school_line],
-            [bou_line]
-        ]
-        signature_data_left = [
-            [coordinator_line],
-            [school_line_left],
-            [bou_line_left]
-        ]
-        signature_table_width = 250 # Adjust as needed
-        signature_table = Table(signature_data, colWidths=[signature_table_width])
-        signature_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
-            ('LINEABOVE', (0,0), (0,0), 1, colors.black),
-            ('TOPPADDING', (0,0), (0,0), 4),
-        ]))
-        signature_table_left = Table(signature_data_left, colWidths=[signature_table_width])
-        signature_table_left.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('LINEABOVE', (0,0), (0,0), 1, colors.black),
-            ('TOPPADDING', (0,0), (0,0), 4),
-        ]))
-        wrapper_col_widths = [available_width - signature_table_width * 2, signature_table_width, signature_table_width]
-        signature_wrapper_table = Table([[signature_table_left, '', signature_table]], colWidths=wrapper_col_widths)
-        signature_wrapper_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (0,0), 'LEFT'),
-            ('ALIGN', (2,0), (2,0), 'RIGHT'),
-            ('VALIGN', (0,0), (-1,-1), 'BOTTOM'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('TOPPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-        ]))
-        # Wrap summary table and signature together
-        elements.append(KeepTogether([
-            summary_table,
-            Spacer(1, 48), # Gap before signature
-            signature_wrapper_table
-        ]))
-
-        # Build the PDF (only once)
-        doc.build(elements)
-        buffer.seek(0)
-        #response = FileResponse(buffer, content_type='application/pdf')
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{selected_semester.name}_Routine.pdf"'
-        return response
-
-    except Exception as e:
-        return HttpResponse(f"Error generating PDF file: {str(e)}", status=500)
+    # Read the teacher short name display option from GET params
+    teacher_short_name_newline = request.GET.get('teacher_short_name_newline', '1') == '1'
+    revision = await _semester_revision(semester_id)
+    key, render_export, args = routine_export('routine-pdf', semester_id, revision, teacher_short_name_newline)
+    if revision is None:
+        return await run_in_export_pool(render_export, *args)
+    return await single_flight_export(key, render_export, *args)
 
 @require_POST
 @login_required
@@ -2397,404 +839,363 @@ def reset_routine(request):
         # Delete all routines for this semester, but NOT SemesterCourse
         NewRoutine.objects.filter(semester=semester).delete()
         CurrentRoutine.objects.filter(semester=semester).delete()
+        bump_semester_revision([semester.id])
         messages.success(request, f"Routine reset for {semester.name} (course schedule preserved).")
     except Semester.DoesNotExist:
         messages.error(request, "Semester not found.")
     return redirect(f"{reverse('generate-routine')}?semester={semester_id}")
 
-@login_required
-def export_academic_calendar_pdf(request, semester_id):
+@async_login_required
+async def export_academic_calendar_pdf(request, semester_id):
     """Export the academic calendar as a PDF file"""
+    # exports.py loads reportlab and xlsxwriter, so it is imported on the first export only
+    from .exports import render_academic_calendar_pdf
+    return await run_in_export_pool(render_academic_calendar_pdf, semester_id)
+
+@async_login_required
+async def export_all_academic_calendars_pdf(request):
+    """Export the academic calendars of all semesters as one PDF file"""
+    from .exports import render_all_academic_calendars_pdf
+    return await run_in_export_pool(render_all_academic_calendars_pdf)
+
+@login_required
+def import_catalog_view(request):
+    """
+    Upload a CSV/XLSX sheet of courses (see catalog_import.IMPORT_COLUMNS) to create or update
+    teachers, courses and semester courses in one go. ?template=1 downloads an empty sheet.
+    """
+    if request.GET.get('template'):
+        response = HttpResponse(",".join(IMPORT_COLUMNS) + "\r\n", content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="catalog_import.csv"'
+        return response
+    report = None
+    if request.method == "POST":
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, "Choose a CSV or XLSX file to import.")
+        else:
+            try:
+                report = import_catalog(read_catalog_rows(upload, upload.name), dry_run=bool(request.POST.get('dry_run')))
+            except ImportFileError as e:
+                messages.error(request, str(e))
+    return render(request, 'bou_routines_app/import_catalog.html', {'report': report, 'columns': IMPORT_COLUMNS})
+
+@login_required
+def teacher_timetable(request, teacher_id=None):
+    """A teacher's classes in every semester as one routine table (see grid.build_teacher_table)"""
+    teachers = Teacher.objects.order_by('name')
+    teacher = None
+    if teacher_id is not None:
+        teacher = teachers.filter(id=teacher_id).first()
+        if teacher is None:
+            raise Http404("Teacher not found")
+    return render(request, 'bou_routines_app/teacher_timetable.html', {
+        'teachers': teachers,
+        'teacher': teacher,
+        'table': build_teacher_table(teacher) if teacher else None,
+    })
+
+async def _teacher_timetable_export(kind, teacher_id):
+    if not await Teacher.objects.filter(id=teacher_id).aexists():
+        return JsonResponse({"error": "Teacher not found"}, status=404)
+    revision = await sync_to_async(teacher_revision)(teacher_id)
+    key, render_export, args = teacher_export(kind, teacher_id, revision)
+    return await single_flight_export(key, render_export, *args)
+
+@async_login_required
+async def export_teacher_timetable_pdf(request, teacher_id):
+    """Export a teacher's timetable across all semesters as a PDF file"""
+    return await _teacher_timetable_export('teacher-pdf', teacher_id)
+
+@async_login_required
+async def export_teacher_timetable_excel(request, teacher_id):
+    """Export a teacher's timetable across all semesters as an Excel file"""
+    return await _teacher_timetable_export('teacher-xlsx', teacher_id)
+
+@login_required
+def export_sessions(request):
+    """
+    Raw routine sessions as CSV (default) or JSON Lines (?format=jsonl), for analysis. Optional
+    filters: semester_id, teacher_id, start_date and end_date (YYYY-MM-DD). Rows are streamed in
+    chunks straight from the database, so memory use does not grow with the export.
+    """
+    output_format = request.GET.get('format', 'csv')
+    if output_format not in ('csv', 'jsonl'):
+        return JsonResponse({"error": "format must be csv or jsonl"}, status=400)
+    filters = {}
     try:
-        selected_semester = Semester.objects.get(id=semester_id)
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=landscape(A4),
-            rightMargin=54,
-            leftMargin=54,
-            topMargin=34,
-            bottomMargin=34
-        )
-        page_width, page_height = landscape(A4)
-        available_width = page_width - doc.leftMargin - doc.rightMargin
-        elements = []
+        for name in ('semester_id', 'teacher_id'):
+            if request.GET.get(name):
+                filters[name] = int(request.GET[name])
+        for name in ('start_date', 'end_date'):
+            if request.GET.get(name):
+                filters[name] = datetime.strptime(request.GET[name], '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({"error": "Invalid filter, expected integer ids and YYYY-MM-DD dates"}, status=400)
+
+    queryset = session_queryset(**filters)
+    if output_format == 'jsonl':
+        response = streaming_response(request, jsonl_stream(queryset), content_type='application/x-ndjson; charset=utf-8')
+    else:
+        response = streaming_response(request, csv_stream(queryset), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="routine_sessions.{output_format}"'
+    return response
 
-             # --- HEADER IMAGE SECTION ---
-        header_img_path = 'bou_routines_app/static/pdf_routine_top.png'
+@login_required
+def academic_calendar_events(request):
+    """
+    AJAX view with the academic calendar events of every semester, or of ?semester_id=,
+    computed in one pass from the event rules (see academic_calendar.academic_calendars).
+    """
+    semesters = Semester.objects.order_by('order', 'name')
+    semester_id = request.GET.get('semester_id')
+    if semester_id:
+        semesters = semesters.filter(id=semester_id) if semester_id.isdigit() else semesters.none()
+    semesters = list(semesters)
+    if semester_id and not semesters:
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    calendars = academic_calendars(semesters)
+    return JsonResponse({
+        "semesters": [
+            {
+                "semester_id": semester.id,
+                "semester_name": semester.name,
+                "events": [
+                    {
+                        "name": event['name'],
+                        "dates": [d.strftime('%Y-%m-%d') for d in event['dates']],
+                        "display": format_event_dates(event),
+                    }
+                    for event in calendars[semester.id]
+                ],
+            }
+            for semester in semesters
+        ]
+    })
+
+@require_POST
+@login_required
+def enqueue_generation_job(request):
+    """Queue routine generation for a semester (or 'all') to be processed by the generation worker"""
+    semester_id = request.POST.get('semester')
+    if not semester_id:
+        return JsonResponse({"error": "Missing semester"}, status=400)
+    semester = None
+    if semester_id != 'all':
         try:
-            # Padding for the image cell (matching routine table cell padding of 2)
-            padding_for_image = 2
-
-            # Create an Image object, scaled by width to fit within the available padded space
-            # Height will be auto-calculated to maintain aspect ratio.
-            img_obj = Image(header_img_path, width=available_width - (2 * padding_for_image), height=45)
-
-            # Put the image in a single-cell table whose width spans the available area,
-            # and apply padding to the cell to align the image correctly.
-            header_img_table = Table([[img_obj]], colWidths=[available_width])
-            header_img_table.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'), # Center the image horizontally within its cell
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'), # Center vertically
-                ('LEFTPADDING', (0,0), (-1, -1), padding_for_image),
-                ('RIGHTPADDING', (0,0), (-1, -1), padding_for_image),
-                ('TOPPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
-                ('BOTTOMPADDING', (0,0), (-1, -1), 0), # No vertical padding here, handled by spacer
-            ]))
-            elements.append(header_img_table)
-        except Exception as e:
-            print(f"Error loading header image: {e}")
-            pass # If image not found, skip
-        elements.append(Spacer(1, -4))  # Minimal gap above program name
-
-        # Build left column (program/session/term/commencement/study center)
-        header_style = ParagraphStyle(
-            'HeaderStyle',
-            fontName='Helvetica-Bold',
-            fontSize=15,  # Reduced from 18
-            alignment=1,  # Center
-            leading=18,   # Reduced from 28
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-        header_style_small = ParagraphStyle(
-            'HeaderStyleSmall',
-            fontName='Helvetica-Bold',
-            fontSize=11,  # Reduced from 14
-            alignment=1,
-            leading=14,   # Reduced from 22
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-        header_style_normal = ParagraphStyle(
-            'HeaderStyleNormal',
-            fontName='Helvetica',
-            fontSize=10,   # Reduced from 12
-            alignment=1,
-            leading=11,   # Reduced from 20
-            spaceAfter=0,
-            spaceBefore=0,
-        )
-        header_style_bold = ParagraphStyle(
-            'HeaderStyleBold',
-            fontName='Helvetica-Bold',
-            fontSize=12,  # Reduced from 15
-            alignment=1,
-            leading=15,   # Reduced from 24
-            spaceAfter=0,
-            spaceBefore=0,
-        )
+            semester = Semester.objects.get(id=semester_id)
+        except (Semester.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Semester not found"}, status=404)
+    job = enqueue_generation(semester=semester, user=request.user)
+    return JsonResponse({
+        "success": True,
+        "job_id": job.id,
+        "status_url": reverse('generation-job-status', args=[job.id]),
+    })
 
-        left_content = []
-        program_name = 'B. Sc in Computer Science and Engineering Program'
-        left_content.append(Paragraph(program_name, header_style))
-        session = selected_semester.session or ''
-        if session:
-            left_content.append(Paragraph(f'{session} Session', header_style_small))
-        term = selected_semester.term or ''
-        semester_full_name = selected_semester.semester_full_name or ''
-        if term or semester_full_name:
-            combined = f'{term} Term {semester_full_name}'.strip()
-            left_content.append(Paragraph(combined, header_style_small))
-        left_content.append(Spacer(1, 2))  # Reduced from 8
-        left_content.append(Paragraph('Academic Calender', header_style_bold))
-        commencement = selected_semester.start_date.strftime('%d %B %Y') if selected_semester.start_date else ''
-        study_center = selected_semester.study_center or ''
-        if commencement:
-            left_content.append(Paragraph(f'<b>Date of Commencement:</b> {commencement}', header_style_normal))
-        if study_center:
-            left_content.append(Paragraph(f'<b>Study Center:</b> {study_center}', header_style_normal))
-
-        # Build right column (contact person box)
-        contact_lines = []
-        if selected_semester.contact_person:
-            contact_label = Paragraph(
-                'Contact Person',
-                ParagraphStyle(
-                    'ContactLabel',
-                    fontName='Helvetica-Bold',
-                    fontSize=11,
-                    alignment=0,  # Left align
-                    textColor=colors.white,
-                    spaceAfter=0,
-                    spaceBefore=0,
-                    leading=14,
-                )
-            )
-            # Add 4px gap below the label using a single-cell table row with bottom padding
-            contact_label_table = Table(
-                [[contact_label]],
-                colWidths=[180],
-                hAlign='RIGHT',
-                style=TableStyle([
-                    ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-                    ('TOPPADDING', (0,0), (-1,-1), -3),
-                    ('LEFTPADDING', (0,0), (-1,-1), 0),
-                    ('RIGHTPADDING', (0,0), (-1,-1), 0),
-                ])
-            )
-            contact_info_lines = []
-            contact_info_lines.append(selected_semester.contact_person)
-        if selected_semester.contact_person_designation:
-            contact_info_lines.append(selected_semester.contact_person_designation)
-        contact_info_lines.append('School of Science and Technology')
-        contact_info_lines.append('Bangladesh Open University')
-        if selected_semester.contact_person_phone:
-            contact_info_lines.append(f'Phone/Whatsapp: {selected_semester.contact_person_phone}')
-        if selected_semester.contact_person_email:
-            contact_info_lines.append(f'email:{selected_semester.contact_person_email}')
-        contact_info_para = Paragraph(
-            '<br/>'.join(contact_info_lines),
-            ParagraphStyle(
-                'ContactBox',
-                fontName='Helvetica',
-                fontSize=10,
-                alignment=0,  # Left align
-                textColor=colors.black,
-                leftIndent=2,
-                leading=10,
-                spaceBefore=0,
-                spaceAfter=0,
+@login_required
+def generation_job_status(request, job_id):
+    """AJAX endpoint to poll the progress and final summary of a generation job"""
+    try:
+        job = GenerationJob.objects.select_related('semester').get(id=job_id)
+    except GenerationJob.DoesNotExist:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(job_status(job))
+
+@require_POST
+@login_required
+def auto_schedule(request):
+    """Suggest a conflict-free day and time for every course of a semester (see solver.ScheduleSolver)"""
+    try:
+        semester = Semester.objects.get(id=request.POST.get('semester'))
+    except (Semester.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    try:
+        slots = parse_slot_list(request.POST.get('slots'))
+        lunch_break = None
+        if request.POST.get('lunch_break_start') and request.POST.get('lunch_break_end'):
+            lunch_break = (
+                datetime.strptime(request.POST['lunch_break_start'], "%H:%M").strftime("%H:%M"),
+                datetime.strptime(request.POST['lunch_break_end'], "%H:%M").strftime("%H:%M"),
             )
-        )
-        contact_table = Table(
-            [[contact_label_table], [contact_info_para]],
-            colWidths=[180],
-            hAlign='RIGHT',
-        )
-        contact_table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),  # Single, lighter border
-            ('ROUNDED', (0, 0), (-1, -1), 6),  # Rounded corners
-            ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#2c3e50')),  # Label bg
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (0, 0), 6),  # Label row
-            ('BOTTOMPADDING', (0, 0), (0, 0), 4),  # Label row
-            ('TOPPADDING', (0, 1), (0, 1), 4),  # Info row
-            ('BOTTOMPADDING', (0, 1), (0, 1), 6),  # Info row
-        ]))
-
-        # Vertically center the left header content to match the contact box
-        left_box_table = Table(
-            [[left_content]],
-            colWidths=[available_width-180],
-            hAlign='LEFT',
-            style=TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ])
-        )
-        two_col_table = Table(
-            [[left_box_table, contact_table]],
-            colWidths=[available_width-180, 180],
-            hAlign='LEFT'
-        )
-        two_col_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (0, 0), 'MIDDLE'),
-            ('VALIGN', (1, 0), (1, 0), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-        ]))
-        elements.append(Spacer(1, 4))  # Add slight gap before contact box
-        elements.append(two_col_table)
-        elements.append(Spacer(1, 4))  # Reduced from 16
-
-        # --- Academic Calendar Table ---
-        # Calculate event dates
-        events = []
-        start_date = selected_semester.start_date
-        end_date = selected_semester.end_date
-
-        # Parse holidays into a set for efficient lookup
-        holiday_dates = set()
-        if selected_semester.holidays:
-            try:
-                holiday_dates = {
-                    datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                    for date in selected_semester.holidays.split(',')
-                    if date.strip()
-                }
-            except Exception:
-                # Silently ignore parsing errors, leaving holidays empty
-                holiday_dates = set()
-
-        def get_event_dates(base_date, holidays_set):
-            """
-            Calculates Friday and Saturday for the week of base_date.
-            If a date is a holiday, it finds the next available same day of week.
-            """
-            # isoweekday: Monday=1, ..., Friday=5, Saturday=6, Sunday=7
-            # Get Monday of the week of the base_date
-            monday_of_week = base_date - timedelta(days=base_date.isoweekday() - 1)
-            
-            friday = monday_of_week + timedelta(days=4)
-            saturday = monday_of_week + timedelta(days=5)
+        time_budget = min(float(request.POST.get('time_budget', 2)), 10)
+    except ValueError:
+        return JsonResponse({"error": "Invalid slots, lunch break or time budget"}, status=400)
 
-            # If calculated date is a holiday, find the next non-holiday one.
-            while friday in holidays_set:
-                friday += timedelta(weeks=1)
-            
-            while saturday in holidays_set:
-                saturday += timedelta(weeks=1)
+    solver = ScheduleSolver(semester, slots=slots, lunch_break=lunch_break, time_budget=time_budget)
+    if not solver.courses:
+        return JsonResponse({"error": f"No courses found for semester {semester.name}."}, status=400)
+    return JsonResponse(solver.solve())
 
-            # Sort dates to ensure chronological order for display
-            sorted_dates = sorted([friday, saturday])
-            
-            # Return the formatted string (chronological) and the earliest date for sorting events
-            display_string = f"{sorted_dates[0].strftime('%d/%m/%Y')}, {sorted_dates[1].strftime('%d/%m/%Y')}"
-            sort_date = sorted_dates[0]
+@login_required
+def double_bookings(request):
+    """AJAX view listing teachers booked for overlapping classes on the same date, across all semesters"""
+    try:
+        dates = parse_date_list(request.GET.get('dates')) or None
+    except ValueError:
+        return JsonResponse({"error": "Invalid dates, expected YYYY-MM-DD"}, status=400)
+    conflicts, checked = find_double_bookings(dates=dates)
+    return JsonResponse({
+        'conflicts': conflicts,
+        'count': len(conflicts),
+        'checked_routines': checked,
+    })
 
-            return display_string, sort_date
+@require_POST
+@login_required
+def routine_batch(request):
+    """
+    Apply an ordered list of grid edits (create/update/delete) in one transaction.
 
-        # Find the latest makeup/extra class date (if any)
-        makeup_dates = []
-        if selected_semester.makeup_dates:
-            try:
-                makeup_dates = [
-                    datetime.strptime(date.strip(), "%Y-%m-%d").date()
-                    for date in selected_semester.makeup_dates.split(',')
-                    if date.strip()
-                ]
-            except Exception:
-                makeup_dates = []
-        
-        if start_date:
-            events.append(("Semester Begins", start_date.strftime('%d/%m/%Y'), start_date))
-            
-            # 6th week
-            first_class_test_base = start_date + timedelta(weeks=6)
-            date_str, sort_date = get_event_dates(first_class_test_base, holiday_dates)
-            events.append(("First Class Test", date_str, sort_date))
-            
-            # 10th week
-            second_class_test_base = start_date + timedelta(weeks=10)
-            date_str, sort_date = get_event_dates(second_class_test_base, holiday_dates)
-            events.append(("Second Class Test", date_str, sort_date))
-
-            # Assignments
-            # 4th week
-            first_assignment_base = start_date + timedelta(weeks=4)
-            date_str, sort_date = get_event_dates(first_assignment_base, holiday_dates)
-            events.append(("First Assignment", date_str, sort_date))
-
-            # 8th week
-            second_assignment_base = start_date + timedelta(weeks=8)
-            date_str, sort_date = get_event_dates(second_assignment_base, holiday_dates)
-            events.append(("Second Assignment", date_str, sort_date))
-
-            # 12th week
-            third_assignment_base = start_date + timedelta(weeks=12)
-            date_str, sort_date = get_event_dates(third_assignment_base, holiday_dates)
-            events.append(("Third Assignment", date_str, sort_date))
-
-        if end_date:
-            events.append(("Semester End", end_date.strftime('%d/%m/%Y'), end_date))
-
-        # Tentative Semester Final Exam: 1 week after the latest makeup date, or 1 week after end_date
-        if makeup_dates:
-            latest_makeup = max(makeup_dates)
-            tentative_final = latest_makeup + timedelta(weeks=1)
-        elif end_date:
-            tentative_final = end_date + timedelta(weeks=1)
-        else:
-            tentative_final = None
-        if tentative_final:
-            # Advance date if it falls on a holiday
-            while tentative_final in holiday_dates:
-                tentative_final += timedelta(days=1)
-            events.append(("Tentative Semester Final Exam", tentative_final.strftime('%d/%m/%Y'), tentative_final))
-
-        # Sort events by the date (3rd element)
-        events.sort(key=lambda x: x[2])
-        # Remove the date object from the tuple for table display
-        events = [(e[0], e[1]) for e in events]
-
-        # Table data
-        table_data = [["Events", "Dates"]] + events
-        col_widths = [0.6 * available_width, 0.4 * available_width]
-        table = Table(table_data, colWidths=col_widths)
-        style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-        ])
-        table.setStyle(style)
-        elements.append(table)
-
-        # Add dean's signature block at the bottom (like export_to_pdf)
-        signature_style = ParagraphStyle(
-            'SignatureStyle',
-            fontName='Helvetica',
-            fontSize=10,
-            alignment=TA_RIGHT,
-            leading=6,
-            spaceBefore=0,
-            spaceAfter=0,
-        )
-        signature_style_left = ParagraphStyle(
-            'SignatureStyleLeft',
-            fontName='Helvetica',
-            fontSize=10,
-            alignment=0,  # Left alignment
-            leading=6,
-            spaceBefore=0,
-            spaceAfter=0,
-        )
-        dean_line = Paragraph("Dean", signature_style)
-        school_line = Paragraph("School of Science and Technology", signature_style)
-        bou_line = Paragraph("Bangladesh Open University", signature_style)
-        coordinator_line = Paragraph("Program Co-ordinator", signature_style_left)
-        school_line_left = Paragraph("School of Science and Technology", signature_style_left)
-        bou_line_left = Paragraph("Bangladesh Open University", signature_style_left)
-        signature_data = [
-            [dean_line],
-            [school_line],
-            [bou_line]
-        ]
-        signature_data_left = [
-            [coordinator_line],
-            [school_line_left],
-            [bou_line_left]
-        ]
-        signature_table_width = 250
-        signature_table = Table(signature_data, colWidths=[signature_table_width])
-        signature_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
-            ('LINEABOVE', (0,0), (0,0), 1, colors.black),
-            ('TOPPADDING', (0,0), (0,0), 4),
-        ]))
-        signature_table_left = Table(signature_data_left, colWidths=[signature_table_width])
-        signature_table_left.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('LINEABOVE', (0,0), (0,0), 1, colors.black),
-            ('TOPPADDING', (0,0), (0,0), 4),
-        ]))
-        wrapper_col_widths = [available_width - signature_table_width * 2, signature_table_width, signature_table_width]
-        signature_wrapper_table = Table([[signature_table_left, '', signature_table]], colWidths=wrapper_col_widths)
-        signature_wrapper_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (0,0), 'LEFT'),
-            ('ALIGN', (2,0), (2,0), 'RIGHT'),
-            ('VALIGN', (0,0), (-1,-1), 'BOTTOM'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('TOPPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-        ]))
-        elements.append(Spacer(1, 48))
-        elements.append(signature_wrapper_table)
-
-        doc.build(elements)
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{selected_semester.name}_Academic_Calendar.pdf"'
-        return response
-    except Exception as e:
-        return HttpResponse(f"Error generating Academic Calendar PDF: {str(e)}", status=500)
+    Body (JSON): {"semester_id": 1, "allow_conflicts": false, "grid_revision": 3, "operations": [...]};
+    see batch.apply_routine_batch. Nothing is saved if any operation is invalid.
+    """
+    try:
+        payload = json.loads(request.body)
+        operations = payload['operations']
+        semester = Semester.objects.get(id=payload['semester_id'])
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Expected a JSON body with semester_id and operations"}, status=400)
+    except Semester.DoesNotExist:
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    if not isinstance(operations, list) or not all(isinstance(op, dict) for op in operations):
+        return JsonResponse({"error": "operations must be a list of objects"}, status=400)
+    if len(operations) > 500:
+        return JsonResponse({"error": "At most 500 operations per batch"}, status=400)
+
+    grid_state = get_grid_state(semester)
+    applied, results = apply_routine_batch(semester, operations, allow_conflicts=bool(payload.get('allow_conflicts')))
+    if not applied:
+        return JsonResponse({"success": False, "results": results}, status=409)
+
+    deleted = [result['routine_id'] for result in results if result['op'] == 'delete']
+    updated = [result['routine_id'] for result in results if result['op'] == 'update']
+    created = [result['routine_id'] for result in results if result['op'] == 'create']
+    # The batch bumps the revision once for all its writes
+    grid_patch = record_grid_change(
+        grid_state, removed_ids=deleted + updated, changed_ids=updated + created,
+        bumps=1 if results else 0, client_revision=_grid_revision(payload),
+    )
+    return JsonResponse({"success": True, "results": results, "grid_patch": grid_patch})
+
+@login_required
+def plan_date_range(request):
+    """
+    AJAX view suggesting the shortest date ranges in which every course of a semester gets all
+    its classes, from the saved class schedule (see planner.plan_date_ranges).
+
+    GET: semester_id, earliest_start (default: the semester's start date or today), latest_start
+    (default: 8 weeks later), optional latest_end, limit.
+    """
+    try:
+        semester = Semester.objects.get(id=request.GET.get('semester_id'))
+    except (Semester.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    try:
+        earliest_start = request.GET.get('earliest_start')
+        earliest_start = datetime.strptime(earliest_start, '%Y-%m-%d').date() if earliest_start else (semester.start_date or datetime.now().date())
+        latest_start = request.GET.get('latest_start')
+        latest_start = datetime.strptime(latest_start, '%Y-%m-%d').date() if latest_start else earliest_start + timedelta(weeks=8)
+        latest_end = request.GET.get('latest_end')
+        latest_end = datetime.strptime(latest_end, '%Y-%m-%d').date() if latest_end else None
+        limit = min(int(request.GET.get('limit', 5)), 50)
+    except ValueError:
+        return JsonResponse({"error": "Invalid date or limit, expected YYYY-MM-DD dates"}, status=400)
+    if not earliest_start <= latest_start <= earliest_start + timedelta(days=366):
+        return JsonResponse({"error": "latest_start must be within a year after earliest_start"}, status=400)
+    # planner.py loads NumPy, so like the exports it is imported on first use
+    from .planner import plan_date_ranges
+    try:
+        plan = plan_date_ranges(semester, earliest_start, latest_start, latest_end=latest_end, limit=limit)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(plan)
+
+def _public_routine_response(request, semester_id, kind, content_type, render_body):
+    """
+    Login-free, fully cached page or feed of a semester's routine. The body is cached under the
+    semester revision, so a request costs one primary-key query; the revision ETag and public
+    Cache-Control let a reverse proxy and browsers answer repeat requests without Django.
+    """
+    revision = Semester.objects.filter(id=semester_id).values_list('revision', flat=True).first()
+    if revision is None:
+        return None
+    etag = f'"{semester_id}-{revision}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f"public_routine:{kind}:{semester_id}:{revision}"
+        body = cache.get(key)
+        if body is None:
+            body = render_body(Semester.objects.get(id=semester_id))
+            cache.set(key, body, None)
+        response = HttpResponse(body, content_type=content_type)
+    # request.user and the session are never touched, so no "Vary: Cookie" is added
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.PUBLIC_ROUTINE_MAX_AGE)
+    return response
+
+@require_GET
+def public_routine(request, semester_id):
+    """Read-only routine page of a semester for students (no login)"""
+    response = _public_routine_response(
+        request, semester_id, 'html', 'text/html; charset=utf-8',
+        lambda semester: render_to_string('bou_routines_app/public_routine.html', {
+            'semester': semester,
+            'table': build_routine_table(semester),
+            'courses': routine_courses(semester),
+        }),
+    )
+    if response is None:
+        raise Http404("Semester not found")
+    return response
+
+@require_GET
+def public_routine_feed(request, semester_id):
+    """JSON routine feed of a semester for students and other sites (no login)"""
+    response = _public_routine_response(
+        request, semester_id, 'json', 'application/json',
+        lambda semester: json.dumps(build_routine_feed(semester)),
+    )
+    if response is None:
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    return response
+
+def _ical_response(request, kind, obj, name, routines, semesters=None):
+    """
+    Streamed .ics feed of routines plus the academic calendar of their semesters. The ETag comes
+    from the revisions of those semesters, so a polling calendar client mostly gets a 304.
+    """
+    if semesters is None:
+        semesters = list(feed_semesters(routines))
+    etag = feed_etag(kind, obj.id, [(semester.id, semester.revision) for semester in semesters])
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = streaming_response(request, ical_stream(name, routines, semesters), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="{kind}-{obj.id}.ics"'
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.PUBLIC_ROUTINE_MAX_AGE)
+    return response
+
+def semester_ical(request, semester_id):
+    """iCalendar feed of a semester's classes and academic calendar (no login)"""
+    semester = Semester.objects.filter(id=semester_id).first()
+    if semester is None:
+        return JsonResponse({"error": "Semester not found"}, status=404)
+    routines = NewRoutine.objects.filter(semester_id=semester_id)
+    return _ical_response(request, 'semester', semester, f"{semester.name} Routine", routines, [semester])
+
+def teacher_ical(request, teacher_id):
+    """iCalendar feed of a teacher's classes in every semester (no login)"""
+    teacher = Teacher.objects.filter(id=teacher_id).first()
+    if teacher is None:
+        return JsonResponse({"error": "Teacher not found"}, status=404)
+    routines = NewRoutine.objects.filter(course__teacher_id=teacher_id)
+    return _ical_response(request, 'teacher', teacher, f"{teacher.name} Classes", routines)
+
+def course_ical(request, course_id):
+    """iCalendar feed of a course's classes (no login)"""
+    course = Course.objects.filter(id=course_id).first()
+    if course is None:
+        return JsonResponse({"error": "Course not found"}, status=404)
+    routines = NewRoutine.objects.filter(course_id=course_id)
+    return _ical_response(request, 'course', course, f"{course.code} {course.name}", routines)
@@ -0,0 +1,29 @@
+from datetime import date
+
+from .models import WEEKDAYS
+
+
+def weekday_mask(days):
+    """Weekday bitmask (bit 0 = Monday) of weekday names or date.weekday() numbers"""
+    mask = 0
+    for day in days:
+        mask |= 1 << (day if isinstance(day, int) else WEEKDAYS.index(day))
+    return mask
+
+
+def mask_weekdays(mask):
+    """date.weekday() numbers set in a weekday bitmask, Monday first"""
+    return [i for i in range(7) if mask >> i & 1]
+
+
+def weekday_dates(start, end, weekday):
+    """Dates of one weekday from start to end (inclusive), computed on day ordinals a week apart"""
+    first = start.toordinal() + (weekday - start.weekday()) % 7
+    return [date.fromordinal(ordinal) for ordinal in range(first, end.toordinal() + 1, 7)]
+
+
+def class_dates(start, end, mask, exclude=frozenset()):
+    """Dates from start to end on the weekdays of mask, without the excluded ones, in order"""
+    dates = [d for weekday in mask_weekdays(mask) for d in weekday_dates(start, end, weekday) if d not in exclude]
+    dates.sort()
+    return dates
@@ -57,7 +57,6 @@ TEMPLATES = [
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates']
         ,
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -65,6 +64,17 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process instead of on every render; not in
+            # development, where template edits must show up without a restart
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ] if not DEBUG else [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
         },
     },
 ]
@@ -125,3 +135,56 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = '/'
+
+# Seconds without a heartbeat after which a generation job still marked "running" is taken to
+# belong to a worker that died, and is queued again (a job beats after every course).
+GENERATION_JOB_TIMEOUT = 600
+
+# Maximum number of PDF/XLSX exports rendered at the same time. Exports run in a
+# thread pool so the async views (served under uvicorn/ASGI) never block the event loop.
+EXPORT_THREAD_POOL_SIZE = 2
+
+# Rendered exports, keyed by semester revision. Concurrent requests for the same export are
+# rendered once: the other requests wait on a file lock here and are served the stored bytes.
+# Kept out of the cache directory, so clearing the cache never removes published exports.
+EXPORT_RENDER_DIR = BASE_DIR / 'exports'
+
+# Publishing mode: the generation worker renders the exports of every changed routine while idle
+# (or run "manage.py publish_exports --watch"), so downloads are served from stored files.
+EXPORT_PUBLISH = False
+
+# How stored exports are sent: None streams them from Django, 'x-accel-redirect' hands them to
+# nginx (an internal location aliasing EXPORT_RENDER_DIR at EXPORT_ACCEL_REDIRECT_PREFIX) and
+# 'x-sendfile' to Apache/lighttpd.
+EXPORT_SENDFILE = None
+EXPORT_ACCEL_REDIRECT_PREFIX = '/protected-exports/'
+
+# Static copy of the routines written by "manage.py publish_static_site", served by nginx when
+# Django is down or under maintenance.
+STATIC_SITE_DIR = BASE_DIR / 'static_site'
+
+# Seconds browsers and a reverse proxy may reuse the public routine pages and feeds before
+# revalidating them by ETag (the semester revision).
+PUBLIC_ROUTINE_MAX_AGE = 300
+
+# Class times are local wall-clock times; the .ics feeds give them in this time zone
+# (None writes floating times, shown unchanged in every time zone).
+ICAL_TIME_ZONE = 'Asia/Dhaka'
+
+# Cache used for template fragments (routine tables keyed by semester revision), the public
+# pages and the course/teacher catalog. Entries never go stale: an edit bumps a revision and the
+# old keys simply stop being used, so culling only drops entries that are rebuilt on demand.
+# The catalog and calendar rule revisions are the only copy of their value and live in their own
+# cache, which holds a few keys and is never culled: a lost revision would be re-seeded and
+# invalidate every ETag built on it. File based so every worker process sees the same revisions.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    'revisions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'revisions',
+    },
+}